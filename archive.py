@@ -0,0 +1,84 @@
+import bisect
+import functools
+from collections import namedtuple
+from datetime import datetime
+
+# Un évènement de l'archive. `day` (date en jours, 0 si inconnue) puis `row`
+# viennent en premier : les évènements se trient ainsi par ordre chronologique.
+ArchiveEvent = namedtuple("ArchiveEvent", "day row kind player level rank link date")
+
+@functools.lru_cache(maxsize=8192)  # peu de dates distinctes : strptime est le poste le plus coûteux
+def _day(date):
+    try:
+        return datetime.strptime(date, "%d/%m/%Y").toordinal()
+    except ValueError:
+        return 0
+
+class ArchiveLog:
+    """Onglet archive vu comme un journal d'évènements ("beat", "Added"...) en ajout seul.
+
+    Colonnes : type, joueur, niveau, rang, lien, date. Les index secondaires
+    (par niveau, par joueur, par type) gardent leurs évènements triés par date ;
+    une ligne ajoutée en fin d'onglet ne fait qu'allonger ces listes.
+    """
+
+    def __init__(self, rows, key=str.lower):
+        self.key = key            # normalisation des noms de niveaux
+        self.by_level = {}        # niveau normalisé -> [ArchiveEvent]
+        self.by_player = {}       # joueur en minuscules -> [ArchiveEvent]
+        self.by_kind = {}         # type -> [ArchiveEvent]
+        self.added = {}           # niveau normalisé -> premier évènement "Added" daté
+        self.added_undated = {}   # niveau normalisé -> premier "Added" sans date lisible
+        for row, line in enumerate(rows[1:], start=2):
+            self.append(row, line)
+
+    def append(self, row, line):
+        """Indexe la ligne `row` (1-based) de l'onglet"""
+        if len(line) < 3 or not line[0]:
+            return
+        date = line[5] if len(line) > 5 else ""
+        event = ArchiveEvent(_day(date), row, line[0], line[1], line[2],
+                             line[3] if len(line) > 3 else "", line[4] if len(line) > 4 else "", date)
+        level = self.key(event.level)
+        for index, key in ((self.by_level, level), (self.by_player, event.player.lower()),
+                           (self.by_kind, event.kind)):
+            events = index.setdefault(key, [])
+            if not events or events[-1] < event:
+                events.append(event)
+            else:
+                # Ligne plus ancienne que la dernière connue (archive historique, ajoutée en tête)
+                bisect.insort(events, event)
+        if event.kind == "Added":
+            added = self.added if event.day else self.added_undated
+            first = added.get(level)
+            if first is None or event < first:
+                added[level] = event
+
+    def added_date(self, level_name):
+        """Date du premier ajout du niveau à la liste, ou None.
+
+        Un ajout daté l'emporte ; à défaut, la date telle qu'écrite (éventuellement
+        vide) du premier ajout non daté.
+        """
+        level = self.key(level_name)
+        event = self.added.get(level) or self.added_undated.get(level)
+        return event.date if event is not None else None
+
+    def history(self, level_name=None, player_name=None, kind=None):
+        """Évènements du plus récent au plus ancien, filtrés par niveau, joueur et/ou type"""
+        candidates = []
+        if level_name is not None:
+            candidates.append(self.by_level.get(self.key(level_name), []))
+        if player_name is not None:
+            candidates.append(self.by_player.get(player_name.lower(), []))
+        if kind is not None:
+            candidates.append(self.by_kind.get(kind, []))
+        if not candidates:
+            candidates.append(sorted(event for events in self.by_kind.values() for event in events))
+        # On parcourt le plus petit index et on filtre sur les autres critères
+        events = min(candidates, key=len)
+        level = self.key(level_name) if level_name is not None else None
+        return [event for event in reversed(events)
+                if (level is None or self.key(event.level) == level)
+                and (player_name is None or event.player.lower() == player_name.lower())
+                and (kind is None or event.kind == kind)]
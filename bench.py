@@ -0,0 +1,232 @@
+import argparse
+import os
+import statistics
+import time
+
+# Pas de quota ni de journal pendant les mesures : on compte les requêtes, on ne les limite pas
+os.environ.setdefault("SHEETS_READ_QUOTA", "1000000")
+os.environ.setdefault("SHEETS_WRITE_QUOTA", "1000000")
+os.environ.setdefault("SHEETS_TOTAL_QUOTA", "1000000")
+os.environ["ICE_JOURNAL_PATH"] = ""
+os.environ.pop("ICE_MIRROR_PATH", None)
+
+import ice
+from fake_gspread import FakeClient, generate
+
+# Tailles prédéfinies : (niveaux, joueurs)
+SIZES = {
+    "small": (75, 100),
+    "medium": (1000, 1000),
+    "large": (10000, 1000),
+    "wide": (2000, 5000)
+}
+
+# Méthodes d'infrastructure, mesurées indirectement par toutes les autres
+SKIPPED_METHODS = {
+    "connect", "warm_up", "refresh_worksheets", "get_ws", "snapshot", "sync_mirror",
+    "start_mirror_sync", "flush_journal", "start_write_behind", "start_change_polling", "update_cell",
+    "normalize_level_name", "migrate_completions", "render_list0"
+}
+
+class Sample:
+    """Arguments réalistes tirés du Sheet généré"""
+
+    def __init__(self, spreadsheet):
+        main = spreadsheet.ws["list0"].rows
+        header = main[0]
+        self.level = main[min(len(main) - 1, 10)][0]
+        # Joueur ayant le plus de complétions : les profils les plus coûteux
+        counts = [sum(1 for line in main[1:] if col < len(line) and line[col] in ice.COMPLETION_MARKS)
+                  for col in range(len(header))]
+        col = max(range(1, len(header)), key=counts.__getitem__)
+        self.player = header[col]
+        # Niveau que ce joueur n'a pas encore battu
+        self.unbeaten = next((line[0] for line in main[1:]
+                              if col >= len(line) or line[col] not in ice.COMPLETION_MARKS), self.level)
+        self.discord = spreadsheet.ws["infoplayer"].rows[1][col - 1]
+        self.counter = 0
+
+    def unique(self, prefix):
+        self.counter += 1
+        return f"{prefix} {self.counter}"
+
+    def next_rank(self):
+        """Alterne entre deux rangs pour que chaque déplacement en soit vraiment un"""
+        self.counter += 1
+        return 3 if self.counter % 2 else 12
+
+METHODS = {
+    "check_changes": lambda s: (),
+    "data_version": lambda s: (["MAIN", "LE", "LR"],),
+    "suggest_levels": lambda s: (s.level[:4],),
+    "suggest_players": lambda s: (s.player[:4],),
+    "resolve_level": lambda s: (s.level.lower(),),
+    "resolve_player": lambda s: (s.player.upper(),),
+    "get_players": lambda s: (),
+    "get_levels": lambda s: (),
+    "get_waiting_levels": lambda s: (),
+    "get_level_rank": lambda s: (s.level,),
+    "get_level_verifier": lambda s: (s.level,),
+    "add_archive": lambda s: (s.player, s.unbeaten, "https://youtu.be/bench"),
+    "update_completion": lambda s: (s.player, s.unbeaten),
+    "update_enjoyment": lambda s: (s.player, s.unbeaten, 75),
+    "update_rating": lambda s: (s.player, s.unbeaten, 60),
+    "match_levels": lambda s: ("LR", [s.level, s.unbeaten, "Unknown Level"]),
+    "update_stats_bulk": lambda s: (s.player, [("LE", s.level, 70), ("LR", s.level, 60), ("LR", s.unbeaten, 50)]),
+    "import_completions": lambda s: ([{"player": s.player, "level": s.unbeaten, "rating": "60"},
+                                      {"player": s.player, "level": "Unknown Level"}], True),
+    "add_to_waiting_list": lambda s: (s.unique("Waiting Level"), s.player, True, "top 20", "gg", 70, 60, "https://youtu.be/bench"),
+    "get_list_details": lambda s: (),
+    "get_loved_list": lambda s: (),
+    "get_best_list": lambda s: (),
+    "get_player_completions": lambda s: (s.player,),
+    "get_leaderboard": lambda s: (),
+    "leaderboard_mismatches": lambda s: (),
+    "place_level": lambda s: (s.unique("Placed Level"), s.player, 20),
+    "move_level": lambda s: (s.level, s.next_rank()),
+    "add_player": lambda s: (s.unique("New Player"), s.unique("new_discord")),
+    "get_player_from_discord": lambda s: (s.discord,),
+    "peek_player_from_discord": lambda s: (s.discord,),
+    "get_discord_name": lambda s: (s.player,),
+    "get_levels_without_rating": lambda s: (s.player,),
+    "get_levels_without_enjoyment": lambda s: (s.player,),
+    "count_completions": lambda s: (s.level,),
+    "get_level_average_enjoyment": lambda s: (s.level,),
+    "get_level_average_rating": lambda s: (s.level,),
+    "get_level_verifier_and_date": lambda s: (s.level,),
+    "get_level_facts": lambda s: (s.level,),
+    "get_archive_history": lambda s: (None, s.player, "beat"),
+    "get_player_stats": lambda s: (s.player,),
+    "get_player_average_enjoyment": lambda s: (s.player,),
+    "get_player_average_rating": lambda s: (s.player,),
+    "get_player_rank": lambda s: (s.player,),
+    "get_player_favorite_level": lambda s: (s.player,),
+    "get_player_least_favorite_level": lambda s: (s.player,),
+    "get_player_best_rated_level": lambda s: (s.player,),
+    "get_player_worst_rated_level": lambda s: (s.player,)
+}
+
+# Enchaînements d'appels des principales commandes de ice2.py
+def flow_beat(gs, s):
+    level = s.unbeaten
+    gs.add_archive(s.player, level, "https://youtu.be/bench")
+    gs.update_completion(s.player, level)
+    gs.get_level_rank(level)
+    gs.update_enjoyment(s.player, level, 80)
+    gs.update_rating(s.player, level, 70)
+
+def flow_place(gs, s):
+    level = s.unique("Placed Level")
+    gs.add_to_waiting_list(level, s.player, True, "top 20", "gg", 70, 60, "https://youtu.be/bench")
+    gs.get_waiting_levels()
+    gs.place_level(level, s.player, 20)
+    gs.get_levels()
+
+def flow_move(gs, s):
+    gs.get_level_rank(s.level)
+    gs.move_level(s.level, s.next_rank())
+    gs.get_levels()
+
+def flow_profile(gs, s):
+    player = gs.get_player_from_discord(s.discord)
+    gs.get_player_completions(player)
+    gs.get_discord_name(player)
+    gs.get_player_stats(player)
+
+def flow_level_fact(gs, s):
+    gs.get_levels()
+    gs.get_level_facts(gs.resolve_level(s.level))
+
+FLOWS = {
+    "beat": flow_beat,
+    "place": flow_place,
+    "move": flow_move,
+    "profile": flow_profile,
+    "level_fact": flow_level_fact
+}
+
+def _timed_run(spreadsheet, gs, run):
+    spreadsheet.reset_calls()
+    start = time.perf_counter()
+    run(gs)
+    return (time.perf_counter() - start) * 1000, spreadsheet.total_calls()
+
+def new_sheet(spreadsheet, change_source, completions_store="list0"):
+    gs = ice.GoogleSheet(journal_path="", mirror_path=None, client=FakeClient(spreadsheet),
+                         change_source=change_source, completions_store=completions_store)
+    # Pas de contrôle en tâche de fond : check_changes est mesuré comme les autres méthodes
+    gs.changes_stop.set()
+    return gs
+
+def measure(spreadsheet, run, repeat, change_source="", completions_store="list0"):
+    """Médiane du temps (ms) et nombre de requêtes API d'un appel, dans trois cas :
+    cache vide, premier appel après warm_up (index à construire), appel répété"""
+    results = {"cold": [], "warm": [], "hot": []}
+    for _ in range(repeat):
+        gs = new_sheet(spreadsheet, change_source, completions_store)
+        results["cold"].append(_timed_run(spreadsheet, gs, run))
+        gs = new_sheet(spreadsheet, change_source, completions_store)
+        gs.warm_up()
+        results["warm"].append(_timed_run(spreadsheet, gs, run))
+        results["hot"].append(_timed_run(spreadsheet, gs, run))
+    return [(statistics.median(ms for ms, _ in runs), max(calls for _, calls in runs))
+            for runs in results.values()]
+
+def bench_size(name, n_levels, n_players, args):
+    start = time.perf_counter()
+    spreadsheet = generate(n_levels, n_players, seed=args.seed, latency=args.latency / 1000)
+    sample = Sample(spreadsheet)
+    if args.completions_store == "sparse":
+        # Migration puis grille de list0 vidée : seules la colonne A et l'en-tête restent lus
+        new_sheet(spreadsheet, "").migrate_completions()
+        for line in spreadsheet.ws["list0"].rows[1:]:
+            del line[1:]
+    print(f"\n== {name} : {n_levels} niveaux, {n_players} joueurs "
+          f"(généré en {time.perf_counter() - start:.1f}s, latence simulée {args.latency:g} ms)")
+    print(f"{'':<34}{'vide ms':>10}{'appels':>8}{'chaud ms':>10}{'appels':>8}{'répété ms':>10}{'appels':>8}")
+
+    targets = []
+    if not args.flows_only:
+        missing = sorted(attr for attr, value in vars(ice.GoogleSheet).items()
+                         if callable(value) and not attr.startswith("_")
+                         and attr not in METHODS and attr not in SKIPPED_METHODS)
+        if missing:
+            print(f"(méthodes sans arguments de benchmark : {', '.join(missing)})")
+        targets += [(method, lambda gs, method=method, f=make_args: getattr(gs, method)(*f(sample)))
+                    for method, make_args in METHODS.items()
+                    if (not args.only or method in args.only)
+                    and (method != "check_changes" or args.change_source)]
+    targets += [(f"flow:{flow}", lambda gs, func=func: func(gs, sample))
+                for flow, func in FLOWS.items()
+                if not args.only or flow in args.only]
+
+    for label, run in targets:
+        results = measure(spreadsheet, run, args.repeat, args.change_source, args.completions_store)
+        columns = "".join(f"{ms:>10.1f}{calls:>8}" for ms, calls in results)
+        print(f"{label:<34}{columns}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hors ligne de ice.py sur un faux Google Sheet")
+    parser.add_argument("--sizes", default="small,medium", help=f"tailles parmi {', '.join(SIZES)}")
+    parser.add_argument("--levels", type=int, help="nombre de niveaux (taille personnalisée)")
+    parser.add_argument("--players", type=int, help="nombre de joueurs (taille personnalisée)")
+    parser.add_argument("--latency", type=float, default=0, help="latence simulée par requête, en ms")
+    parser.add_argument("--repeat", type=int, default=3, help="répétitions par mesure (médiane)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--change-source", default="",
+                        help='détection des modifications : "modified" ou "checksum:checksums!A1:B20"')
+    parser.add_argument("--completions-store", choices=["list0", "sparse"], default="list0",
+                        help="stockage des complétions mesuré (sparse : onglet completions, voir completions.py)")
+    parser.add_argument("--flows-only", action="store_true", help="seulement les commandes, pas chaque méthode")
+    parser.add_argument("--only", nargs="*", help="méthodes ou commandes à mesurer")
+    args = parser.parse_args()
+
+    if args.levels or args.players:
+        sizes = [("custom", args.levels or 75, args.players or 100)]
+    else:
+        sizes = [(name, *SIZES[name]) for name in args.sizes.split(",")]
+    for name, n_levels, n_players in sizes:
+        bench_size(name, n_levels, n_players, args)
+
+if __name__ == "__main__":
+    main()
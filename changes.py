@@ -0,0 +1,114 @@
+import hashlib
+import threading
+
+def content_hash(rows):
+    """Empreinte du contenu d'un onglet (lignes telles que renvoyées par l'API)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for row in rows:
+        digest.update("\x1f".join(row).encode("utf-8"))
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+class ModifiedTimeSource:
+    """Date de dernière modification du fichier (API Drive).
+
+    Un seul marqueur pour tout le Sheet : quand il bouge, tous les onglets en
+    cache sont relus (en une requête) et comparés à leur empreinte.
+    """
+
+    per_tab = False
+    scopes = ["https://www.googleapis.com/auth/drive.metadata.readonly"]
+
+    def read(self, spreadsheet):
+        return spreadsheet.get_lastUpdateTime()
+
+class ChecksumRangeSource:
+    """Petite plage de contrôle tenue à jour par des formules dans le Sheet.
+
+    Chaque ligne contient le titre d'un onglet puis une valeur qui change avec
+    son contenu, par exemple pour list0 :
+        list0 | =COUNTA(list0!A:DZ)&"-"&SUMPRODUCT(LEN(list0!A:DZ))
+    Seuls les onglets dont la valeur a changé sont relus.
+    """
+
+    per_tab = True
+    scopes = []
+
+    def __init__(self, range_name):
+        self.range_name = range_name
+
+    def read(self, spreadsheet):
+        response = spreadsheet.values_batch_get([self.range_name])
+        rows = response.get("valueRanges", [{}])[0].get("values", [])
+        return {row[0]: tuple(row[1:]) for row in rows if row and row[0]}
+
+def source_from_config(spec):
+    """"modified" ou "checksum:<plage A1>" ; None si la détection est désactivée"""
+    if not spec:
+        return None
+    if spec == "modified":
+        return ModifiedTimeSource()
+    if spec.startswith("checksum:"):
+        return ChecksumRangeSource(spec[len("checksum:"):])
+    raise ValueError(f"Source de détection des modifications inconnue: {spec}")
+
+class ChangeDetector:
+    """Décide quels onglets relire à partir du marqueur de modification.
+
+    Garde le dernier marqueur vu et l'empreinte du contenu de chaque onglet lu,
+    pour distinguer un onglet réellement modifié d'une simple relecture.
+    """
+
+    def __init__(self, source, fallback=None):
+        self.source = source
+        self.fallback = fallback  # source de repli si la principale est injoignable (ex. Drive)
+        self.lock = threading.Lock()
+        self.markers = None  # (source, dernier marqueur ou {titre: marqueur} par onglet)
+        self.hashes = {}     # onglet -> empreinte du dernier contenu lu
+
+    @property
+    def scopes(self):
+        return self.source.scopes + (self.fallback.scopes if self.fallback else [])
+
+    def read(self, spreadsheet):
+        """(source utilisée, marqueur) : la source principale, ou la source de repli
+        si la lecture échoue"""
+        try:
+            return self.source, self.source.read(spreadsheet)
+        except Exception as e:
+            if self.fallback is None:
+                raise
+            print(f"Marqueur de modification indisponible ({e}), repli sur {type(self.fallback).__name__}")
+            return self.fallback, self.fallback.read(spreadsheet)
+
+    def suspects(self, reading, tabs):
+        """Onglets (clés de `tabs`, {clé: [titres lus pour cet onglet]}) qui ont pu changer
+        depuis le dernier marqueur ; `reading` est le résultat de read"""
+        source, markers = reading
+        if self.markers is None or self.markers[0] is not source:
+            # Premier contrôle ou changement de source : marqueurs incomparables
+            return list(tabs)
+        previous = self.markers[1]
+        if not source.per_tab:
+            return list(tabs) if markers != previous else []
+        # Un onglet absent de la plage de contrôle est toujours relu
+        return [tab for tab, titles in tabs.items()
+                if any(title not in markers or markers[title] != previous.get(title) for title in titles)]
+
+    def acknowledge(self, reading):
+        """Enregistre le marqueur une fois les onglets suspects relus"""
+        self.markers = reading
+
+    def remember(self, tab, rows):
+        """Enregistre l'empreinte d'un onglet lu ; retourne True si son contenu a changé"""
+        digest = content_hash(rows)
+        with self.lock:
+            changed = self.hashes.get(tab) != digest
+            self.hashes[tab] = digest
+        return changed
+
+    def forget(self, *tabs):
+        """L'onglet en cache ne correspond plus à l'empreinte : il sera relu au prochain contrôle"""
+        with self.lock:
+            for tab in tabs:
+                self.hashes.pop(tab, None)
@@ -0,0 +1,66 @@
+import argparse
+from leaderboard import COMPLETION_MARKS
+
+# Stockage creux des complétions : une ligne (niveau, joueur, marque) par complétion
+# dans l'onglet "completions", au lieu d'une grille niveaux × joueurs remplie de "X".
+# L'onglet est un journal en ajout seul : pour un même couple (niveau, joueur),
+# la dernière ligne l'emporte, et une marque vide (ou "X") efface la complétion.
+COMPLETIONS_HEADER = ["Level", "Player", "Mark"]
+
+def records_from_grid(rows):
+    """Enregistrements [niveau, joueur, marque] des cellules ✔/⭐ d'une grille list0"""
+    header = rows[0] if rows else []
+    return [[line[0], header[col], line[col]]
+            for line in rows[1:] if line and line[0]
+            for col in range(1, min(len(line), len(header)))
+            if header[col] and line[col] in COMPLETION_MARKS]
+
+def grid_from_records(levels, header, records, key=str.lower):
+    """Grille list0 en mémoire : ligne 1 = header, colonne A = levels, marques
+    placées depuis les enregistrements (cellules vides ailleurs)"""
+    rows = [list(header)] + [[level] for level in levels]
+    level_rows, player_cols = {}, {}
+    for idx, level in enumerate(levels, start=2):
+        level_rows.setdefault(key(level), idx)
+    for idx, player in enumerate(header[1:], start=2):
+        if player:
+            player_cols.setdefault(player, idx)
+    for record in records:
+        level, player, mark = (list(record) + ["", "", ""])[:3]
+        row, col = level_rows.get(key(level)), player_cols.get(player)
+        if row is None or col is None:
+            continue
+        line = rows[row - 1]
+        if len(line) < col:
+            line.extend([""] * (col - len(line)))
+        line[col - 1] = mark if mark in COMPLETION_MARKS else ""
+    return rows
+
+def render_grid(rows):
+    """Cellules B2:… de list0 telles qu'affichées aux humains : ✔, ⭐ ou "X" """
+    width = len(rows[0]) - 1 if rows else 0
+    return [[line[col] if col < len(line) and line[col] in COMPLETION_MARKS else "X"
+             for col in range(1, width + 1)]
+            for line in rows[1:]]
+
+def main():
+    parser = argparse.ArgumentParser(description="Stockage creux des complétions (onglet completions)")
+    parser.add_argument("action", choices=["migrate", "render"],
+                        help="migrate : copie les ✔/⭐ de list0 dans completions ; "
+                             "render : régénère la grille de list0 depuis completions")
+    parser.add_argument("--dry-run", action="store_true", help="compter sans rien écrire (migrate)")
+    args = parser.parse_args()
+
+    from ice import GoogleSheet
+    google_sheet = GoogleSheet(journal_path="", mirror_path=None, change_source="")
+    if args.action == "migrate":
+        # La grille est lue telle quelle : la migration part toujours de list0 complet
+        count = google_sheet.migrate_completions(dry_run=args.dry_run)
+        print(f"{count} complétions {'à migrer' if args.dry_run else 'écrites dans completions'}")
+        if not args.dry_run:
+            print("Activez le stockage creux avec ICE_COMPLETIONS_STORE=sparse")
+    else:
+        print(f"{google_sheet.render_list0()} cellules de list0 réécrites")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+import gspread
+from gspread.exceptions import APIError, WorksheetNotFound
+from changes import content_hash
+
+# Onglet virtuel qui imite une plage de contrôle tenue par formules (voir changes.ChecksumRangeSource)
+CHECKSUM_TAB = "checksums"
+
+# Faux gspread en mémoire, pour mesurer ice.py sans toucher au vrai Google Sheet.
+# Seules les méthodes utilisées par le bot sont reproduites ; chaque appel
+# compte comme une requête API et peut être ralenti d'une latence simulée.
+
+def _trim(values):
+    values = list(values)
+    while values and values[-1] == "":
+        values.pop()
+    return values
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def _user_entered(cell):
+    (kind, value), = cell["userEnteredValue"].items()
+    if kind == "numberValue":
+        return _cell(float(value))
+    if kind == "boolValue":
+        return "TRUE" if value else "FALSE"
+    return _cell(value)
+
+def _tab_title(range_name):
+    title = range_name.rsplit("!", 1)[0] if "!" in range_name else range_name
+    if title.startswith("'"):
+        title = title[1:-1].replace("''", "'")
+    return title
+
+def _grid_range(range_name):
+    """Plage d'un onglet en indices 0-based (clés absentes : jusqu'au bord de l'onglet)"""
+    if "!" not in range_name:
+        return {}
+    return gspread.utils.a1_range_to_grid_range(range_name.rsplit("!", 1)[1])
+
+class _FakeResponse:
+    """Réponse HTTP minimale pour construire une gspread.exceptions.APIError"""
+
+    def __init__(self, code, message):
+        self.status_code = code
+        self.text = message
+        self._error = {"code": code, "message": message, "status": "INVALID_ARGUMENT"}
+
+    def json(self):
+        return {"error": self._error}
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, rows, sheet_id):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = sheet_id
+        self.rows = [[_cell(v) for v in row] for row in rows]
+
+    def _set(self, row, col, value):
+        while len(self.rows) < row:
+            self.rows.append([])
+        line = self.rows[row - 1]
+        while len(line) < col:
+            line.append("")
+        line[col - 1] = _cell(value)
+
+    def _write(self, range_name, values):
+        row, col = gspread.utils.a1_to_rowcol(range_name.split("!")[-1].split(":")[0])
+        for i, line in enumerate(values):
+            for j, value in enumerate(line):
+                self._set(row + i, col + j, value)
+
+    def _values(self, grid):
+        """Valeurs d'une plage, sans lignes ni cellules vides en fin (comme l'API)"""
+        rows = self.rows[grid.get("startRowIndex", 0):grid.get("endRowIndex", len(self.rows))]
+        start, end = grid.get("startColumnIndex", 0), grid.get("endColumnIndex")
+        values = [_trim(row[start:end]) for row in rows]
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def _clear(self, grid):
+        start = grid.get("startColumnIndex", 0)
+        for row in self.rows[grid.get("startRowIndex", 0):grid.get("endRowIndex", len(self.rows))]:
+            end = min(len(row), grid.get("endColumnIndex", len(row)))
+            row[start:end] = [""] * max(0, end - start)
+
+    def get_all_values(self, **kwargs):
+        self.spreadsheet._call("get_all_values")
+        width = max((len(row) for row in self.rows), default=0)
+        return [row + [""] * (width - len(row)) for row in self.rows]
+
+    def row_values(self, row, **kwargs):
+        self.spreadsheet._call("row_values")
+        return _trim(self.rows[row - 1]) if row <= len(self.rows) else []
+
+    def col_values(self, col, **kwargs):
+        self.spreadsheet._call("col_values")
+        return _trim(row[col - 1] if len(row) >= col else "" for row in self.rows)
+
+    def update(self, values=None, range_name=None, **kwargs):
+        self.spreadsheet._call("update")
+        # gspread accepte aussi l'ancien ordre update(range_name, values)
+        if isinstance(values, str):
+            values, range_name = range_name, values
+        self._write(range_name or "A1", values)
+        self.spreadsheet._modified()
+
+    def batch_update(self, data, **kwargs):
+        self.spreadsheet._call("batch_update")
+        for item in data:
+            self._write(item["range"], item["values"])
+        self.spreadsheet._modified()
+
+    def insert_row(self, values, index=1, **kwargs):
+        self.spreadsheet._call("insert_row")
+        self.rows.insert(index - 1, [_cell(v) for v in values])
+        self.spreadsheet._modified()
+
+    def delete_rows(self, start_index, end_index=None):
+        self.spreadsheet._call("delete_rows")
+        del self.rows[start_index - 1:end_index or start_index]
+        self.spreadsheet._modified()
+
+    def append_row(self, values, **kwargs):
+        self.spreadsheet._call("append_row")
+        self.rows.append([_cell(v) for v in values])
+        self.spreadsheet._modified()
+
+    def append_rows(self, values, **kwargs):
+        self.spreadsheet._call("append_rows")
+        self.rows.extend([_cell(v) for v in line] for line in values)
+        self.spreadsheet._modified()
+
+class FakeSpreadsheet:
+    """Spreadsheet en mémoire.
+
+    `latency` (secondes) et `jitter` simulent le temps d'aller-retour de chaque
+    requête ; `calls` compte les requêtes par méthode. Chaque modification
+    avance la date de modification (comme l'API Drive) et `edit` simule une
+    modification faite à la main dans l'interface de Google Sheets.
+    """
+
+    def __init__(self, tabs, latency=0.0, jitter=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.calls = Counter()
+        self.lock = threading.Lock()
+        self.revision = 0
+        self.ws = {title: FakeWorksheet(self, title, rows, sheet_id)
+                   for sheet_id, (title, rows) in enumerate(tabs.items())}
+
+    def _call(self, method):
+        with self.lock:
+            self.calls[method] += 1
+            delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def reset_calls(self):
+        self.calls.clear()
+
+    def _modified(self):
+        with self.lock:
+            self.revision += 1
+
+    def edit(self, title, row, col, value):
+        """Modification manuelle d'une cellule : pas de requête API, mais la révision avance"""
+        self.ws[title]._set(row, col, value)
+        self._modified()
+
+    def get_lastUpdateTime(self):
+        self._call("get_lastUpdateTime")
+        modified = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(milliseconds=self.revision)
+        return modified.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+    def _checksums(self):
+        return [[ws.title, content_hash(_trim(row) for row in ws.rows)] for ws in self.ws.values()]
+
+    def _by_id(self, sheet_id):
+        return next(ws for ws in self.ws.values() if ws.id == sheet_id)
+
+    def _get(self, title):
+        if title not in self.ws:
+            raise APIError(_FakeResponse(400, f"Unable to parse range: {title}"))
+        return self.ws[title]
+
+    def worksheet(self, title):
+        self._call("worksheet")
+        if title not in self.ws:
+            raise WorksheetNotFound(title)
+        return self.ws[title]
+
+    def add_worksheet(self, title, rows, cols, index=None):
+        self._call("add_worksheet")
+        if title in self.ws:
+            raise APIError(_FakeResponse(400, f'A sheet with the name "{title}" already exists.'))
+        self.ws[title] = FakeWorksheet(self, title, [], max((ws.id for ws in self.ws.values()), default=-1) + 1)
+        self._modified()
+        return self.ws[title]
+
+    def worksheets(self, exclude_hidden=False):
+        self._call("worksheets")
+        return list(self.ws.values())
+
+    def fetch_sheet_metadata(self, params=None):
+        self._call("fetch_sheet_metadata")
+        return {"sheets": [{"properties": {"title": ws.title, "sheetId": ws.id, "index": i}}
+                           for i, ws in enumerate(self.ws.values())]}
+
+    def values_batch_get(self, ranges, params=None):
+        self._call("values_batch_get")
+        value_ranges = []
+        for range_name in ranges:
+            title = _tab_title(range_name)
+            if title == CHECKSUM_TAB and title not in self.ws:
+                values = self._checksums()
+            else:
+                values = self._get(title)._values(_grid_range(range_name))
+            value_ranges.append({"range": range_name, "values": values})
+        return {"valueRanges": value_ranges}
+
+    def values_batch_update(self, body):
+        self._call("values_batch_update")
+        for item in body["data"]:
+            self._get(_tab_title(item["range"]))._write(item["range"], item["values"])
+        self._modified()
+        return {"totalUpdatedCells": sum(len(line) for item in body["data"] for line in item["values"])}
+
+    def batch_update(self, body):
+        self._call("batch_update")
+        for request in body["requests"]:
+            (kind, args), = request.items()
+            if kind == "insertDimension":
+                ws = self._by_id(args["range"]["sheetId"])
+                start, end = args["range"]["startIndex"], args["range"]["endIndex"]
+                ws.rows[start:start] = [[] for _ in range(end - start)]
+            elif kind == "deleteDimension":
+                ws = self._by_id(args["range"]["sheetId"])
+                del ws.rows[args["range"]["startIndex"]:args["range"]["endIndex"]]
+            elif kind == "moveDimension":
+                ws = self._by_id(args["source"]["sheetId"])
+                start, end = args["source"]["startIndex"], args["source"]["endIndex"]
+                destination = args["destinationIndex"]
+                block = ws.rows[start:end]
+                del ws.rows[start:end]
+                if destination > start:
+                    destination -= end - start
+                ws.rows[destination:destination] = block
+            elif kind == "updateCells" and "range" in args:
+                # Sans "rows" : effacement de la plage
+                ws = self._by_id(args["range"]["sheetId"])
+                ws._clear(args["range"])
+            elif kind == "updateCells":
+                ws = self._by_id(args["start"]["sheetId"])
+                for i, line in enumerate(args["rows"]):
+                    for j, cell in enumerate(line["values"]):
+                        ws._set(args["start"]["rowIndex"] + i + 1, args["start"]["columnIndex"] + j + 1,
+                                _user_entered(cell))
+            elif kind == "appendCells":
+                ws = self._by_id(args["sheetId"])
+                # Ajout après la dernière ligne non vide
+                while ws.rows and not _trim(ws.rows[-1]):
+                    ws.rows.pop()
+                for line in args["rows"]:
+                    ws.rows.append([_user_entered(cell) for cell in line["values"]])
+            else:
+                raise NotImplementedError(kind)
+        self._modified()
+        return {"replies": [{} for _ in body["requests"]]}
+
+class FakeClient:
+    """Remplace le client renvoyé par gspread.authorize"""
+
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+
+    def open_by_key(self, key):
+        self.spreadsheet._call("open_by_key")
+        return self.spreadsheet
+
+def generate(n_levels=75, n_players=100, seed=0, latency=0.0, jitter=0.0):
+    """Spreadsheet réaliste de `n_levels` niveaux et `n_players` joueurs.
+
+    Les niveaux du haut de la liste sont les plus rarement complétés ; environ
+    deux complétions sur trois ont un enjoyment et une sur deux un rating.
+    """
+    rnd = random.Random(seed)
+    players = [f"Player{j}" for j in range(n_players)]
+    levels = [f"Level {i}" for i in range(n_levels)]
+    skills = [rnd.random() for _ in players]
+    header = [""] + players
+
+    main, le, lr = [header], [header], [header]
+    plists = [[] for _ in players]
+    lx, archive = [["Level", "Victor", "Comment", "Link"]], [["Type", "Player", "Level", "Rank", "Link", "Date"]]
+    for i, level in enumerate(levels):
+        difficulty = 1 - i / max(1, n_levels)
+        verifier = rnd.randrange(n_players)
+        marks, enjoyments, ratings = [level], [level], [level]
+        for j, skill in enumerate(skills):
+            if j == verifier:
+                mark = "⭐"
+            elif rnd.random() < 0.3 * skill * (1 - difficulty) ** 2:
+                mark = "✔"
+            else:
+                mark = "X"
+            marks.append(mark)
+            done = mark != "X"
+            enjoyments.append(str(rnd.randint(0, 100)) if done and rnd.random() < 0.66 else "")
+            ratings.append(str(rnd.randint(1, 100)) if done and rnd.random() < 0.5 else "")
+            if done:
+                plists[j].append(level)
+        main.append(marks)
+        le.append(_trim(enjoyments))
+        lr.append(_trim(ratings))
+        if i < n_levels // 4:
+            lx.append([level, players[verifier], "", f"https://youtu.be/{i}"])
+        day = f"{1 + i % 28:02d}/{1 + i % 12:02d}/{2015 + i % 10}"
+        archive.append(["Added", players[verifier], level, str(i + 1), "", day])
+        for j in range(1, n_players + 1):
+            if marks[j] == "✔":
+                archive.append(["beat", players[j - 1], level, str(i + 1), "", day])
+
+    depth = max((len(done) for done in plists), default=0)
+    players_lists = [players] + [[done[k] if k < len(done) else "" for done in plists] for k in range(depth)]
+    ranking = sorted(range(n_players), key=lambda j: -len(plists[j]))
+    leaderboard = [["#", "Player", "Points"]] + [[str(k + 1), players[j], str(len(plists[j]))]
+                                                 for k, j in enumerate(ranking)]
+    waiting = [["Level", "Player", "XD", "Placement", "Comment", "Enjoyment", "Rating", "Link", "Date"],
+               ["Pending Level", players[0], "XD", "top 10", "gg", "80", "70", "https://youtu.be/x", "01/01/2025"]]
+    infoplayer = [players, [player.lower() + "_discord" for player in players]]
+    return FakeSpreadsheet({
+        "list0": main, "LE": le, "LR": lr, "LX": lx, "archive": archive, "waitinglist": waiting,
+        "Players Lists": players_lists, "Leaderboard": leaderboard, "infoplayer": infoplayer
+    }, latency=latency, jitter=jitter, seed=seed)
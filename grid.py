@@ -0,0 +1,82 @@
+import numpy as np
+from leaderboard import COMPLETION_MARKS
+
+NAN = float("nan")
+
+def _number(value):
+    """Même règle que les moyennes de ice.py : entier ou décimal positif, sinon NaN"""
+    if value and value.replace('.', '').isdigit():
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    return NAN
+
+class _Numbers(dict):
+    """Cache texte -> _number(texte) le temps d'une construction de matrice"""
+
+    def __missing__(self, value):
+        number = self[value] = _number(value)
+        return number
+
+class CompletionMatrix:
+    """list0 en colonnes : matrice booléenne niveaux × joueurs des complétions
+    (✔ ou ⭐), fausse pour les colonnes sans nom de joueur"""
+
+    def __init__(self, rows):
+        header = rows[0] if rows else []
+        self.players = list(header[1:])
+        self.levels = [line[0] if line else "" for line in rows[1:]]
+        width = len(self.players)
+        # Remplissage ligne par ligne (None au-delà de la ligne), puis les marques
+        # sont comparées sur toute la grille
+        cells = np.empty((len(self.levels), width), dtype=object)
+        for i, line in enumerate(rows[1:]):
+            values = line[1:width + 1]
+            cells[i, :len(values)] = values
+        named = np.array([bool(player) for player in self.players], dtype=bool)
+        self.completed = np.logical_or.reduce([cells == mark for mark in COMPLETION_MARKS]) & named
+
+    def level_players(self):
+        """Pour chaque niveau (ligne), l'ensemble des joueurs qui l'ont complété"""
+        players = np.array(self.players, dtype=object)
+        return [set(players[line].tolist()) for line in self.completed]
+
+class RatingMatrix:
+    """Onglet de notes (LE ou LR) en colonnes : matrice float32 niveaux × joueurs,
+    NaN pour les cellules vides ou non numériques"""
+
+    def __init__(self, rows):
+        header = rows[0] if rows else []
+        self.players = list(header[1:])
+        self.levels = [line[0] if line else "" for line in rows[1:]]
+        width = len(self.players)
+        # Peu de valeurs distinctes (notes de 1 à 100) : chaque texte n'est analysé qu'une fois,
+        # puis toute la grille est convertie en un seul tableau
+        numbers = _Numbers()
+        values = [list(map(numbers.__getitem__, line[1:width + 1])) + [NAN] * (width + 1 - max(len(line), 1))
+                  for line in rows[1:]]
+        self.values = np.array(values, dtype=np.float32).reshape(len(self.levels), width)
+
+    def totals(self, axis):
+        """Somme et nombre des notes par niveau (axis=1) ou par joueur (axis=0)"""
+        valid = ~np.isnan(self.values)
+        return np.where(valid, self.values, 0).sum(axis=axis, dtype=np.float64), valid.sum(axis=axis)
+
+    def player_extremes(self):
+        """Pour chaque joueur : (indice, valeur) de la note max et de la note min.
+
+        Seuls les niveaux nommés comptent ; à égalité, le premier niveau l'emporte.
+        L'indice vaut -1 si le joueur n'a aucune note.
+        """
+        if not self.levels:
+            none = np.full(len(self.players), -1)
+            return none, np.full(len(self.players), -np.inf), none, np.full(len(self.players), np.inf)
+        named = np.array([bool(level) for level in self.levels], dtype=bool)[:, None]
+        valid = ~np.isnan(self.values) & named
+        has_any = valid.any(axis=0)
+        high = np.where(valid, self.values, -np.inf)
+        low = np.where(valid, self.values, np.inf)
+        best = np.where(has_any, high.argmax(axis=0), -1)
+        worst = np.where(has_any, low.argmin(axis=0), -1)
+        return best, high.max(axis=0), worst, low.min(axis=0)
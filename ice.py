@@ -1,10 +1,30 @@
-import os, json
+import os, json, math, re
 from dotenv import load_dotenv
 from operator import add
 import gspread
 from google.oauth2.service_account import Credentials
 from datetime import datetime
 import time
+import asyncio
+import contextvars
+import functools
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from mirror import SheetMirror
+from scheduler import RequestScheduler, UncertainWriteError
+from journal import WriteJournal
+from leaderboard import Leaderboard, COMPLETION_MARKS, points_for_rank
+from names import NameIndex
+from archive import ArchiveLog
+from metrics import metrics
+from changes import ChangeDetector, source_from_config
+from completions import COMPLETIONS_HEADER, records_from_grid, grid_from_records, render_grid
+try:
+    from grid import CompletionMatrix, RatingMatrix
+except ImportError:
+    # NumPy absent : les statistiques et le classement sont calculés en Python pur
+    CompletionMatrix = RatingMatrix = None
 
 load_dotenv() 
 
@@ -18,68 +38,1012 @@ TABS = {
     "WAITING": "waitinglist",
     "LX": "LX",
     "PLAYERS_LIST": "Players Lists",
-    "LEADERBOARD": "Leaderboard"
+    "LEADERBOARD": "Leaderboard",
+    "INFOPLAYER": "infoplayer",
+    "COMPLETIONS": "completions"
 }
 
-class GoogleSheet:
+# Onglets calculés par formules à partir d'un autre onglet
+DEPENDENT_TABS = {
+    "MAIN": ["PLAYERS_LIST", "LEADERBOARD"]
+}
+
+# Durée de vie (secondes) d'un onglet en cache avant relecture
+CACHE_TTL = float(os.getenv("SHEETS_CACHE_TTL", "60"))
+
+# Miroir local SQLite (optionnel) : chemin du fichier et intervalle de synchronisation
+MIRROR_PATH = os.getenv("ICE_MIRROR_PATH")
+MIRROR_SYNC_INTERVAL = float(os.getenv("ICE_MIRROR_SYNC_INTERVAL", "120"))
+MIRROR_TABS = ["MAIN", "LE", "LR", "LX", "ARCHIVE", "WAITING", "PLAYERS_LIST", "LEADERBOARD", "INFOPLAYER"]
+
+# Détection des modifications, y compris celles faites à la main dans le Sheet :
+# "modified" (date de modification Drive) ou "checksum:<plage>" (voir changes.py).
+# Vide : les onglets sont simplement relus après CACHE_TTL
+CHANGE_SOURCE = os.getenv("ICE_CHANGE_SOURCE", "")
+# Source utilisée quand la principale ne répond pas (ex. "checksum:<plage>" derrière "modified")
+CHANGE_FALLBACK = os.getenv("ICE_CHANGE_FALLBACK", "")
+CHANGE_POLL_INTERVAL = float(os.getenv("ICE_CHANGE_POLL_INTERVAL", "15"))
+
+# Stockage des complétions : "list0" (grille niveaux × joueurs remplie de "X") ou
+# "sparse" (une ligne par complétion dans l'onglet completions, voir completions.py).
+# En "sparse", le bot ne lit plus de list0 que l'ordre des niveaux (colonne A) et les
+# joueurs (ligne 1) ; chaque écriture garde sa grille rendue pour les formules qui la
+# lisent (Leaderboard, Players Lists), completions.py render la régénère en entier
+COMPLETIONS_STORE = os.getenv("ICE_COMPLETIONS_STORE", "list0")
+
+# Journal des écritures différées (chaîne vide pour écrire directement dans le Sheet)
+JOURNAL_PATH = os.getenv("ICE_JOURNAL_PATH", "write_journal.jsonl")
+JOURNAL_FLUSH_DELAY = 2    # secondes d'attente pour regrouper les écritures proches
+JOURNAL_RETRY_DELAY = 30   # secondes avant de retenter un envoi en échec
+
+# Quotas de l'API Google Sheets (requêtes par minute)
+SHEETS_READ_QUOTA = int(os.getenv("SHEETS_READ_QUOTA", "60"))
+SHEETS_WRITE_QUOTA = int(os.getenv("SHEETS_WRITE_QUOTA", "60"))
+SHEETS_TOTAL_QUOTA = int(os.getenv("SHEETS_TOTAL_QUOTA", "300"))
+
+# Pool de threads pour les appels Google Sheets depuis la boucle asyncio
+SHEETS_MAX_WORKERS = 4
+SHEETS_TIMEOUT = 30  # secondes par appel
+
+def _trim(values):
+    """Supprime les cellules vides en fin de liste (comme row_values/col_values)"""
+    end = len(values)
+    while end and values[end - 1] == "":
+        end -= 1
+    return values[:end]
+
+def _a1_tab(title):
+    """Nom d'onglet utilisable comme plage A1 (onglet entier)"""
+    return "'" + title.replace("'", "''") + "'"
+
+def normalize_level_name(level_name):
+    """Normalise le nom du niveau (supprime les espaces en trop et convertit en minuscules)"""
+    return ' '.join(level_name.lower().split())
+
+# Numéros de version des onglets en mémoire : uniques, changent à chaque modification
+_tab_versions = itertools.count(1)
+
+def _stat_value(value):
+    """Valeur numérique d'une note (enjoyment/rating), ou None si la cellule n'en est pas une"""
+    if value and value.replace('.', '').isdigit():
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+class LevelStats:
+    """Agrégats d'une ligne de niveau : nombre de ✔, somme et nombre des notes,
+    colonne du ⭐ (verifier). Tenus à jour cellule par cellule par TabData."""
+
+    def __init__(self, line):
+        self.line = line
+        self.completions = 0
+        self.total = 0.0
+        self.count = 0
+        self.verifier_col = None
+        for col, value in enumerate(line[1:], start=2):
+            self._add(col, value)
+
+    def _add(self, col, value):
+        if value == "✔":
+            self.completions += 1
+        elif value == "⭐" and (self.verifier_col is None or col < self.verifier_col):
+            self.verifier_col = col
+        number = _stat_value(value)
+        if number is not None:
+            self.total += number
+            self.count += 1
+
+    def update(self, col, old, new):
+        """La cellule `col` de la ligne passe de `old` à `new`"""
+        if old == "✔":
+            self.completions -= 1
+        number = _stat_value(old)
+        if number is not None:
+            self.total -= number
+            self.count -= 1
+        if old == "⭐" and col == self.verifier_col:
+            # L'ancien verifier disparaît : on cherche un autre ⭐ sur la ligne
+            self.verifier_col = next((idx for idx, cell in enumerate(self.line[1:], start=2)
+                                      if cell == "⭐" and idx != col), None)
+        self._add(col, new)
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else 0
+
+class PlayerStats:
+    """Statistiques d'une colonne joueur de LE ou LR : moyenne, meilleur et pire niveau"""
+
     def __init__(self):
+        self.total = 0.0
+        self.count = 0
+        self.best = ("Aucun", 0)
+        self.worst = ("Aucun", 101)  # Plus que le maximum possible
+
+    def add(self, level, value):
+        number = _stat_value(value)
+        if number is not None:
+            self.total += number
+            self.count += 1
+        if number is None or not level:
+            return
+        if number > self.best[1]:
+            self.best = (level, number)
+        if number < self.worst[1]:
+            self.worst = (level, number)
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else 0
+
+class TabData:
+    """Contenu d'un onglet en mémoire (lignes de longueurs variables).
+
+    Les index de recherche (niveau -> ligne, joueur -> colonne, ...) sont
+    construits à la première utilisation puis tenus à jour par les méthodes
+    de modification ci-dessous.
+    """
+
+    def __init__(self, name, rows):
+        self.name = name
+        self.rows = rows
+        self.version = next(_tab_versions)
+        self._level_rows = None     # nom de niveau normalisé -> ligne (1-based)
+        self._level_dupes = False   # doublons dans la colonne A
+        self._player_cols = None    # nom de joueur -> colonne (1-based)
+        self._row_maps = {}         # (ligne clé, ligne valeur) -> {clé en minuscules: valeur}
+        self._level_stats = None    # nom de niveau normalisé -> LevelStats
+        self._archive = None        # ArchiveLog (onglet archive) : index par niveau, joueur et type
+        self._player_stats = None   # nom de joueur -> PlayerStats
+        self._matrices = {}         # classe de matrice (grid.py) -> matrice construite
+        self._leaderboard = None    # Leaderboard calculé depuis les complétions (list0)
+
+    def row(self, row):
+        """Équivalent de row_values(row)"""
+        return _trim(list(self.rows[row - 1])) if row <= len(self.rows) else []
+
+    def col(self, col):
+        """Équivalent de col_values(col)"""
+        return _trim([line[col - 1] if len(line) >= col else "" for line in self.rows])
+
+    def cell(self, row, col):
+        if row > len(self.rows) or col > len(self.rows[row - 1]):
+            return ""
+        return self.rows[row - 1][col - 1]
+
+    @property
+    def header(self):
+        return self.row(1)
+
+    # --- Index ---
+
+    def find_level(self, level_name):
+        """Ligne (1-based) du niveau dans la colonne A, ou None"""
+        if self._level_rows is None:
+            self._level_rows, self._level_dupes = {}, False
+            for idx, line in enumerate(self.rows, start=1):
+                key = normalize_level_name(line[0] if line else "")
+                if key in self._level_rows:
+                    self._level_dupes = True
+                else:
+                    self._level_rows[key] = idx
+        return self._level_rows.get(normalize_level_name(level_name))
+
+    def find_player(self, player_name):
+        """Colonne (1-based) du joueur dans la ligne d'en-tête, ou None"""
+        if self._player_cols is None:
+            self._player_cols = {}
+            for idx, name in enumerate(self.row(1), start=1):
+                self._player_cols.setdefault(name, idx)
+        return self._player_cols.get(player_name)
+
+    def row_map(self, key_row, value_row):
+        """Dictionnaire {cellule de key_row en minuscules: cellule de value_row}"""
+        mapping = self._row_maps.get((key_row, value_row))
+        if mapping is None:
+            keys, values = self.row(key_row), self.row(value_row)
+            mapping = {}
+            for idx, key in enumerate(keys):
+                if idx < len(values):
+                    mapping.setdefault(key.lower(), values[idx])
+            self._row_maps[(key_row, value_row)] = mapping
+        return mapping
+
+    def level_stats(self, level_name):
+        """Agrégats (LevelStats) de la ligne du niveau, ou None"""
+        if self._level_stats is None:
+            self._level_stats = {}
+            for line in self.rows:
+                key = normalize_level_name(line[0] if line else "")
+                if key not in self._level_stats:
+                    self._level_stats[key] = LevelStats(line)
+        return self._level_stats.get(normalize_level_name(level_name))
+
+    def archive(self):
+        """Vue journal (ArchiveLog) de l'onglet archive, tenue à jour par les ajouts en fin d'onglet"""
+        if self._archive is None:
+            self._archive = ArchiveLog(self.rows, key=normalize_level_name)
+        return self._archive
+
+    def player_stats(self, player_name):
+        """Statistiques (PlayerStats) de la colonne du joueur, ou None.
+
+        Toutes les colonnes sont calculées en un seul passage sur les lignes ;
+        le résultat est conservé jusqu'à la prochaine modification de l'onglet.
+        """
+        if self._player_stats is None:
+            self.find_player(player_name)  # construit l'index des colonnes
+            if RatingMatrix is not None:
+                columns = self._player_stats_from_matrix()
+            else:
+                columns = {}
+                for line in self.rows[1:]:
+                    level = line[0] if line else ""
+                    for col, value in enumerate(line[1:], start=2):
+                        if value:
+                            columns.setdefault(col, PlayerStats()).add(level, value)
+            self._player_stats = {name: columns.get(col) or PlayerStats()
+                                  for name, col in self._player_cols.items()}
+        return self._player_stats.get(player_name)
+
+    def _player_stats_from_matrix(self):
+        """Même calcul que player_stats, par réductions NumPy sur toutes les colonnes"""
+        matrix = self.matrix(RatingMatrix)
+        totals, counts = matrix.totals(axis=0)
+        best, high, worst, low = matrix.player_extremes()
+        columns = {}
+        for j in range(len(matrix.players)):
+            stats = PlayerStats()
+            stats.total, stats.count = float(totals[j]), int(counts[j])
+            if best[j] >= 0 and high[j] > stats.best[1]:
+                stats.best = (matrix.levels[best[j]], float(high[j]))
+            if worst[j] >= 0 and low[j] < stats.worst[1]:
+                stats.worst = (matrix.levels[worst[j]], float(low[j]))
+            columns[j + 2] = stats
+        return columns
+
+    def leaderboard(self, curve=points_for_rank):
+        """Classement (Leaderboard) calculé depuis cet onglet, tenu à jour par les modifications"""
+        if self._leaderboard is None or self._leaderboard.curve is not curve:
+            if CompletionMatrix is not None:
+                levels = self.matrix(CompletionMatrix).level_players()
+                self._leaderboard = Leaderboard.from_levels(levels, curve)
+            else:
+                self._leaderboard = Leaderboard.from_rows(self.rows, curve)
+        return self._leaderboard
+
+    def matrix(self, kind):
+        """Vue en colonnes de l'onglet (CompletionMatrix, RatingMatrix), gardée jusqu'à
+        la prochaine modification. Nécessite NumPy."""
+        if kind not in self._matrices:
+            self._matrices[kind] = kind(self.rows)
+        return self._matrices[kind]
+
+    # --- Modifications (tiennent les index à jour) ---
+
+    def set_cell(self, row, col, value):
+        self.version = next(_tab_versions)
+        while len(self.rows) < row:
+            self.rows.append([])
+        line = self.rows[row - 1]
+        while len(line) < col:
+            line.append("")
+        old = line[col - 1]
+        line[col - 1] = "" if value is None else str(value)
+        if self._leaderboard is not None:
+            self._leaderboard.resize(len(self.rows) - 1)
+            if row == 1:
+                self._leaderboard = None
+            elif col > 1 and (old in COMPLETION_MARKS) != (line[col - 1] in COMPLETION_MARKS):
+                player = self.cell(1, col)
+                if player and self.rows[0].count(player) > 1:
+                    # Joueur présent sur plusieurs colonnes : reconstruction
+                    self._leaderboard = None
+                elif player:
+                    self._leaderboard.set_completion(row - 1, player, line[col - 1] in COMPLETION_MARKS)
+        # Seules les cellules d'en-tête ou de nom de niveau touchent aux index
+        if col == 1:
+            self._level_rows = None
+            self._level_stats = None
+        elif self._level_stats is not None:
+            stats = self._level_stats.get(normalize_level_name(line[0]))
+            if stats is not None and stats.line is line:
+                stats.update(col, old, line[col - 1])
+        if row == 1:
+            self._player_cols = None
+        self._row_maps = {k: v for k, v in self._row_maps.items() if row not in k}
+        self._archive = None
+        self._player_stats = None
+        self._matrices = {}
+
+    def insert_row(self, row, values):
+        self.version = next(_tab_versions)
+        self.rows.insert(row - 1, list(values))
+        if self._leaderboard is not None:
+            if row == 1:
+                self._leaderboard = None
+            else:
+                header = self.rows[0]
+                self._leaderboard.insert_level(row - 1, {header[col] for col in range(1, min(len(values), len(header)))
+                                                         if header[col] and values[col] in COMPLETION_MARKS})
+        if self._level_rows is not None and not self._level_dupes:
+            for key, idx in self._level_rows.items():
+                if idx >= row:
+                    self._level_rows[key] = idx + 1
+            key = normalize_level_name(values[0] if values else "")
+            if key in self._level_rows:
+                # Doublon : l'index sera reconstruit à la prochaine recherche
+                self._level_rows = None
+            else:
+                self._level_rows[key] = row
+        else:
+            self._level_rows = None
+        if self._level_stats is not None:
+            key = normalize_level_name(values[0] if values else "")
+            if key in self._level_stats:
+                # Doublon : le premier des deux dépend des positions, on reconstruira
+                self._level_stats = None
+            else:
+                self._level_stats[key] = LevelStats(self.rows[row - 1])
+        if self._archive is not None:
+            if row == len(self.rows):
+                # Ajout en fin d'onglet : les lignes existantes ne bougent pas
+                self._archive.append(row, self.rows[row - 1])
+            else:
+                self._archive = None
+        self._reset_row_indexes(row)
+
+    def delete_row(self, row):
+        if row > len(self.rows):
+            return
+        self.version = next(_tab_versions)
+        line = self.rows.pop(row - 1)
+        if self._leaderboard is not None:
+            if row == 1:
+                self._leaderboard = None
+            else:
+                self._leaderboard.remove_level(row - 1)
+        dupes = self._level_rows is None or self._level_dupes
+        if not dupes:
+            self._level_rows.pop(normalize_level_name(line[0] if line else ""), None)
+            for key, idx in self._level_rows.items():
+                if idx > row:
+                    self._level_rows[key] = idx - 1
+        else:
+            self._level_rows = None
+        if self._level_stats is not None:
+            if dupes:
+                self._level_stats = None
+            else:
+                self._level_stats.pop(normalize_level_name(line[0] if line else ""), None)
+        self._archive = None
+        self._reset_row_indexes(row)
+
+    def move_row(self, row, new_row):
+        if row > len(self.rows) or row == new_row:
+            return
+        self.version = next(_tab_versions)
+        line = self.rows.pop(row - 1)
+        self.rows.insert(new_row - 1, line)
+        if self._leaderboard is not None:
+            if min(row, new_row) == 1:
+                self._leaderboard = None
+            else:
+                self._leaderboard.move_level(row - 1, new_row - 1)
+        if self._level_rows is not None and not self._level_dupes:
+            low, high = min(row, new_row), max(row, new_row)
+            shift = -1 if new_row > row else 1
+            for key, idx in self._level_rows.items():
+                if low <= idx <= high:
+                    self._level_rows[key] = idx + shift
+            self._level_rows[normalize_level_name(line[0] if line else "")] = new_row
+        else:
+            # Avec des doublons, l'ordre des lignes décide laquelle est indexée
+            self._level_rows = None
+            self._level_stats = None
+        self._archive = None
+        self._reset_row_indexes(min(row, new_row))
+
+    def _reset_row_indexes(self, row):
+        """Les index par ligne ne survivent pas à un décalage des lignes concernées"""
+        if row == 1:
+            self._player_cols = None
+        self._row_maps = {k: v for k, v in self._row_maps.items() if max(k) < row}
+        self._player_stats = None
+        self._matrices = {}
+
+class Snapshot:
+    """Ensemble d'onglets lus ensemble, accessibles par leur clé dans TABS"""
+
+    def __init__(self, tabs):
+        self.tabs = tabs  # clé de TABS -> TabData
+
+    def __getitem__(self, name):
+        return self.tabs[name]
+
+    def __contains__(self, name):
+        return name in self.tabs
+
+class SheetCache:
+    """Cache mémoire des onglets : chaque onglet est lu en entier une fois,
+    puis servi depuis la mémoire pendant `ttl` secondes"""
+
+    def __init__(self, ttl=CACHE_TTL):
+        self.ttl = ttl
+        self.lock = threading.RLock()
+        self.tabs = {}  # nom de l'onglet -> (date de lecture, TabData)
+        self.generations = {}  # nom de l'onglet -> nombre de modifications locales
+
+    def get(self, tab):
+        with self.lock:
+            entry = self.tabs.get(tab)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                metrics.incr("cache_misses", tab)
+                return None
+            metrics.incr("cache_hits", tab)
+            return entry[1]
+
+    def peek(self, tab):
+        """Dernière version connue d'un onglet, même expirée (None si jamais lu ou invalidé)"""
+        with self.lock:
+            entry = self.tabs.get(tab)
+            return entry[1] if entry is not None else None
+
+    def generation(self, tab):
+        with self.lock:
+            return self.generations.get(tab, 0)
+
+    def put(self, tab, data, generation=None):
+        """Met un onglet en cache.
+
+        Si `generation` est fournie, l'onglet n'est remplacé que s'il n'a pas
+        été modifié localement depuis (lecture lancée avant une écriture).
+        """
+        with self.lock:
+            if generation is not None and generation != self.generations.get(tab, 0):
+                return False
+            self.tabs[tab] = (time.monotonic(), data)
+            return True
+
+    def renew(self, *tabs):
+        """Prolonge les onglets en cache dont on sait qu'ils n'ont pas changé"""
+        with self.lock:
+            now = time.monotonic()
+            for tab in tabs:
+                entry = self.tabs.get(tab)
+                if entry is not None:
+                    self.tabs[tab] = (now, entry[1])
+
+    def invalidate(self, *tabs):
+        with self.lock:
+            for tab in tabs:
+                self.tabs.pop(tab, None)
+                self.generations[tab] = self.generations.get(tab, 0) + 1
+
+    def touch(self, *tabs):
+        """Signale une écriture distante : les lectures lancées avant sont écartées"""
+        with self.lock:
+            for tab in tabs:
+                self.generations[tab] = self.generations.get(tab, 0) + 1
+
+    def patch(self, tab, func):
+        """Applique func au TabData d'un onglet déjà en cache"""
+        with self.lock:
+            self.generations[tab] = self.generations.get(tab, 0) + 1
+            entry = self.tabs.get(tab)
+            if entry is not None:
+                func(entry[1])
+
+    def set_cell(self, tab, row, col, value):
+        """Met à jour une cellule (indices 1-based) d'un onglet déjà en cache"""
+        self.patch(tab, lambda data: data.set_cell(row, col, value))
+
+_NUMBER = re.compile(r"-?[0-9]+(\.[0-9]+)?\Z")
+
+def _cell_data(value, user_entered=True):
+    """Convertit une valeur Python en CellData pour une requête updateCells.
+
+    Avec user_entered, les nombres et formules écrits sous forme de texte sont
+    interprétés comme le ferait value_input_option="USER_ENTERED".
+    """
+    if isinstance(value, bool):
+        return {"userEnteredValue": {"boolValue": value}}
+    if isinstance(value, float) and not math.isfinite(value):
+        # NaN/inf ne sont pas du JSON valide : tout le batch_update serait rejeté
+        return {"userEnteredValue": {"stringValue": str(value)}}
+    if isinstance(value, (int, float)):
+        return {"userEnteredValue": {"numberValue": value}}
+    value = "" if value is None else str(value)
+    if user_entered:
+        if value.startswith("="):
+            return {"userEnteredValue": {"formulaValue": value}}
+        # Seuls les nombres décimaux simples ("12", "-3.5") : ni "1e3", ni "1_000", ni "NaN"
+        if _NUMBER.match(value) and math.isfinite(float(value)):
+            return {"userEnteredValue": {"numberValue": float(value)}}
+    return {"userEnteredValue": {"stringValue": value}}
+
+def _apply_entry(data, entry):
+    """Rejoue une écriture du journal sur un onglet en mémoire"""
+    if entry["op"] == "cell":
+        level_row = data.find_level(entry["level"])
+        player_col = data.find_player(entry["player"])
+        if level_row and player_col:
+            data.set_cell(level_row, player_col, entry["value"])
+    else:
+        line = ["" if v is None else str(v) for v in entry["values"]]
+        row = entry["row"] if entry["op"] == "insert" else len(data.rows) + 1
+        data.insert_row(row, line)
+
+class WriteBatch:
+    """Regroupe des modifications structurelles sur plusieurs onglets.
+
+    Les requêtes sont envoyées en un seul spreadsheet.batch_update, que l'API
+    applique de façon atomique. Le cache est ensuite mis à jour à l'identique.
+    Les numéros de ligne sont 1-based, comme dans gspread.
+    """
+
+    def __init__(self, google_sheet):
+        self.google_sheet = google_sheet
+        self.requests = []
+        self.patches = []  # (onglet, fonction appliquée au TabData en cache)
+
+    def _sheet_id(self, tab):
+        return self.google_sheet.get_ws(tab).id
+
+    def insert_row(self, tab, values, row, user_entered=True):
+        sheet_id = self._sheet_id(tab)
+        self.requests.append({"insertDimension": {
+            "range": {"sheetId": sheet_id, "dimension": "ROWS", "startIndex": row - 1, "endIndex": row},
+            "inheritFromBefore": False
+        }})
+        self.requests.append({"updateCells": {
+            "rows": [{"values": [_cell_data(v, user_entered) for v in values]}],
+            "fields": "userEnteredValue",
+            "start": {"sheetId": sheet_id, "rowIndex": row - 1, "columnIndex": 0}
+        }})
+        line = ["" if v is None else str(v) for v in values]
+        self.patches.append((tab, lambda data: data.insert_row(row, line)))
+
+    def delete_row(self, tab, row):
+        self.requests.append({"deleteDimension": {
+            "range": {"sheetId": self._sheet_id(tab), "dimension": "ROWS", "startIndex": row - 1, "endIndex": row}
+        }})
+        self.patches.append((tab, lambda data: data.delete_row(row)))
+
+    def move_row(self, tab, row, new_row):
+        """Déplace la ligne `row` pour qu'elle se retrouve en position `new_row`"""
+        if row == new_row:
+            return
+        # destinationIndex s'exprime avant le retrait de la ligne source
+        destination = new_row - 1 if new_row < row else new_row
+        self.requests.append({"moveDimension": {
+            "source": {"sheetId": self._sheet_id(tab), "dimension": "ROWS", "startIndex": row - 1, "endIndex": row},
+            "destinationIndex": destination
+        }})
+        self.patches.append((tab, lambda data: data.move_row(row, new_row)))
+
+    def set_cell(self, tab, row, col, value, user_entered=True):
+        self.requests.append({"updateCells": {
+            "rows": [{"values": [_cell_data(value, user_entered)]}],
+            "fields": "userEnteredValue",
+            "start": {"sheetId": self._sheet_id(tab), "rowIndex": row - 1, "columnIndex": col - 1}
+        }})
+        self.patches.append((tab, lambda data: data.set_cell(row, col, value)))
+
+    def record_completion(self, row, col, level_name, player_name, mark):
+        """Stockage creux : ajoute (niveau, joueur, marque) à l'onglet completions.
+
+        La cellule de list0 est réécrite telle que rendue (✔, ⭐ ou "X") dans le même
+        batch : les formules qui lisent la grille (Leaderboard, Players Lists) suivent.
+        """
+        self.requests.append({"appendCells": {
+            "sheetId": self._sheet_id("COMPLETIONS"),
+            "rows": [{"values": [_cell_data(v, False) for v in (level_name, player_name, mark)]}],
+            "fields": "userEnteredValue"
+        }})
+        self.requests.append({"updateCells": {
+            "rows": [{"values": [_cell_data(mark if mark in COMPLETION_MARKS else "X", False)]}],
+            "fields": "userEnteredValue",
+            "start": {"sheetId": self._sheet_id("MAIN"), "rowIndex": row - 1, "columnIndex": col - 1}
+        }})
+        self.patches.append(("MAIN", lambda data: data.set_cell(row, col, mark)))
+
+    def append_row(self, tab, values, user_entered=True):
+        """Ajoute une ligne après la dernière ligne remplie (comme append_row)"""
+        self.requests.append({"appendCells": {
+            "sheetId": self._sheet_id(tab),
+            "rows": [{"values": [_cell_data(v, user_entered) for v in values]}],
+            "fields": "userEnteredValue"
+        }})
+        line = ["" if v is None else str(v) for v in values]
+        self.patches.append((tab, lambda data: data.insert_row(len(data.rows) + 1, line)))
+
+    def commit(self, apply_patches=True):
+        """Envoie le lot ; apply_patches=False si le cache reflète déjà ces écritures"""
+        if not self.requests:
+            return
+        tabs = {tab for tab, _ in self.patches}
+        try:
+            # Insertions, suppressions, déplacements et ajouts ne doivent pas partir deux fois
+            idempotent = all("updateCells" in request for request in self.requests)
+            self.google_sheet._api("write", self.google_sheet.sheet.batch_update, {"requests": self.requests},
+                                   idempotent=idempotent)
+        except Exception:
+            if apply_patches:
+                # Par sécurité, les onglets concernés seront relus
+                self.google_sheet._invalidate(*tabs)
+            raise
+        if apply_patches:
+            for tab, patch in self.patches:
+                self.google_sheet.cache.patch(tab, patch)
+        else:
+            self.google_sheet.cache.touch(*tabs)
+        for tab in tabs:
+            for dependent in DEPENDENT_TABS.get(tab, []):
+                self.google_sheet.cache.invalidate(dependent)
+
+@metrics.instrument
+class GoogleSheet:
+    def __init__(self, cache_ttl=CACHE_TTL, mirror_path=MIRROR_PATH, journal_path=JOURNAL_PATH,
+                 points_curve=None, client=None, change_source=CHANGE_SOURCE,
+                 completions_store=COMPLETIONS_STORE, change_fallback=CHANGE_FALLBACK):
+        # Rang -> points pour calculer le leaderboard localement. None : l'onglet Leaderboard
+        # (formules du Sheet) reste la référence ; ne passer une courbe qu'une fois
+        # leaderboard_mismatches(courbe) vide sur les données réelles
+        self.points_curve = points_curve
+        if completions_store not in ("list0", "sparse"):
+            raise ValueError(f"Stockage des complétions inconnu: {completions_store}")
+        self.sparse = completions_store == "sparse"
+        self.mirror = None
+        source = source_from_config(change_source) if isinstance(change_source, str) else change_source
+        fallback = source_from_config(change_fallback) if isinstance(change_fallback, str) else change_fallback
+        self.changes = ChangeDetector(source, fallback) if source else None
+        if self.changes:
+            # Les onglets inchangés sont prolongés à chaque contrôle : le TTL n'est qu'un filet de sécurité
+            cache_ttl = max(cache_ttl, 3 * CHANGE_POLL_INTERVAL)
+        if mirror_path:
+            # Le cache est rafraîchi par la synchronisation : il peut vivre plus longtemps
+            cache_ttl = max(cache_ttl, 3 * MIRROR_SYNC_INTERVAL)
+            self.mirror = SheetMirror(mirror_path)
+        self.cache = SheetCache(cache_ttl)
+        self.journal = WriteJournal(journal_path) if journal_path else None
+        self.journal_lock = threading.RLock()
+        self.name_indexes = {}  # "levels"/"players" -> (version de list0, NameIndex)
+        if self.mirror:
+            # Les lectures sont servies depuis le miroir avant même la première synchronisation
+            for tab in MIRROR_TABS:
+                rows = self.mirror.load(tab)
+                if rows is not None:
+                    self.cache.put(tab, self._overlay_pending(TabData(tab, rows)))
+
+        self.scheduler = RequestScheduler(SHEETS_READ_QUOTA, SHEETS_WRITE_QUOTA, SHEETS_TOTAL_QUOTA)
+
         self.scopes = ['https://www.googleapis.com/auth/spreadsheets']
-        self.service_account_info = json.loads(os.getenv("GOOGLE_CREDENTIALS"))
-        self.credentials = Credentials.from_service_account_info(self.service_account_info, scopes=self.scopes)
-        self.client = gspread.authorize(self.credentials)
-        self.sheet = self.client.open_by_key(SHEET_ID)
+        if self.changes:
+            self.scopes += self.changes.scopes
+        # Connexion ouverte au premier besoin (ou par warm_up) : l'import reste instantané.
+        # Un client déjà authentifié peut être fourni (ex. fake_gspread pour bench.py)
+        self.client = client
+        self._sheet = None
+        self.connect_lock = threading.Lock()
+        self.worksheets = {}  # titre de l'onglet -> Worksheet
+        self.worksheets_lock = threading.Lock()
+        self.mirror_stop = threading.Event()
+        if self.mirror:
+            self.start_mirror_sync()
+        self.changes_stop = threading.Event()
+        if self.changes:
+            self.start_change_polling()
+        self.journal_event = threading.Event()
+        self.journal_stop = threading.Event()
+        if self.journal:
+            self.start_write_behind()
+
+    def connect(self):
+        """Authentification et ouverture du Sheet (une seule fois)"""
+        with self.connect_lock:
+            if self._sheet is not None:
+                return
+            if self.client is None:
+                service_account_info = json.loads(os.getenv("GOOGLE_CREDENTIALS"))
+                credentials = Credentials.from_service_account_info(service_account_info, scopes=self.scopes)
+                self.client = gspread.authorize(credentials)
+            # La liste des onglets est chargée au premier get_ws
+            self._sheet = self._api("read", self.client.open_by_key, SHEET_ID)
+
+    @property
+    def sheet(self):
+        if self._sheet is None:
+            self.connect()
+        return self._sheet
+
+    def warm_up(self, tabs=MIRROR_TABS):
+        """Ouvre la connexion et charge tous les onglets en une lecture groupée"""
+        self.connect()
+        self.snapshot(tabs)
+
+    def refresh_worksheets(self):
+        """Recharge tous les onglets en une seule requête de métadonnées"""
+        with self.worksheets_lock:
+            self.worksheets = {ws.title: ws for ws in self._api("read", self.sheet.worksheets)}
+
+    def _api(self, lane, func, *args, **kwargs):
+        """Point de passage de tous les appels à l'API : quotas, priorités et nouvelles tentatives"""
+        metrics.incr("sheets_api_calls", lane)
+        metrics.count_sheets_call()
+        start = time.perf_counter()
+        try:
+            return self.scheduler.call(lane, func, *args, **kwargs)
+        finally:
+            metrics.observe("sheets_api_seconds", lane, time.perf_counter() - start)
 
     def get_ws(self, name):
-        return self.sheet.worksheet(TABS[name])
+        title = TABS[name]
+        ws = self.worksheets.get(title)
+        if ws is None:
+            # Onglet absent ou renommé depuis le dernier chargement
+            self.refresh_worksheets()
+            ws = self.worksheets.get(title)
+            if ws is None:
+                raise gspread.exceptions.WorksheetNotFound(title)
+        return ws
+
+    # --- Lecture via le cache ---
+
+    def snapshot(self, tabs):
+        """Retourne les onglets demandés (clés de TABS).
+
+        Les onglets absents du cache sont tous lus en une seule requête
+        values_batch_get, puis mis en cache.
+        """
+        loaded = {tab: self.cache.get(tab) for tab in tabs}
+        missing = [tab for tab, data in loaded.items() if data is None]
+        if missing:
+            generations = {tab: self.cache.generation(tab) for tab in missing}
+            try:
+                fetched = self._fetch(missing)
+            except Exception:
+                fetched = self._load_from_mirror(missing)
+                if fetched is None:
+                    raise
+            for tab, rows in fetched.items():
+                data = self._overlay_pending(TabData(tab, rows))
+                # Pas de mise en cache si une écriture a eu lieu pendant la lecture
+                if self.cache.put(tab, data, generation=generations[tab]) and self.changes:
+                    self.changes.remember(tab, rows)
+                loaded[tab] = data
+        return Snapshot(loaded)
+
+    def _fetch(self, tabs, lane="read"):
+        """Lit des onglets en une requête values_batch_get : {onglet: lignes}"""
+        try:
+            response = self._batch_get(tabs, lane)
+        except gspread.exceptions.APIError as e:
+            if e.code != 400:
+                raise
+            # Plage invalide : un onglet a probablement été renommé
+            self.refresh_worksheets()
+            response = self._batch_get(tabs, lane)
+        return {tab: self._assemble(tab, parts) for tab, parts in response.items()}
+
+    def _batch_get(self, tabs, lane="read"):
+        """Lit toutes les plages des onglets en une requête : {onglet: [valeurs de chaque plage]}"""
+        ranges = [self._ranges(tab) for tab in tabs]
+        response = self._api(lane, self.sheet.values_batch_get, [name for group in ranges for name in group])
+        values = iter(value_range.get("values", []) for value_range in response.get("valueRanges", []))
+        return {tab: [next(values, []) for _ in group] for tab, group in zip(tabs, ranges)}
+
+    def _titles(self, tab):
+        """Titres des onglets du Sheet dont dépend le contenu d'un onglet en cache"""
+        if tab == "MAIN" and self.sparse:
+            return [TABS["MAIN"], TABS["COMPLETIONS"]]
+        return [TABS[tab]]
+
+    def _ranges(self, tab):
+        """Plages A1 lues pour un onglet. En stockage creux, list0 n'est lu que
+        pour sa colonne A et son en-tête, les marques venant de completions"""
+        title = _a1_tab(self.get_ws(tab).title)
+        if tab == "MAIN" and self.sparse:
+            return [f"{title}!A:A", f"{title}!1:1", _a1_tab(self.get_ws("COMPLETIONS").title)]
+        return [title]
+
+    def _assemble(self, tab, parts):
+        """Lignes d'un onglet à partir des plages lues par _batch_get"""
+        if tab == "MAIN" and self.sparse:
+            column, header, records = parts
+            levels = [line[0] if line else "" for line in column[1:]]
+            # Ligne 1 de completions : en-tête Level/Player/Mark
+            return grid_from_records(levels, header[0] if header else [], records[1:], key=normalize_level_name)
+        return parts[0]
+
+    # --- Miroir local ---
+
+    def _load_from_mirror(self, tabs):
+        """Dernière copie locale des onglets (panne de Google Sheets), ou None"""
+        if not self.mirror:
+            return None
+        fetched = {tab: self.mirror.load(tab) for tab in tabs}
+        if any(rows is None for rows in fetched.values()):
+            return None
+        print(f"Google Sheets indisponible, lecture depuis le miroir local: {', '.join(tabs)}")
+        return fetched
+
+    def sync_mirror(self):
+        """Relit tous les onglets en une requête, met à jour le miroir puis le cache"""
+        generations = {tab: self.cache.generation(tab) for tab in MIRROR_TABS}
+        fetched = self._fetch(MIRROR_TABS, lane="background")
+        changed = 0
+        for tab, rows in fetched.items():
+            changed += self.mirror.store(tab, rows)
+            # Une écriture locale pendant la lecture rend ces données obsolètes
+            if self.cache.put(tab, self._overlay_pending(TabData(tab, rows)), generation=generations[tab]) and self.changes:
+                self.changes.remember(tab, rows)
+        return changed
+
+    def start_mirror_sync(self, interval=MIRROR_SYNC_INTERVAL):
+        """Lance la synchronisation périodique du miroir dans un thread de fond"""
+        def loop():
+            while True:
+                try:
+                    self.sync_mirror()
+                except Exception as e:
+                    print(f"Erreur lors de la synchronisation du miroir: {e}")
+                if self.mirror_stop.wait(interval):
+                    return
+        thread = threading.Thread(target=loop, name="ice-mirror-sync", daemon=True)
+        thread.start()
+        return thread
+
+    # --- Détection des modifications ---
+
+    def check_changes(self):
+        """Lit le marqueur de modification et ne relit que les onglets qui ont changé.
+
+        Les onglets inchangés sont prolongés dans le cache au lieu d'expirer.
+        Retourne la liste des onglets rechargés.
+        """
+        cached = {tab: self._titles(tab) for tab in TABS if self.cache.peek(tab) is not None}
+        reading = self._api("background", self.changes.read, self.sheet)
+        suspects = self.changes.suspects(reading, cached)
+        self.cache.renew(*[tab for tab in cached if tab not in suspects])
+        reloaded = []
+        if suspects:
+            generations = {tab: self.cache.generation(tab) for tab in suspects}
+            for tab, rows in self._fetch(suspects, lane="background").items():
+                if not self.changes.remember(tab, rows):
+                    self.cache.renew(tab)
+                elif self.cache.put(tab, self._overlay_pending(TabData(tab, rows)), generation=generations[tab]):
+                    reloaded.append(tab)
+                else:
+                    # Écriture locale pendant la lecture : on relira au prochain contrôle
+                    self.changes.forget(tab)
+        self.changes.acknowledge(reading)
+        return reloaded
+
+    def start_change_polling(self, interval=CHANGE_POLL_INTERVAL):
+        """Lance le contrôle périodique des modifications dans un thread de fond"""
+        def loop():
+            while not self.changes_stop.wait(interval):
+                try:
+                    self.check_changes()
+                except Exception as e:
+                    print(f"Erreur lors de la détection des modifications: {e}")
+        thread = threading.Thread(target=loop, name="ice-change-polling", daemon=True)
+        thread.start()
+        return thread
+
+    def data_version(self, tabs):
+        """Version des onglets : change dès qu'ils sont relus ou modifiés"""
+        snap = self.snapshot(tabs)
+        return tuple(snap[tab].version for tab in tabs)
+
+    def _rows(self, tab):
+        """Toutes les lignes d'un onglet, depuis le cache si possible"""
+        return self.snapshot([tab])[tab].rows
+
+    def _row(self, tab, row):
+        """Équivalent de row_values(row) servi depuis le cache"""
+        data = self.snapshot([tab])[tab]
+        with self.cache.lock:
+            return data.row(row)
+
+    def _col(self, tab, col):
+        """Équivalent de col_values(col) servi depuis le cache"""
+        data = self.snapshot([tab])[tab]
+        with self.cache.lock:
+            return data.col(col)
+
+    def _level_row(self, tab, level_name):
+        """Ligne (1-based) d'un niveau dans un onglet, via l'index du cache"""
+        data = self.snapshot([tab])[tab]
+        with self.cache.lock:
+            return data.find_level(level_name)
+
+    def _player_col(self, tab, player_name):
+        """Colonne (1-based) d'un joueur dans un onglet, via l'index du cache"""
+        data = self.snapshot([tab])[tab]
+        with self.cache.lock:
+            return data.find_player(player_name)
+
+    def _level_stats(self, tab, level_name):
+        """Agrégats (LevelStats) d'un niveau dans un onglet, via l'index du cache"""
+        data = self.snapshot([tab])[tab]
+        with self.cache.lock:
+            return data.level_stats(level_name)
+
+    def _invalidate(self, *tabs):
+        """Invalide des onglets ainsi que ceux qui en dépendent par formule"""
+        for tab in tabs:
+            self.cache.invalidate(tab, *DEPENDENT_TABS.get(tab, []))
+
+    # --- Autocomplétion (mémoire uniquement) ---
+
+    def _name_index(self, kind):
+        """Index des niveaux ou des joueurs de list0, sans jamais lire le Sheet.
+
+        Reconstruit quand list0 change ; si list0 n'est pas en cache, le dernier
+        index construit (éventuellement vide) est servi.
+        """
+        data = self.cache.peek("MAIN")
+        cached = self.name_indexes.get(kind)
+        if data is None:
+            return cached[1] if cached else NameIndex([], key=normalize_level_name)
+        with self.cache.lock:
+            if cached and cached[0] == data.version:
+                return cached[1]
+            names = data.col(1)[1:76] if kind == "levels" else data.row(1)[1:]
+            version = data.version
+        index = NameIndex(names, key=normalize_level_name)
+        self.name_indexes[kind] = (version, index)
+        return index
+
+    def suggest_levels(self, query, limit=25):
+        return self._name_index("levels").search(query, limit)
+
+    def suggest_players(self, query, limit=25):
+        return self._name_index("players").search(query, limit)
+
+    def resolve_level(self, level_name):
+        """Nom exact d'un niveau de la liste à partir d'une saisie libre, ou None"""
+        self.snapshot(["MAIN"])
+        return self._name_index("levels").get(level_name)
+
+    def resolve_player(self, player_name):
+        """Nom exact d'un joueur à partir d'une saisie libre, ou None"""
+        self.snapshot(["MAIN"])
+        return self._name_index("players").get(player_name)
 
     def get_players(self):
-        return self.get_ws("MAIN").row_values(1)
+        return self._row("MAIN", 1)
 
     def get_levels(self):
-        return self.get_ws("MAIN").col_values(1)[1:76]
+        return self._col("MAIN", 1)[1:76]
+
+    def get_waiting_levels(self):
+        """Retourne les niveaux de la waitinglist (colonne A, sans l'en-tête)"""
+        levels = self._col("WAITING", 1)[1:]
+        return [lvl for lvl in levels if lvl]
 
     def normalize_level_name(self, level_name):
         """Normalise le nom du niveau (supprime les espaces en trop et convertit en minuscules)"""
-        return ' '.join(level_name.lower().split())
+        return normalize_level_name(level_name)
 
     def get_level_rank(self, level_name):
-        try:
-            levels = self.get_ws("MAIN").col_values(1)
-            normalized_name = self.normalize_level_name(level_name)
-            for idx, level in enumerate(levels):
-                if self.normalize_level_name(level) == normalized_name:
-                    return idx
-            return None
-        except ValueError:
-            return None
+        level_row = self._level_row("MAIN", level_name)
+        return level_row - 1 if level_row is not None else None
 
     def get_level_verifier(self, level_name):
-        """Trouve le verifier d'un niveau en cherchant l'étoile ⭐ dans list0"""
+        """Trouve le verifier d'un niveau (colonne de l'étoile ⭐ dans list0)"""
         try:
-            ws = self.get_ws("MAIN")
-            normalized_name = self.normalize_level_name(level_name)
-            levels = ws.col_values(1)
-            players = ws.row_values(1)
-            
-            # Trouver la ligne du niveau
-            level_row = None
-            for idx, level in enumerate(levels):
-                if self.normalize_level_name(level) == normalized_name:
-                    level_row = idx + 1
-                    break
-                    
-            if level_row is None:
+            stats = self._level_stats("MAIN", level_name)
+            if stats is None or stats.verifier_col is None:
                 return "Inconnu"
-                
-            # Récupérer toute la ligne du niveau
-            row_data = ws.row_values(level_row)
-            
-            # Chercher l'étoile ⭐
-            for idx, cell in enumerate(row_data[1:], start=1):
-                if cell == "⭐":
-                    return players[idx]
-                    
-            return "Inconnu"
+            players = self._row("MAIN", 1)
+            if stats.verifier_col > len(players):
+                return "Inconnu"
+            return players[stats.verifier_col - 1]
         except Exception:
             return "Inconnu"
 
@@ -87,23 +1051,20 @@ class GoogleSheet:
         rank = self.get_level_rank(level_name)
         date = datetime.now().strftime("%d/%m/%Y")
         new_row = ["beat", player_name, level_name, rank, link, date]
-        self.get_ws("ARCHIVE").insert_row(new_row, 2)
+        # L'archive est un journal en ajout seul : pas de décalage de tout l'onglet
+        self._submit({"op": "append", "tab": "ARCHIVE", "values": new_row})
 
     def update_cell(self, tab, row, col, value):
         ws = self.get_ws(tab)
         cell = gspread.utils.rowcol_to_a1(row, col)
-        ws.update(cell, [[value]], value_input_option="USER_ENTERED")
+        self._api("write", ws.update, cell, [[value]], value_input_option="USER_ENTERED")
+        # Mise à jour ciblée du cache : seule la cellule écrite change
+        self.cache.set_cell(tab, row, col, value)
+        for dependent in DEPENDENT_TABS.get(tab, []):
+            self.cache.invalidate(dependent)
 
     def update_completion(self, player_name, level_name):
-        ws = self.get_ws("MAIN")
-        players = ws.row_values(1)
-        levels = ws.col_values(1)
-        try:
-            player_col = players.index(player_name) + 1
-            level_row = levels.index(level_name) + 1
-            self.update_cell("MAIN", level_row, player_col, "✔")
-        except ValueError:
-            pass
+        self._update_stat("MAIN", player_name, level_name, "✔")
 
     def update_enjoyment(self, player_name, level_name, enjoyment):
         self._update_stat("LE", player_name, level_name, enjoyment)
@@ -113,31 +1074,94 @@ class GoogleSheet:
             self._update_stat("LR", player_name, level_name, rating)
 
     def _update_stat(self, tab, player_name, level_name, value):
-        ws = self.get_ws(tab)
-        try:
-            player_col = ws.row_values(1).index(player_name) + 1
-            level_row = ws.col_values(1).index(level_name) + 1
-            # Utilisation de update avec value_input_option
-            ws.update(f"{gspread.utils.rowcol_to_a1(level_row, player_col)}", 
-                     [[value]], 
-                     value_input_option="USER_ENTERED")
-        except ValueError:
-            pass
+        player_col = self._player_col(tab, player_name)
+        level_row = self._level_row(tab, level_name)
+        if player_col and level_row:
+            self._submit({"op": "cell", "tab": tab, "player": player_name, "level": level_name, "value": value})
+
+    def match_levels(self, tab, level_names):
+        """{saisie: nom exact du niveau dans l'onglet (LE, LR...), ou None}, sans appel à l'API
+        une fois l'onglet en cache"""
+        data = self.snapshot([tab])[tab]
+        with self.cache.lock:
+            rows = {name: data.find_level(name) for name in level_names}
+            return {name: data.cell(row, 1) if row and row > 1 else None for name, row in rows.items()}
+
+    def update_stats_bulk(self, player_name, values):
+        """Enregistre d'un coup des enjoyments/ratings d'un joueur : values = [(onglet, niveau, valeur)].
+
+        Toutes les cellules partent dans un seul batch_update (via le journal s'il
+        est actif). Retourne les (onglet, niveau) ignorés faute de ligne ou de colonne.
+        """
+        self.snapshot(sorted({tab for tab, _, _ in values}))
+        entries, skipped = [], []
+        for tab, level_name, value in values:
+            if self._player_col(tab, player_name) and self._level_row(tab, level_name):
+                entries.append({"op": "cell", "tab": tab, "player": player_name, "level": level_name, "value": value})
+            else:
+                skipped.append((tab, level_name))
+        self._submit_many(entries)
+        return skipped
+
+    def import_completions(self, records, dry_run=False):
+        """Importe des complétions en quelques écritures groupées.
+
+        records : dicts {"player", "level", "link", "date", "enjoyment", "rating"}
+        (seuls player et level sont obligatoires). Chaque enregistrement valide
+        ajoute une ligne "beat" à l'archive, le ✔ dans list0 et les valeurs LE/LR.
+        Retourne (complétions importées [(joueur, niveau)], lignes rejetées [(numéro, raison)]).
+        """
+        self.snapshot(["MAIN", "LE", "LR", "ARCHIVE"])
+        today = datetime.now().strftime("%d/%m/%Y")
+        entries, imported, rejected, seen = [], [], [], set()
+        for number, record in enumerate(records, start=1):
+            player = self.resolve_player(record.get("player") or "")
+            level_row = self._level_row("MAIN", record.get("level") or "")
+            if player is None:
+                rejected.append((number, f"joueur inconnu : {record.get('player')}"))
+                continue
+            if level_row is None:
+                rejected.append((number, f"niveau inconnu : {record.get('level')}"))
+                continue
+            data = self.snapshot(["MAIN"])["MAIN"]
+            with self.cache.lock:
+                level = data.cell(level_row, 1)
+                done = data.cell(level_row, data.find_player(player)) in COMPLETION_MARKS
+            if done or (player, level) in seen:
+                rejected.append((number, f"{player} a déjà battu {level}"))
+                continue
+            scores = {"LE": str(record.get("enjoyment") or "").strip(), "LR": str(record.get("rating") or "").strip()}
+            invalid = [value for value in scores.values() if value and not (value.isdigit() and 1 <= int(value) <= 100)]
+            if invalid:
+                rejected.append((number, f"note invalide (1 à 100) : {invalid[0]}"))
+                continue
+            seen.add((player, level))
+            imported.append((player, level))
+            entries.append({"op": "append", "tab": "ARCHIVE", "values": [
+                "beat", player, level, level_row - 1, record.get("link") or "", record.get("date") or today
+            ]})
+            entries.append({"op": "cell", "tab": "MAIN", "player": player, "level": level, "value": "✔"})
+            entries += [{"op": "cell", "tab": tab, "player": player, "level": level, "value": int(value)}
+                        for tab, value in scores.items()
+                        if value and self._player_col(tab, player) and self._level_row(tab, level)]
+        if not dry_run:
+            # Archive, ✔ et notes partent ensemble dans un seul batch_update
+            self._submit_many(entries)
+        return imported, rejected
 
     def add_to_waiting_list(self, level_name, player_name, is_extreme, placement_opinion, 
                            comment=None, enjoyment=None, rating=None, link=None):
         date = datetime.now().strftime("%d/%m/%Y")
         new_row = [level_name, player_name, "XD" if is_extreme else "", placement_opinion,
                    comment or "", enjoyment or "", rating or "", link or "", date]
-        self.get_ws("WAITING").append_row(new_row)
+        self._submit({"op": "append", "tab": "WAITING", "values": new_row})
 
     def get_list_details(self):
-        return self.get_ws("MAIN").col_values(1)[1:76]
+        return self._col("MAIN", 1)[1:76]
 
     def _get_sorted_list(self, tab, value_col):
-        ws = self.get_ws(tab)
-        levels = ws.col_values(1)[1:]
-        values = ws.col_values(value_col)[1:]
+        levels = self._col(tab, 1)[1:]
+        values = self._col(tab, value_col)[1:]
         data = []
         for level, val in zip(levels, values):
             if val:
@@ -154,32 +1178,71 @@ class GoogleSheet:
         return self._get_sorted_list("LR", 2)
 
     def get_player_completions(self, player_name):
-        try:
-            ws = self.get_ws("PLAYERS_LIST")
-            player_col = ws.row_values(1).index(player_name) + 1
-            return [lvl for lvl in ws.col_values(player_col)[1:] if lvl]
-        except ValueError:
+        if self.sparse:
+            # Liste tirée des complétions en cache, sans lire la grille de list0
+            # dont dépendent les formules de Players Lists
+            data = self.snapshot(["MAIN"])["MAIN"]
+            with self.cache.lock:
+                player_col = data.find_player(player_name)
+                if player_col is None:
+                    return []
+                return [data.cell(row, 1) for row in range(2, len(data.rows) + 1)
+                        if data.cell(row, 1) and data.cell(row, player_col) in COMPLETION_MARKS]
+        player_col = self._player_col("PLAYERS_LIST", player_name)
+        if player_col is None:
             return []
+        return [lvl for lvl in self._col("PLAYERS_LIST", player_col)[1:] if lvl]
+
+    def _leaderboard(self, curve=None):
+        """Classement calculé localement depuis list0 (sans attendre les formules du Sheet)"""
+        data = self.snapshot(["MAIN"])["MAIN"]
+        with self.cache.lock:
+            return data.leaderboard(curve or self.points_curve)
+
+    def _sheet_leaderboard(self):
+        """[(joueur, points)] de l'onglet Leaderboard, du meilleur au moins bon"""
+        players = self._col("LEADERBOARD", 2)[1:]
+        points = self._col("LEADERBOARD", 3)[1:]
+        data = []
+        for p, pt in zip(players, points):
+            if p and pt:
+                try:
+                    data.append((p, float(pt)))
+                except ValueError:
+                    continue
+        return sorted(data, key=lambda x: x[1], reverse=True)
 
     def get_leaderboard(self):
         try:
-            ws = self.get_ws("LEADERBOARD")
-            players = ws.col_values(2)[1:]
-            points = ws.col_values(3)[1:]
-            data = []
-            for p, pt in zip(players, points):
-                if p and pt:
-                    try:
-                        data.append((p, float(pt)))
-                    except ValueError:
-                        continue
-            return sorted(data, key=lambda x: x[1], reverse=True)
+            if self.points_curve is None:
+                return self._sheet_leaderboard()
+            board = self._leaderboard()
+            with self.cache.lock:
+                return board.entries()
         except Exception:
             return []
 
+    def leaderboard_mismatches(self, curve=points_for_rank):
+        """Écarts entre le classement calculé avec `curve` et l'onglet Leaderboard :
+        [(joueur, points du Sheet, points calculés)]. Vide : la courbe reproduit le Sheet"""
+        self.snapshot(["MAIN", "LEADERBOARD"])
+        expected = dict(self._sheet_leaderboard())
+        board = self._leaderboard(curve)
+        with self.cache.lock:
+            computed = dict(board.entries())
+        return [(player, expected.get(player), computed.get(player))
+                for player in sorted(set(expected) | set(computed))
+                if round(expected.get(player) or 0, 2) != round(computed.get(player) or 0, 2)]
+
     def place_level(self, level_name, player_name, rank):
-        waiting_ws = self.get_ws("WAITING")
-        waiting_rows = waiting_ws.get_all_values()[1:]
+        # Les écritures en attente doivent arriver avant une modification structurelle
+        self.flush_journal()
+
+        # Une seule lecture groupée pour tous les onglets consultés
+        snap = self.snapshot(["WAITING", "MAIN", "LE", "LR", "LX", "ARCHIVE"])
+        batch = WriteBatch(self)
+
+        waiting_rows = snap["WAITING"].rows[1:]
         row_idx, row_data = None, None
         for idx, row in enumerate(waiting_rows):
             if row and row[0] == level_name:
@@ -189,44 +1252,57 @@ class GoogleSheet:
         first_victor = row_data[1] if row_data and len(row_data) > 1 else player_name
 
         # Insertion dans la liste principale
-        self._insert_into_list("MAIN", level_name, first_victor, rank, mark="⭐")
+        self._insert_into_list(batch, "MAIN", level_name, first_victor, rank, mark="⭐")
         
         # Si c'est un extreme demon (XD dans la colonne 3)
         if row_data and len(row_data) > 2 and row_data[2] == "XD":
             # Ajout dans la liste des extremes
-            self.get_ws("LX").insert_row([level_name, first_victor, row_data[4] if len(row_data) > 4 else "", row_data[7] if len(row_data) > 7 else ""], rank + 1)
+            batch.insert_row("LX", [level_name, first_victor, row_data[4] if len(row_data) > 4 else "", row_data[7] if len(row_data) > 7 else ""], rank + 1, user_entered=False)
             
             # Ajout de l'enjoyment si disponible
             if row_data and len(row_data) > 5 and row_data[5]:
-                self._insert_into_list("LE", level_name, first_victor, rank, mark=row_data[5])
+                self._insert_into_list(batch, "LE", level_name, first_victor, rank, mark=row_data[5])
             
             # Ajout du rating si disponible
             if row_data and len(row_data) > 6 and row_data[6]:
-                self._insert_into_list("LR", level_name, first_victor, rank, mark=row_data[6])
+                self._insert_into_list(batch, "LR", level_name, first_victor, rank, mark=row_data[6])
 
         if row_idx:
-            waiting_ws.delete_rows(row_idx)
+            batch.delete_row("WAITING", row_idx)
 
-        self.get_ws("ARCHIVE").insert_row(["Added", first_victor, level_name, rank, row_data[7] if row_data and len(row_data) > 7 else "", datetime.now().strftime("%d/%m/%Y")], 2)
+        batch.append_row("ARCHIVE", ["Added", first_victor, level_name, rank, row_data[7] if row_data and len(row_data) > 7 else "", datetime.now().strftime("%d/%m/%Y")], user_entered=False)
+
+        # Toutes les modifications partent en une seule requête atomique
+        batch.commit()
+
+    def _insert_into_list(self, batch, tab, level_name, player_name, rank, mark=""):
+        players = self._row(tab, 1)
 
-    def _insert_into_list(self, tab, level_name, player_name, rank, mark=""):
-        ws = self.get_ws(tab)
-        players = ws.row_values(1)
-        
         if tab == "MAIN":
-            new_row = [level_name] + ["X" for _ in range(104)]
+            # 104 colonnes pré-remplies dans list0, davantage s'il y a plus de joueurs
+            new_row = [level_name] + ["X" for _ in range(max(104, len(players) - 1))]
         else:
             new_row = [level_name] + ["" for _ in range(len(players) - 1)]
             
-        try:
-            col_idx = players.index(player_name)
-            new_row[col_idx] = mark
-            # Utilisation de value_input_option="USER_ENTERED" pour l'insertion
-            ws.insert_row(new_row, rank + 1, value_input_option="USER_ENTERED")
-        except ValueError:
-            pass
+        player_col = self._player_col(tab, player_name)
+        if player_col is not None:
+            if tab == "MAIN" and self.sparse:
+                # Stockage creux : la ligne rendue est insérée, la marque va aussi dans completions
+                batch.insert_row(tab, new_row, rank + 1)
+                if mark:
+                    batch.record_completion(rank + 1, player_col, level_name, player_name, mark)
+                return
+            new_row[player_col - 1] = mark
+            batch.insert_row(tab, new_row, rank + 1)
 
     def move_level(self, level_name, new_rank):
+        # Les écritures en attente doivent arriver avant une modification structurelle
+        self.flush_journal()
+
+        # Une seule lecture groupée pour tous les onglets consultés
+        self.snapshot(["MAIN", "LE", "LR", "LX"])
+        batch = WriteBatch(self)
+
         # Récupérer le rang actuel
         old_rank = self.get_level_rank(level_name)
         if old_rank is None:
@@ -234,284 +1310,437 @@ class GoogleSheet:
 
         # Pour chaque liste concernée
         for tab in ["MAIN", "LE", "LR", "LX"]:
-            ws = self.get_ws(tab)
-            levels = ws.col_values(1)
+            level_row = self._level_row(tab, level_name)
             
-            if level_name in levels:
-                # Récupérer toute la ligne
-                row_idx = levels.index(level_name)
-                row_data = ws.row_values(row_idx + 1)
-                
-                # Supprimer l'ancienne ligne
-                ws.delete_rows(row_idx + 1)
-                
-                # Insérer à la nouvelle position
+            if level_row is not None:
+                # Déplacer la ligne (valeurs, formules et mise en forme comprises)
+                batch.move_row(tab, level_row, new_rank + 1)
 
-                ws.insert_row(row_data, new_rank + 1)
+        # Les quatre onglets sont modifiés ensemble ou pas du tout
+        batch.commit()
                 
     def add_player(self, player_name, discord_name):
+        self.flush_journal()
         try:
             # Liste des feuilles où ajouter le joueur
             sheets = ["MAIN", "LE", "LR"]
             
+            # Une seule lecture groupée pour tous les onglets consultés
+            self.snapshot(sheets + ["PLAYERS_LIST", "INFOPLAYER"])
+
             # Vérifier si le joueur existe déjà
-            main_ws = self.get_ws("MAIN")
-            header_row = main_ws.row_values(1)
-            if player_name in header_row:
+            if self._player_col("MAIN", player_name) is not None:
                 return False
 
             # Ajouter dans les feuilles principales
             for sheet_name in sheets:
                 ws = self.get_ws(sheet_name)
-                header_row = ws.row_values(1)
+                header_row = self._row(sheet_name, 1)
                 empty_col = len(header_row) + 1
                 
                 # Ajouter le nom du joueur dans l'en-tête
-                ws.update(f"{gspread.utils.rowcol_to_a1(1, empty_col)}", 
-                         [[player_name]], 
-                         value_input_option="USER_ENTERED")
+                self._api("write", ws.update, f"{gspread.utils.rowcol_to_a1(1, empty_col)}", 
+                          [[player_name]], 
+                          value_input_option="USER_ENTERED")
                 
                 # Si c'est la feuille principale, remplir la colonne avec "X"
                 if sheet_name == "MAIN":
-                    levels = ws.col_values(1)[1:]
+                    levels = self._col(sheet_name, 1)[1:]
                     cells = [["X"] for _ in range(len(levels))]
-                    ws.update(f"{gspread.utils.rowcol_to_a1(2, empty_col)}:{gspread.utils.rowcol_to_a1(len(levels)+1, empty_col)}", 
-                             cells,
-                             value_input_option="USER_ENTERED")
+                    self._api("write", ws.update, f"{gspread.utils.rowcol_to_a1(2, empty_col)}:{gspread.utils.rowcol_to_a1(len(levels)+1, empty_col)}", 
+                              cells,
+                              value_input_option="USER_ENTERED")
 
             # Ajouter dans Players Lists
-            players_list_ws = self.sheet.worksheet("Players Lists")
-            empty_col = len(players_list_ws.row_values(1)) + 1
-            players_list_ws.update(f"{gspread.utils.rowcol_to_a1(1, empty_col)}", 
-                                 [[player_name]], 
-                                 value_input_option="USER_ENTERED")
+            players_list_ws = self.get_ws("PLAYERS_LIST")
+            empty_col = len(self._row("PLAYERS_LIST", 1)) + 1
+            self._api("write", players_list_ws.update, f"{gspread.utils.rowcol_to_a1(1, empty_col)}", 
+                      [[player_name]], 
+                      value_input_option="USER_ENTERED")
 
             # Ajouter dans infoplayer
-            infoplayer_ws = self.sheet.worksheet("infoplayer")
-            empty_col = len(infoplayer_ws.row_values(1)) + 1
-            infoplayer_ws.update(f"{gspread.utils.rowcol_to_a1(1, empty_col)}", 
-                                [[player_name]], 
-                                value_input_option="USER_ENTERED")
-            infoplayer_ws.update(f"{gspread.utils.rowcol_to_a1(2, empty_col)}", 
-                                [[discord_name]], 
-                                value_input_option="USER_ENTERED")
+            infoplayer_ws = self.get_ws("INFOPLAYER")
+            empty_col = len(self._row("INFOPLAYER", 1)) + 1
+            self._api("write", infoplayer_ws.update, f"{gspread.utils.rowcol_to_a1(1, empty_col)}", 
+                      [[player_name]], 
+                      value_input_option="USER_ENTERED")
+            self._api("write", infoplayer_ws.update, f"{gspread.utils.rowcol_to_a1(2, empty_col)}", 
+                      [[discord_name]], 
+                      value_input_option="USER_ENTERED")
             
             return True
             
         except Exception as e:
             print(f"Erreur lors de l'ajout du joueur: {e}")
             return False
+        finally:
+            self._invalidate("MAIN", "LE", "LR", "PLAYERS_LIST", "INFOPLAYER")
+
+    # --- Stockage creux des complétions ---
+
+    def migrate_completions(self, dry_run=False):
+        """Réécrit l'onglet completions depuis les complétions actuelles (créé s'il manque).
+
+        Depuis list0, c'est la migration vers le stockage creux ; en stockage creux,
+        l'onglet est compacté (une ligne par complétion, sans les marques effacées
+        ni les niveaux retirés). À lancer bot arrêté. Retourne le nombre de complétions.
+        """
+        self.flush_journal()
+        data = self.snapshot(["MAIN"])["MAIN"]
+        with self.cache.lock:
+            records = records_from_grid(data.rows)
+        if dry_run:
+            return len(records)
+        try:
+            ws = self.get_ws("COMPLETIONS")
+        except gspread.exceptions.WorksheetNotFound:
+            self._api("write", self.sheet.add_worksheet, TABS["COMPLETIONS"], idempotent=False,
+                      rows=len(records) + 1, cols=len(COMPLETIONS_HEADER))
+            self.refresh_worksheets()
+            ws = self.get_ws("COMPLETIONS")
+        # Effacement et réécriture dans la même requête atomique : la renvoyer donne le même onglet
+        self._api("write", self.sheet.batch_update, {"requests": [
+            {"updateCells": {"range": {"sheetId": ws.id}, "fields": "userEnteredValue"}},
+            {"appendCells": {
+                "sheetId": ws.id,
+                "rows": [{"values": [_cell_data(v, False) for v in line]} for line in [COMPLETIONS_HEADER] + records],
+                "fields": "userEnteredValue"
+            }}
+        ]})
+        if self.sparse:
+            self._invalidate("MAIN")
+        return len(records)
+
+    def render_list0(self):
+        """Régénère la grille de list0 (✔, ⭐ ou "X") pour les lecteurs du Sheet et les
+        formules qui en dépendent, en une écriture. Retourne le nombre de cellules écrites"""
+        self.flush_journal()
+        data = self.snapshot(["MAIN"])["MAIN"]
+        with self.cache.lock:
+            values = render_grid(data.rows)
+        if not values or not values[0]:
+            return 0
+        title = _a1_tab(self.get_ws("MAIN").title)
+        self._api("write", self.sheet.values_batch_update, {
+            "valueInputOption": "RAW",
+            "data": [{"range": f"{title}!B2", "values": values}]
+        })
+        if self.sparse:
+            # La grille reconstituée en cache est déjà à jour, seules les formules ont bougé
+            self.cache.invalidate(*DEPENDENT_TABS["MAIN"])
+        else:
+            self._invalidate("MAIN")
+        return sum(len(line) for line in values)
+
+    # --- Écritures différées ---
+
+    def _submit(self, entry):
+        """Enregistre une écriture simple : cellule, insertion ou ajout de ligne.
+
+        Avec le journal, l'écriture est enregistrée sur disque, visible tout de
+        suite dans le cache, puis envoyée par le thread d'écriture. Sans journal,
+        elle part immédiatement.
+        """
+        self._submit_many([entry])
+
+    def _submit_many(self, entries):
+        """Comme _submit, pour plusieurs écritures envoyées dans le même batch_update"""
+        if not entries:
+            return
+        if self.journal is None:
+            self._send_entries(entries)
+            return
+        for entry in self.journal.extend(entries):
+            self.cache.patch(entry["tab"], lambda data, entry=entry: _apply_entry(data, entry))
+        self.journal_event.set()
+
+    def _overlay_pending(self, data):
+        """Réapplique les écritures pas encore envoyées sur un onglet relu"""
+        if self.journal is not None:
+            with self.journal_lock:
+                for entry in self.journal.entries():
+                    if entry["tab"] == data.name:
+                        _apply_entry(data, entry)
+        return data
+
+    def _send_entries(self, entries, apply_patches=True):
+        """Envoie des écritures simples en un seul batch_update"""
+        self.snapshot(sorted({entry["tab"] for entry in entries}))
+        batch = WriteBatch(self)
+        cells = {}
+        for entry in entries:
+            tab = entry["tab"]
+            if entry["op"] == "cell":
+                level_row = self._level_row(tab, entry["level"])
+                player_col = self._player_col(tab, entry["player"])
+                if level_row and player_col:
+                    # Plusieurs écritures sur la même cellule : la dernière l'emporte
+                    cells[(tab, level_row, player_col)] = entry["value"]
+            elif entry["op"] == "insert":
+                batch.insert_row(tab, entry["values"], entry["row"], user_entered=False)
+            else:
+                batch.append_row(tab, entry["values"], user_entered=False)
+        main = self.snapshot(["MAIN"])["MAIN"] if self.sparse else None
+        for (tab, row, col), value in cells.items():
+            if tab == "MAIN" and self.sparse:
+                # Une complétion de plus dans le journal creux, et sa cellule rendue dans list0
+                with self.cache.lock:
+                    level_name, player_name = main.cell(row, 1), main.cell(1, col)
+                batch.record_completion(row, col, level_name, player_name, value)
+            else:
+                batch.set_cell(tab, row, col, value)
+        batch.commit(apply_patches=apply_patches)
+
+    def flush_journal(self):
+        """Envoie toutes les écritures en attente ; retourne leur nombre"""
+        if self.journal is None:
+            return 0
+        with self.journal_lock:
+            entries = self.journal.entries()
+            if not entries:
+                return 0
+            applied = self._already_applied(entries)
+            if applied:
+                self.journal.ack([entry["id"] for entry in applied])
+                acked = {entry["id"] for entry in applied}
+                entries = [entry for entry in entries if entry["id"] not in acked]
+            if entries:
+                try:
+                    # Le cache contient déjà ces écritures
+                    self._send_entries(entries, apply_patches=False)
+                except UncertainWriteError:
+                    # Vérifiées dans le Sheet au prochain envoi plutôt que renvoyées à l'aveugle
+                    self.journal.mark_uncertain([entry["id"] for entry in entries])
+                    raise
+                self.journal.ack([entry["id"] for entry in entries])
+            return len(entries) + len(applied)
+
+    def _already_applied(self, entries):
+        """Ajouts et insertions d'un envoi incertain déjà présents dans le Sheet (relu sans cache).
+
+        Les écritures de cellules, idempotentes, sont simplement renvoyées.
+        """
+        uncertain = [entry for entry in entries if entry.get("uncertain") and entry["op"] != "cell"]
+        if not uncertain:
+            return []
+        fetched = self._fetch(sorted({entry["tab"] for entry in uncertain}))
+        present = {tab: {tuple(_trim(line)) for line in rows} for tab, rows in fetched.items()}
+        return [entry for entry in uncertain
+                if tuple(_trim(["" if v is None else str(v) for v in entry["values"]])) in present[entry["tab"]]]
+
+    def start_write_behind(self):
+        """Lance le thread qui vide le journal vers Google Sheets"""
+        def loop():
+            while not self.journal_stop.is_set():
+                self.journal_event.wait()
+                # Petite attente pour regrouper les écritures rapprochées
+                time.sleep(JOURNAL_FLUSH_DELAY)
+                self.journal_event.clear()
+                try:
+                    self.flush_journal()
+                except Exception as e:
+                    print(f"Erreur lors de l'envoi du journal: {e}")
+                    self.journal_event.set()
+                    self.journal_stop.wait(JOURNAL_RETRY_DELAY)
+        if self.journal.entries():
+            # Entrées non envoyées avant le dernier arrêt
+            self.journal_event.set()
+        thread = threading.Thread(target=loop, name="ice-write-behind", daemon=True)
+        thread.start()
+        return thread
+
+    def peek_player_from_discord(self, discord_name):
+        """Comme get_player_from_discord, depuis le cache seul (même expiré) et sans
+        appel au Sheet : (onglet en cache, joueur ou None)"""
+        data = self.cache.peek("INFOPLAYER")
+        if data is None:
+            return False, None
+        with self.cache.lock:
+            return True, data.row_map(2, 1).get(discord_name.lower())
 
     def get_player_from_discord(self, discord_name):
         """Récupère le nom du joueur à partir de son pseudo Discord"""
         try:
-            infoplayer_ws = self.sheet.worksheet("infoplayer")
-            discord_names = infoplayer_ws.row_values(2)  # Ligne des pseudos Discord
-            player_names = infoplayer_ws.row_values(1)   # Ligne des noms de joueurs
-            
-            # Cherche le pseudo Discord (en minuscules)
-            for i, name in enumerate(discord_names):
-                if name.lower() == discord_name.lower():
-                    return player_names[i]
-            return None
+            data = self.snapshot(["INFOPLAYER"])["INFOPLAYER"]
+            with self.cache.lock:
+                # Pseudos Discord (ligne 2, en minuscules) -> noms de joueurs (ligne 1)
+                return data.row_map(2, 1).get(discord_name.lower())
         except Exception as e:
             print(f"Erreur lors de la recherche du joueur: {e}")
             return None
 
+    def get_discord_name(self, player_name):
+        """Récupère le pseudo Discord (en minuscules) d'un joueur depuis infoplayer"""
+        player_col = self._player_col("INFOPLAYER", player_name)
+        if player_col is None:
+            return None
+        data = self.snapshot(["INFOPLAYER"])["INFOPLAYER"]
+        with self.cache.lock:
+            return data.cell(2, player_col).lower() or None
+
     def get_levels_without_rating(self, player_name):
         """Retourne la liste des niveaux où le joueur n'a pas mis de rating"""
-        ws = self.get_ws("LR")
-        try:
-            player_col = ws.row_values(1).index(player_name) + 1
-            all_levels = ws.col_values(1)[1:]  # Tous les niveaux
-            ratings = ws.col_values(player_col)[1:]  # Ratings du joueur
-            return [level for level, rating in zip(all_levels, ratings) if not rating and level]
-        except ValueError:
+        player_col = self._player_col("LR", player_name)
+        if player_col is None:
             return []
+        all_levels = self._col("LR", 1)[1:]  # Tous les niveaux
+        ratings = self._col("LR", player_col)[1:]  # Ratings du joueur
+        return [level for level, rating in zip(all_levels, ratings) if not rating and level]
 
     def get_levels_without_enjoyment(self, player_name):
         """Retourne la liste des niveaux où le joueur n'a pas mis d'enjoyment"""
-        ws = self.get_ws("LE")
-        try:
-            player_col = ws.row_values(1).index(player_name) + 1
-            all_levels = ws.col_values(1)[1:]  # Tous les niveaux
-            enjoyments = ws.col_values(player_col)[1:]  # Enjoyments du joueur
-            return [level for level, enj in zip(all_levels, enjoyments) if not enj and level]
-        except ValueError:
+        player_col = self._player_col("LE", player_name)
+        if player_col is None:
             return []
+        all_levels = self._col("LE", 1)[1:]  # Tous les niveaux
+        enjoyments = self._col("LE", player_col)[1:]  # Enjoyments du joueur
+        return [level for level, enj in zip(all_levels, enjoyments) if not enj and level]
 
     def count_completions(self, level_name):
         """Compte le nombre de joueurs ayant complété un niveau"""
-        ws = self.get_ws("MAIN")
-        try:
-            level_row = ws.col_values(1).index(level_name) + 1
-            row_data = ws.row_values(level_row)[1:]  # Ignorer la première colonne (nom du niveau)
-            return sum(1 for cell in row_data if cell == "✔")
-        except ValueError:
-            return 0
+        stats = self._level_stats("MAIN", level_name)
+        return stats.completions if stats is not None else 0
 
     def get_level_average_enjoyment(self, level_name):
         """Calcule l'enjoyment moyen d'un niveau"""
-        ws = self.get_ws("LE")
-        try:
-            level_row = ws.col_values(1).index(level_name) + 1
-            row_data = ws.row_values(level_row)[1:]  # Ignorer la première colonne
-            values = [float(val) for val in row_data if val and val.replace('.', '').isdigit()]
-            return sum(values) / len(values) if values else 0
-        except ValueError:
-            return 0
+        stats = self._level_stats("LE", level_name)
+        return stats.average if stats is not None else 0
 
     def get_level_average_rating(self, level_name):
         """Calcule le rating moyen d'un niveau"""
-        ws = self.get_ws("LR")
-        try:
-            level_row = ws.col_values(1).index(level_name) + 1
-            row_data = ws.row_values(level_row)[1:]  # Ignorer la première colonne
-            values = [float(val) for val in row_data if val and val.replace('.', '').isdigit()]
-            return sum(values) / len(values) if values else 0
-        except ValueError:
-            return 0
+        stats = self._level_stats("LR", level_name)
+        return stats.average if stats is not None else 0
 
     def get_level_verifier_and_date(self, level_name):
         """Récupère le verifier et la date d'ajout d'un niveau"""
         try:
             verifier = self.get_level_verifier(level_name)
-            archive_ws = self.get_ws("ARCHIVE")
-            archive_data = archive_ws.get_all_values()
-            normalized_name = self.normalize_level_name(level_name)
-            
-            # Chercher l'entrée "Added" pour ce niveau
-            for row in archive_data:
-                if (row and len(row) >= 6 and row[0] == "Added" and 
-                    self.normalize_level_name(row[2]) == normalized_name):
-                    return verifier, row[5]  # verifier, date
-                    
-            return verifier, "Date inconnue"
+            archive = self.snapshot(["ARCHIVE"])["ARCHIVE"]
+            with self.cache.lock:
+                # Premier évènement "Added" du niveau, sans parcourir l'archive
+                return verifier, archive.archive().added_date(level_name) or "Date inconnue"
         except Exception:
             return "Inconnu", "Date inconnue"
 
+    def get_level_facts(self, level_name):
+        """Toutes les informations affichées par /level_fact, en une seule lecture groupée.
+
+        Une fois les onglets en cache, ce ne sont que des lectures d'index.
+        """
+        self.snapshot(["MAIN", "LE", "LR", "ARCHIVE"])
+        verifier, added_date = self.get_level_verifier_and_date(level_name)
+        return {
+            "rank": self.get_level_rank(level_name),
+            "completions": self.count_completions(level_name),
+            "avg_enjoyment": self.get_level_average_enjoyment(level_name),
+            "avg_rating": self.get_level_average_rating(level_name),
+            "verifier": verifier,
+            "added_date": added_date
+        }
+
+    def get_archive_history(self, level_name=None, player_name=None, event=None):
+        """Évènements de l'archive (ArchiveEvent), du plus récent au plus ancien,
+        pour un niveau et/ou un joueur, éventuellement d'un seul type ("beat", "Added")"""
+        archive = self.snapshot(["ARCHIVE"])["ARCHIVE"]
+        with self.cache.lock:
+            return archive.archive().history(level_name, player_name, event)
+
+    def _player_stats(self, tab, player_name):
+        """Statistiques (PlayerStats) d'un joueur dans LE ou LR, calculées une fois par version de l'onglet"""
+        data = self.snapshot([tab])[tab]
+        with self.cache.lock:
+            return data.player_stats(player_name)
+
+    def get_player_stats(self, player_name):
+        """Toutes les statistiques d'un joueur pour /profile, en une seule lecture groupée"""
+        self.snapshot(["LE", "LR", "LEADERBOARD" if self.points_curve is None else "MAIN"])
+        return {
+            "rank": self.get_player_rank(player_name),
+            "avg_enjoyment": self.get_player_average_enjoyment(player_name),
+            "avg_rating": self.get_player_average_rating(player_name),
+            "favorite_level": self.get_player_favorite_level(player_name),
+            "least_favorite_level": self.get_player_least_favorite_level(player_name),
+            "best_rated_level": self.get_player_best_rated_level(player_name),
+            "worst_rated_level": self.get_player_worst_rated_level(player_name)
+        }
+
     def get_player_average_enjoyment(self, player_name):
         """Calcule l'enjoyment moyen donné par un joueur sur tous les niveaux"""
-        ws = self.get_ws("LE")
-        try:
-            player_col = ws.row_values(1).index(player_name) + 1
-            values = ws.col_values(player_col)[1:]  # Ignorer l'en-tête
-            nums = [float(val) for val in values if val and val.replace('.', '').isdigit()]
-            return sum(nums) / len(nums) if nums else 0
-        except ValueError:
-            return 0
+        stats = self._player_stats("LE", player_name)
+        return stats.average if stats is not None else 0
 
     def get_player_average_rating(self, player_name):
         """Calcule le rating moyen donné par un joueur sur tous les niveaux"""
-        ws = self.get_ws("LR")
-        try:
-            player_col = ws.row_values(1).index(player_name) + 1
-            values = ws.col_values(player_col)[1:]  # Ignorer l'en-tête
-            nums = [float(val) for val in values if val and val.replace('.', '').isdigit()]
-            return sum(nums) / len(nums) if nums else 0
-        except ValueError:
-            return 0
+        stats = self._player_stats("LR", player_name)
+        return stats.average if stats is not None else 0
 
     def get_player_rank(self, player_name):
         """Retourne le rang du joueur dans le leaderboard (1 = meilleur)"""
-        leaderboard = self.get_leaderboard()
-        for idx, (name, _) in enumerate(leaderboard, start=1):
-            if name == player_name:
-                return idx
-        return "N/A"
+        if self.points_curve is None:
+            for idx, (name, _) in enumerate(self.get_leaderboard(), start=1):
+                if name == player_name:
+                    return idx
+            return "N/A"
+        board = self._leaderboard()
+        with self.cache.lock:
+            rank = board.rank(player_name)
+        return rank if rank is not None else "N/A"
 
     def get_player_favorite_level(self, player_name):
         """Retourne le niveau préféré d'un joueur (plus haut enjoyment)"""
-        ws = self.get_ws("LE")
-        try:
-            player_col = ws.row_values(1).index(player_name) + 1
-            levels = ws.col_values(1)[1:]  # Ignorer l'en-tête
-            enjoyments = ws.col_values(player_col)[1:]  # Enjoyments du joueur
-            max_enjoyment = 0
-            favorite_level = "Aucun"
-            
-            for level, enjoyment in zip(levels, enjoyments):
-                if enjoyment and level:
-                    try:
-                        enj_value = float(enjoyment)
-                        if enj_value > max_enjoyment:
-                            max_enjoyment = enj_value
-                            favorite_level = level
-                    except ValueError:
-                        continue
-            
-            return favorite_level, max_enjoyment
-        except ValueError:
-            return "Aucun", 0
+        stats = self._player_stats("LE", player_name)
+        return stats.best if stats is not None else ("Aucun", 0)
 
     def get_player_least_favorite_level(self, player_name):
         """Retourne le niveau le moins apprécié d'un joueur (plus bas enjoyment)"""
-        ws = self.get_ws("LE")
-        try:
-            player_col = ws.row_values(1).index(player_name) + 1
-            levels = ws.col_values(1)[1:]  # Ignorer l'en-tête
-            enjoyments = ws.col_values(player_col)[1:]  # Enjoyments du joueur
-            min_enjoyment = 101  # Plus que le maximum possible
-            least_favorite = "Aucun"
-            
-            for level, enjoyment in zip(levels, enjoyments):
-                if enjoyment and level:
-                    try:
-                        enj_value = float(enjoyment)
-                        if enj_value < min_enjoyment:
-                            min_enjoyment = enj_value
-                            least_favorite = level
-                    except ValueError:
-                        continue
-            
-            return least_favorite, min_enjoyment
-        except ValueError:
-            return "Aucun", 0
+        stats = self._player_stats("LE", player_name)
+        return stats.worst if stats is not None else ("Aucun", 0)
 
     def get_player_best_rated_level(self, player_name):
         """Retourne le niveau le mieux noté par un joueur"""
-        ws = self.get_ws("LR")
-        try:
-            player_col = ws.row_values(1).index(player_name) + 1
-            levels = ws.col_values(1)[1:]  # Ignorer l'en-tête
-            ratings = ws.col_values(player_col)[1:]  # Ratings du joueur
-            max_rating = 0
-            best_level = "Aucun"
-            
-            for level, rating in zip(levels, ratings):
-                if rating and level:
-                    try:
-                        rate_value = float(rating)
-                        if rate_value > max_rating:
-                            max_rating = rate_value
-                            best_level = level
-                    except ValueError:
-                        continue
-            
-            return best_level, max_rating
-        except ValueError:
-            return "Aucun", 0
+        stats = self._player_stats("LR", player_name)
+        return stats.best if stats is not None else ("Aucun", 0)
 
     def get_player_worst_rated_level(self, player_name):
         """Retourne le niveau le moins bien noté par un joueur"""
-        ws = self.get_ws("LR")
+        stats = self._player_stats("LR", player_name)
+        return stats.worst if stats is not None else ("Aucun", 0)
+
+
+class AsyncGoogleSheet:
+    """Façade asynchrone de GoogleSheet.
+
+    Chaque méthode de GoogleSheet est exposée sous forme de coroutine exécutée
+    dans un pool de threads borné, pour ne jamais bloquer la boucle de discord.py.
+    """
+
+    def __init__(self, google_sheet=None, max_workers=SHEETS_MAX_WORKERS, timeout=SHEETS_TIMEOUT):
+        self.google_sheet = google_sheet if google_sheet is not None else GoogleSheet()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sheets")
+        self.timeout = timeout
+
+    async def run(self, func, *args, timeout=None, **kwargs):
+        """Exécute func dans le pool et attend le résultat au plus `timeout` secondes"""
+        loop = asyncio.get_running_loop()
+        # Le contexte suit l'appel dans le pool (comptage des appels par commande)
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
         try:
-            player_col = ws.row_values(1).index(player_name) + 1
-            levels = ws.col_values(1)[1:]  # Ignorer l'en-tête
-            ratings = ws.col_values(player_col)[1:]  # Ratings du joueur
-            min_rating = 101  # Plus que le maximum possible
-            worst_level = "Aucun"
-            
-            for level, rating in zip(levels, ratings):
-                if rating and level:
-                    try:
-                        rate_value = float(rating)
-                        if rate_value < min_rating:
-                            min_rating = rate_value
-                            worst_level = level
-                    except ValueError:
-                        continue
-            
-            return worst_level, min_rating
-        except ValueError:
-            return "Aucun", 0
+            return await asyncio.wait_for(loop.run_in_executor(self.executor, call),
+                                          timeout or self.timeout)
+        except asyncio.TimeoutError:
+            # Le thread continue en arrière-plan, mais la commande n'attend plus
+            name = getattr(func, "__name__", "appel")
+            raise TimeoutError(f"Google Sheets n'a pas répondu à temps ({name})") from None
+
+    def __getattr__(self, name):
+        attr = getattr(self.google_sheet, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def wrapper(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+        return wrapper
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
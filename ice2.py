@@ -3,31 +3,151 @@ import os
 #from keep_alive import keep_alive
 from dotenv import load_dotenv
 import asyncio
+import csv
+import hashlib
+import io
+import json
 import random
+from collections import OrderedDict
 from discord.ext import commands
 from discord import app_commands
-from ice import GoogleSheet
+from ice import AsyncGoogleSheet
+from metrics import metrics, timed
 from datetime import datetime
 
 load_dotenv()
 token = os.getenv('DISCORD_TOKEN')
+# Empreinte des commandes déjà envoyées à Discord (la synchronisation n'est refaite que si elle change)
+COMMANDS_HASH_PATH = os.getenv("ICE_COMMANDS_HASH_PATH", ".commands_hash")
 
 i = discord.Intents.default()
 i.message_content = True
 i.members = True  # Activer explicitement l'intent members
 bot = commands.Bot(command_prefix='!', intents=i)
 
-google_s = GoogleSheet()
+google_s = AsyncGoogleSheet()
 
-@bot.event
-async def on_ready():
-    print(f"{bot.user} has connected to Discord!")
+class MemberIndex:
+    """Index par serveur : pseudo Discord en minuscules -> ID du membre.
+
+    Construit quand un serveur devient disponible puis tenu à jour par les
+    évènements de membres : /profile n'a plus à parcourir guild.members.
+    """
+
+    def __init__(self):
+        self.guilds = {}  # ID du serveur -> {pseudo en minuscules: ID du membre}
+
+    def build(self, guild):
+        self.guilds[guild.id] = {member.name.lower(): member.id for member in guild.members}
+
+    def drop(self, guild):
+        self.guilds.pop(guild.id, None)
+
+    def add(self, member):
+        self.guilds.setdefault(member.guild.id, {})[member.name.lower()] = member.id
+
+    def remove(self, member):
+        names = self.guilds.get(member.guild.id, {})
+        if names.get(member.name.lower()) == member.id:
+            del names[member.name.lower()]
+
+    def rename(self, before, after):
+        """Changement de pseudo d'un utilisateur, dans tous les serveurs indexés"""
+        old, new = before.name.lower(), after.name.lower()
+        if old == new:
+            return
+        for names in self.guilds.values():
+            if names.get(old) == after.id:
+                del names[old]
+                names[new] = after.id
+
+    def get(self, guild, discord_name):
+        """Membre du serveur ayant ce pseudo, ou None"""
+        member_id = self.guilds.get(guild.id, {}).get(discord_name.lower())
+        return guild.get_member(member_id) if member_id is not None else None
+
+member_index = MemberIndex()
+
+async def level_autocomplete(interaction: discord.Interaction, current: str):
+    # Index en mémoire : répond bien avant la limite de 3 s, sans appel au Sheet
+    return [app_commands.Choice(name=level, value=level)
+            for level in google_s.google_sheet.suggest_levels(current)]
+
+async def player_autocomplete(interaction: discord.Interaction, current: str):
+    return [app_commands.Choice(name=player, value=player)
+            for player in google_s.google_sheet.suggest_players(current)]
+
+def commands_hash():
+    """Empreinte de la définition de toutes les commandes slash"""
+    payload = sorted((command.to_dict(bot.tree) for command in bot.tree.get_commands()),
+                     key=lambda command: command["name"])
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+async def sync_commands():
+    """Synchronise l'arbre des commandes seulement si sa définition a changé"""
+    digest = commands_hash()
+    try:
+        with open(COMMANDS_HASH_PATH, encoding="utf-8") as f:
+            if f.read().strip() == digest:
+                print("Commandes inchangées, pas de synchronisation")
+                return
+    except OSError:
+        pass
+    synced = await bot.tree.sync()
+    print(f"Synchronisé avec {len(synced)} commande(s)")
+    with open(COMMANDS_HASH_PATH, "w", encoding="utf-8") as f:
+        f.write(digest)
+
+async def warm_up():
+    """Connexion au Sheet et chargement du cache, pendant la connexion à Discord"""
     try:
-        synced = await bot.tree.sync()
-        print(f"Synchronisé avec {len(synced)} commande(s)")
+        await google_s.warm_up(timeout=120)
+        print("Cache Google Sheets prêt")
+    except Exception as e:
+        print(f"Erreur lors du préchargement du Sheet: {e}")
+
+async def setup_hook():
+    bot.loop.create_task(warm_up())
+    try:
+        await sync_commands()
     except Exception as e:
         print(e)
 
+bot.setup_hook = setup_hook
+
+@bot.event
+async def on_ready():
+    print(f"{bot.user} has connected to Discord!")
+
+@bot.event
+async def on_guild_available(guild):
+    member_index.build(guild)
+
+@bot.event
+async def on_guild_join(guild):
+    member_index.build(guild)
+
+@bot.event
+async def on_guild_remove(guild):
+    member_index.drop(guild)
+
+@bot.event
+async def on_member_join(member):
+    member_index.add(member)
+
+@bot.event
+async def on_member_remove(member):
+    member_index.remove(member)
+
+@bot.event
+async def on_member_update(before, after):
+    member_index.rename(before, after)
+
+@bot.event
+async def on_user_update(before, after):
+    # Le pseudo (name) est une donnée de l'utilisateur : son changement arrive ici
+    member_index.rename(before, after)
+
 class PlayerSelect(discord.ui.Select):
     def __init__(self, players):
         # Crée les options à partir des noms de joueurs (str)
@@ -71,6 +191,7 @@ class RatingModal(discord.ui.Modal, title="Enjoyment & Rating"):
         max_length=3
     )
 
+    @timed()
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
         try:
@@ -80,15 +201,15 @@ class RatingModal(discord.ui.Modal, title="Enjoyment & Rating"):
             if not (1 <= enjoyment <= 100) or (rating and not (1 <= rating <= 100)):
                 raise ValueError("Les valeurs doivent être entre 1 et 100")
             
-            google_s.update_enjoyment(self.player_name, self.level_name, enjoyment)
+            await google_s.update_enjoyment(self.player_name, self.level_name, enjoyment)
             if rating:
-                google_s.update_rating(self.player_name, self.level_name, rating)
+                await google_s.update_rating(self.player_name, self.level_name, rating)
             
             await interaction.followup.send(
                 f"✅ Ratings enregistrés !\nEnjoyment: {enjoyment}\nRating: {rating if rating else 'Non spécifié'}",
                 ephemeral=True
             )
-        except ValueError as e:
+        except (ValueError, TimeoutError) as e:
             await interaction.followup.send(f"❌ Erreur: {str(e)}", ephemeral=True)
 
 class ExtremeDemonView(discord.ui.View):
@@ -107,10 +228,12 @@ class ExtremeDemonView(discord.ui.View):
         await interaction.response.send_message("✅ Enregistrement terminé!", ephemeral=True)
 
 class LinkModal(discord.ui.Modal, title="Lien de complétion"):
-    def __init__(self, player_name, level_name):
+    def __init__(self, player_name, level_name, check_owner=False):
         super().__init__()
         self.player_name = player_name
         self.level_name = level_name
+        # Propriétaire pas encore vérifié (infoplayer absent du cache à l'ouverture)
+        self.check_owner = check_owner
 
     link = discord.ui.TextInput(
         label="Lien de votre complétion",
@@ -119,15 +242,18 @@ class LinkModal(discord.ui.Modal, title="Lien de complétion"):
         style=discord.TextStyle.short
     )
 
+    @timed()
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
+        if self.check_owner and not await check_player(interaction, self.player_name):
+            return
         try:
             # Ajouter à l'archive et mettre à jour la completion
-            google_s.add_archive(self.player_name, self.level_name, self.link.value)
-            google_s.update_completion(self.player_name, self.level_name)
+            await google_s.add_archive(self.player_name, self.level_name, self.link.value)
+            await google_s.update_completion(self.player_name, self.level_name)
             
             # Obtenir le rang du niveau
-            rank = google_s.get_level_rank(self.level_name)
+            rank = await google_s.get_level_rank(self.level_name)
             
             # Envoyer le message dans le salon des complétions
             completions_channel = interaction.guild.get_channel(1395778676544507934)  # Remplacer par l'ID réel du salon
@@ -150,53 +276,89 @@ class LinkModal(discord.ui.Modal, title="Lien de complétion"):
                 ephemeral=True
             )
 
-class PaginatedLevelSelect(discord.ui.Select):
-    def __init__(self, levels, current_page, player_name):
-        self.all_levels = levels
-        self.pages = [levels[i:i + 25] for i in range(0, len(levels), 25)]
-        self.current_page = current_page
+def is_owner(interaction, player_name):
+    """Le choix de niveau d'un joueur n'est utilisable que par lui : le custom_id,
+    lisible et valable indéfiniment, ne suffit pas à prouver l'identité.
+
+    Vérifié depuis infoplayer en cache, sans appel au Sheet, pour répondre avant
+    la limite de 3 s : True, False, ou None si l'onglet n'a pas encore été lu.
+    """
+    cached, owner = google_s.google_sheet.peek_player_from_discord(interaction.user.name)
+    return owner == player_name if cached else None
+
+def owner_only(player_name):
+    return f"❌ Ce choix de niveau est réservé à **{player_name}**. Utilisez /beat pour enregistrer vos complétions."
+
+async def check_player(interaction, player_name):
+    """Comme is_owner, une fois l'interaction différée : infoplayer est relu s'il
+    n'est pas en cache, et le refus part en followup"""
+    owner = is_owner(interaction, player_name)
+    if owner is None:
+        owner = await google_s.get_player_from_discord(interaction.user.name.lower()) == player_name
+    if not owner:
+        await interaction.followup.send(owner_only(player_name), ephemeral=True)
+    return owner
+
+class PaginatedLevelSelect(discord.ui.DynamicItem[discord.ui.Select], template=r"ice:beat:(?P<page>\d+):(?P<player>.+)"):
+    """Choix du niveau terminé ; le joueur et la page sont dans le custom_id"""
+
+    def __init__(self, options, page, page_count, player_name):
+        super().__init__(discord.ui.Select(
+            placeholder=f"Sélectionnez un niveau (Page {page + 1}/{page_count})",
+            options=options,
+            custom_id=f"ice:beat:{page}:{player_name}"
+        ))
         self.player_name = player_name
-        
-        options = [discord.SelectOption(label=level, value=level) 
-                  for level in self.pages[current_page]]
-        super().__init__(placeholder=f"Sélectionnez un niveau (Page {current_page + 1}/{len(self.pages)})", 
-                        options=options)
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        # Les options sont relues depuis le message
+        return cls(item.options, int(match["page"]), 1, match["player"])
 
     async def callback(self, interaction: discord.Interaction):
-        selected_level = self.values[0]
-        modal = LinkModal(self.player_name, selected_level)
+        owner = is_owner(interaction, self.player_name)
+        if owner is False:
+            await interaction.response.send_message(owner_only(self.player_name), ephemeral=True)
+            return
+        selected_level = self.item.values[0]
+        # Un modal ne peut pas suivre un defer : cache froid, le modal vérifie à l'envoi
+        modal = LinkModal(self.player_name, selected_level, check_owner=owner is None)
         await interaction.response.send_modal(modal)
 
-class PaginatedLevelView(discord.ui.View):
-    def __init__(self, levels, player_name):
-        super().__init__()
-        self.levels = levels
-        self.player_name = player_name
-        self.current_page = 0
-        self.update_select()
-
-    def update_select(self):
-        self.clear_items()
-        self.add_item(PaginatedLevelSelect(self.levels, self.current_page, self.player_name))
-        if len(self.pages) > 1:
-            self.add_item(self.previous_button)
-            self.add_item(self.next_button)
+class LevelPageButton(discord.ui.DynamicItem[discord.ui.Button], template=r"ice:beatpage:(?P<step>[pn]):(?P<page>\d+):(?P<player>.+)"):
+    """Précédent/Suivant du choix de niveau ; la page cible est dans le custom_id"""
 
-    @property
-    def pages(self):
-        return [self.levels[i:i + 25] for i in range(0, len(self.levels), 25)]
+    def __init__(self, step, page, player_name):
+        super().__init__(discord.ui.Button(
+            label="Précédent" if step == "p" else "Suivant",
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"ice:beatpage:{step}:{page}:{player_name}"
+        ))
+        self.page = page
+        self.player_name = player_name
 
-    @discord.ui.button(label="Précédent", style=discord.ButtonStyle.secondary)
-    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page - 1) % len(self.pages)
-        self.update_select()
-        await interaction.response.edit_message(view=self)
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(match["step"], int(match["page"]), match["player"])
 
-    @discord.ui.button(label="Suivant", style=discord.ButtonStyle.secondary)
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page + 1) % len(self.pages)
-        self.update_select()
-        await interaction.response.edit_message(view=self)
+    async def callback(self, interaction: discord.Interaction):
+        await interaction.response.defer()
+        if not await check_player(interaction, self.player_name):
+            return
+        levels = await google_s.get_levels()
+        await interaction.edit_original_response(view=level_picker_view(levels, self.page, self.player_name))
+
+def level_picker_view(levels, page, player_name):
+    """Vue persistante de choix de niveau (25 niveaux par page)"""
+    pages = [levels[i:i + 25] for i in range(0, len(levels), 25)]
+    page %= len(pages)
+    view = discord.ui.View(timeout=None)
+    options = [discord.SelectOption(label=level, value=level) for level in pages[page]]
+    view.add_item(PaginatedLevelSelect(options, page, len(pages), player_name))
+    if len(pages) > 1:
+        view.add_item(LevelPageButton("p", (page - 1) % len(pages), player_name))
+        view.add_item(LevelPageButton("n", (page + 1) % len(pages), player_name))
+    return view
 
 class ContinueNewLevelView(discord.ui.View):
     def __init__(self, player_name, level_name, placement):
@@ -228,6 +390,7 @@ class NewLevelModal(discord.ui.Modal, title="Nouveau Niveau"):
         style=discord.TextStyle.long  # Utiliser long pour texte multiligne
     )
 
+    @timed()
     async def on_submit(self, interaction: discord.Interaction):
         view = ContinueNewLevelView(self.player_name, self.level_name.value, self.placement.value)
         await interaction.response.send_message(
@@ -249,6 +412,7 @@ class NewLevelLinkModal(discord.ui.Modal, title="Lien de complétion"):
         style=discord.TextStyle.short
     )
 
+    @timed()
     async def on_submit(self, interaction: discord.Interaction):
         embed = discord.Embed(
             title="Ce niveau est-il un Extreme Demon ?",
@@ -290,6 +454,7 @@ class NewLevelRatingModal(discord.ui.Modal, title="Détails du niveau"):
         style=discord.TextStyle.long  # Utiliser long pour texte multiligne
     )
 
+    @timed()
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
         try:
@@ -299,7 +464,7 @@ class NewLevelRatingModal(discord.ui.Modal, title="Détails du niveau"):
             if not (1 <= enjoyment <= 100) or (rating and not (1 <= rating <= 100)):
                 raise ValueError("Les valeurs doivent être entre 1 et 100")
             
-            google_s.add_to_waiting_list(
+            await google_s.add_to_waiting_list(
                 self.level_name,
                 self.player_name,
                 True,
@@ -314,7 +479,7 @@ class NewLevelRatingModal(discord.ui.Modal, title="Détails du niveau"):
                 "✅ Niveau ajouté à la waiting list!",
                 ephemeral=True
             )
-        except ValueError as e:
+        except (ValueError, TimeoutError) as e:
             await interaction.followup.send(f"❌ Erreur: {str(e)}", ephemeral=True)
 
 class NewLevelExtremeView(discord.ui.View):
@@ -337,23 +502,18 @@ class NewLevelExtremeView(discord.ui.View):
 
     @discord.ui.button(label="Non", style=discord.ButtonStyle.red)
     async def no_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        google_s.add_to_waiting_list(
+        await interaction.response.defer(ephemeral=True)
+        await google_s.add_to_waiting_list(
             self.level_name,
             self.player_name,
             False,  # is_extreme
             self.placement,
             link=self.link
         )
-        try:
-            await interaction.response.send_message(
-                "✅ Niveau ajouté à la waiting list!", 
-                ephemeral=True
-            )
-        except discord.errors.NotFound:
-            await interaction.followup.send(
-                "✅ Niveau ajouté à la waiting list!", 
-                ephemeral=True
-            )
+        await interaction.followup.send(
+            "✅ Niveau ajouté à la waiting list!", 
+            ephemeral=True
+        )
 
 class LevelTypeView(discord.ui.View):
     def __init__(self, player_name):
@@ -362,13 +522,13 @@ class LevelTypeView(discord.ui.View):
 
     @discord.ui.button(label="Niveau Existant", style=discord.ButtonStyle.primary)
     async def existing_level(self, interaction: discord.Interaction, button: discord.ui.Button):
-        levels = google_s.get_levels()
+        levels = await google_s.get_levels()
         embed = discord.Embed(
             title="Sélection du niveau",
             description="Quel niveau avez-vous terminé ?",
             color=discord.Color.blue()
         )
-        view = PaginatedLevelView(levels, self.player_name)
+        view = level_picker_view(levels, 0, self.player_name)
         await interaction.response.send_message(embed=embed, view=view)
 
     @discord.ui.button(label="Nouveau Niveau", style=discord.ButtonStyle.green)
@@ -394,12 +554,13 @@ def has_player_role():
     return app_commands.check(predicate)
 
 @bot.tree.command(name="beat", description="Enregistre un niveau terminé")
+@timed()
 async def beat(interaction: discord.Interaction):
     # Récupérer le pseudo Discord de l'utilisateur
     discord_name = interaction.user.name.lower()
     
     # Chercher le joueur correspondant
-    player_name = google_s.get_player_from_discord(discord_name)
+    player_name = await google_s.get_player_from_discord(discord_name)
     
     if player_name is None:
         await interaction.response.send_message(
@@ -418,242 +579,236 @@ async def beat(interaction: discord.Interaction):
     view = LevelTypeView(player_name)
     await interaction.response.send_message(embed=embed, view=view)
 
-class ListPaginatedView(discord.ui.View):
-    def __init__(self):
-        super().__init__()
-        self.levels = google_s.get_list_details()
-        self.current_page = 0
-        self.items_per_page = 15
-
-    @property
-    def max_pages(self):
-        return -(-len(self.levels) // self.items_per_page)  # Ceiling division
+class PageCache:
+    """Pages déjà rendues (embeds), par (type de vue, argument, version des données).
+
+    Une page ne change que si les onglets dont elle dépend changent : tourner les
+    pages ou relancer la commande réutilise les embeds déjà construits.
+    """
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self.pages = OrderedDict()
+
+    def get(self, key):
+        pages = self.pages.get(key)
+        if pages is not None:
+            self.pages.move_to_end(key)
+        return pages
+
+    def put(self, key, pages):
+        self.pages[key] = pages
+        self.pages.move_to_end(key)
+        while len(self.pages) > self.max_size:
+            self.pages.popitem(last=False)
+
+page_cache = PageCache()
+
+def render_pages(entries, per_page, title, color, header, line, empty=None, summary="",
+                 footer="📄 Page {page}/{pages}"):
+    """Rend toutes les pages d'une liste en embeds (header + une ligne par entrée)"""
+    page_count = max(1, -(-len(entries) // per_page))  # Ceiling division
+    pages = []
+    for page in range(page_count):
+        start = page * per_page
+        if entries or empty is None:
+            lines = [line(i, entry) for i, entry in enumerate(entries[start:start + per_page], start=start + 1)]
+            description = header + "".join(lines) + summary
+        else:
+            description = empty
+        embed = discord.Embed(title=title, description=description, color=color)
+        embed.set_footer(text=footer.format(page=page + 1, pages=page_count))
+        pages.append(embed)
+    return pages
+
+def render_list(levels, arg):
+    return render_pages(
+        levels, 15, "📋 Liste Complète des Niveaux", discord.Color.blue(),
+        "📊 __Liste des niveaux actuels :__\n\n",
+        lambda i, level: f"`{i:02d}.` {level}\n"
+    )
 
-    def get_page_content(self):
-        start = self.current_page * self.items_per_page
-        end = start + self.items_per_page
-        page_levels = self.levels[start:end]
-        
-        content = "📊 __Liste des niveaux actuels :__\n\n"
-        for i, level in enumerate(page_levels, start=start+1):
-            content += f"`{i:02d}.` {level}\n"
-        
-        return content
+def render_loved(levels, arg):
+    return render_pages(
+        levels, 10, "❤️ Les Niveaux les Plus Appréciés", discord.Color.gold(),
+        "❤️ __Les niveaux préférés de la ICE Team:__\n\n",
+        lambda i, entry: f"`{i:02d}.` **{entry[0]}**\n💫 Enjoyment: `{entry[1]:.1f}/100`\n"
+    )
 
-    @discord.ui.button(label="◀️", style=discord.ButtonStyle.secondary)
-    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page - 1) % self.max_pages
-        await self.update_message(interaction)
+def render_best(levels, arg):
+    return render_pages(
+        levels, 10, "🏆 Les Meilleurs Niveaux", discord.Color.purple(),
+        "🏆 __Les meilleurs niveaux selon la communauté :__\n\n",
+        lambda i, entry: f"`{i:02d}.` **{entry[0]}**\n⭐ Rating: `{entry[1]:.1f}/100`\n"
+    )
 
-    @discord.ui.button(label="▶️", style=discord.ButtonStyle.secondary)
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page + 1) % self.max_pages
-        await self.update_message(interaction)
+def render_leaderboard(leaderboard, arg):
+    def line(i, entry):
+        medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else "👑"
+        return f"`#{i:02d}` {medal} **{entry[0]}**\n💫 Points: `{entry[1]:.2f}`\n"
+    return render_pages(
+        leaderboard, 10, "🏆 Leaderboard", discord.Color.gold(),
+        "🏆 __Classement des Joueurs__\n\n", line,
+        empty="🏆 Le leaderboard est actuellement vide."
+    )
 
-    async def update_message(self, interaction: discord.Interaction):
-        embed = discord.Embed(
-            title="📋 Liste Complète des Niveaux",
-            description=self.get_page_content(),
-            color=discord.Color.blue()
-        )
-        embed.set_footer(text=f"📄 Page {self.current_page + 1}/{self.max_pages}")
-        await interaction.response.edit_message(embed=embed, view=self)
+def render_completions(levels, player_name):
+    total = len(levels)
+    return render_pages(
+        levels, 15, f"Liste des niveaux de {player_name}", discord.Color.green(),
+        f"🎮 __Niveaux complétés par {player_name} :__\n\n",
+        lambda i, level: f"`{i:02d}.` **{level}** ✅\n",
+        empty="🚫 Ce joueur n'a pas encore terminé de niveau.",
+        summary=f"\n📊 Total: **{total}** niveau{'x' if total > 1 else ''}",
+        footer="Page {page}/{pages}"
+    )
 
-@bot.tree.command(name="list", description="Affiche la liste des niveaux")
-async def list_levels(interaction: discord.Interaction):
-    view = ListPaginatedView()
-    embed = discord.Embed(
-        title="📋 Liste Complète des Niveaux",
-        description=view.get_page_content(),
-        color=discord.Color.blue()
+def history_query(arg):
+    """Argument de la vue "history" : "type|l|niveau" ou "type|p|joueur" (type vide = tous)"""
+    event, scope, name = arg.split("|", 2)
+    return {"level_name" if scope == "l" else "player_name": name, "event": event or None}
+
+async def fetch_history(arg):
+    return await google_s.get_archive_history(**history_query(arg))
+
+def render_history(events, arg):
+    query = history_query(arg)
+    subject = query.get("level_name") or query.get("player_name")
+    def line(i, event):
+        rank = f" (#{event.rank})" if event.rank else ""
+        link = f" — [lien]({event.link})" if event.link.startswith("http") else ""
+        if event.kind == "Added":
+            text = f"⭐ **{event.level}** placé{rank}, verifier **{event.player}**"
+        elif event.kind == "beat":
+            text = f"✅ **{event.player}** a battu **{event.level}**{rank}"
+        else:
+            text = f"{event.kind} : **{event.player}** / **{event.level}**{rank}"
+        return f"`{event.date or '??/??/????'}` {text}{link}\n"
+    return render_pages(
+        events, 10, f"📜 Historique de {subject}", discord.Color.dark_teal(),
+        f"📜 __{len(events)} évènement{'s' if len(events) > 1 else ''} dans l'archive :__\n\n", line,
+        empty="📭 Aucun évènement dans l'archive."
     )
-    embed.set_footer(text=f"📄 Page 1/{view.max_pages}")
-    await interaction.response.send_message(embed=embed, view=view)
 
-class LovedListView(discord.ui.View):
-    def __init__(self):
-        super().__init__()
-        self.levels = google_s.get_loved_list()
-        self.current_page = 0
-        self.items_per_page = 10
+# Type de vue -> (onglets dont elle dépend, méthode de google_s ou fonction, rendu)
+PAGE_KINDS = {
+    "list": (["MAIN"], "get_list_details", render_list),
+    "loved": (["LE"], "get_loved_list", render_loved),
+    "best": (["LR"], "get_best_list", render_best),
+    "leaderboard": (["MAIN", "LEADERBOARD"], "get_leaderboard", render_leaderboard),
+    "completions": (["MAIN", "PLAYERS_LIST"], "get_player_completions", render_completions),
+    "history": (["ARCHIVE"], fetch_history, render_history)
+}
+
+async def get_pages(kind, arg=""):
+    """Pages d'une vue, rendues une seule fois par version des onglets concernés"""
+    tabs, method, render = PAGE_KINDS[kind]
+    version = await google_s.data_version(tabs)
+    key = (kind, arg, version)
+    pages = page_cache.get(key)
+    if pages is None:
+        fetch = getattr(google_s, method) if isinstance(method, str) else method
+        data = await fetch(*([arg] if arg else []))
+        pages = render(data, arg)
+        page_cache.put(key, pages)
+    return pages
+
+class PageButton(discord.ui.DynamicItem[discord.ui.Button], template=r"ice:page:(?P<kind>\w+):(?P<step>[pn]):(?P<page>\d+):(?P<arg>.*)"):
+    """Bouton ◀️/▶️ sans état : type de vue, page cible et argument sont dans le custom_id.
+
+    Les boutons restent utilisables indéfiniment, y compris après un redémarrage,
+    et aucune vue n'est gardée en mémoire par message.
+    """
+
+    def __init__(self, kind, step, page, arg=""):
+        super().__init__(discord.ui.Button(
+            label="◀️" if step == "p" else "▶️",
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"ice:page:{kind}:{step}:{page}:{arg}"
+        ))
+        self.kind = kind
+        self.page = page
+        self.arg = arg
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(match["kind"], match["step"], int(match["page"]), match["arg"])
 
-    @property
-    def max_pages(self):
-        return -(-len(self.levels) // self.items_per_page)
+    async def callback(self, interaction: discord.Interaction):
+        pages = await get_pages(self.kind, self.arg)
+        page = self.page % len(pages)  # la liste a pu raccourcir depuis l'envoi
+        await interaction.response.edit_message(embed=pages[page], view=pages_view(self.kind, page, len(pages), self.arg))
 
-    def get_page_content(self):
-        start = self.current_page * self.items_per_page
-        end = start + self.items_per_page
-        page_levels = self.levels[start:end]
-        
-        content = "❤️ __Les niveaux préférés de la ICE Team:__\n\n"
-        for i, (level, enjoyment) in enumerate(page_levels, start=start+1):
-            content += f"`{i:02d}.` **{level}**\n💫 Enjoyment: `{enjoyment:.1f}/100`\n"
-        
-        return content
+CUSTOM_ID_MAX = 100  # limite Discord, en caractères
 
-    @discord.ui.button(label="◀️", style=discord.ButtonStyle.secondary)
-    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page - 1) % self.max_pages
-        await self.update_message(interaction)
+def page_arg_fits(kind, arg):
+    """L'argument tient-il dans le custom_id des boutons de page, quel que soit le numéro de page ?"""
+    return len(f"ice:page:{kind}:n:9999:{arg}") <= CUSTOM_ID_MAX
 
-    @discord.ui.button(label="▶️", style=discord.ButtonStyle.secondary)
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page + 1) % self.max_pages
-        await self.update_message(interaction)
+def pages_view(kind, page, page_count, arg=""):
+    """Vue persistante (sans timeout) affichant la page `page`"""
+    view = discord.ui.View(timeout=None)
+    view.add_item(PageButton(kind, "p", (page - 1) % page_count, arg))
+    view.add_item(PageButton(kind, "n", (page + 1) % page_count, arg))
+    return view
 
-    async def update_message(self, interaction: discord.Interaction):
-        embed = discord.Embed(
-            title="❤️ Les Niveaux les Plus Appréciés",
-            description=self.get_page_content(),
-            color=discord.Color.gold()
-        )
-        embed.set_footer(text=f"📄 Page {self.current_page + 1}/{self.max_pages}")
-        await interaction.response.edit_message(embed=embed, view=self)
+async def send_pages(interaction: discord.Interaction, kind, arg=""):
+    pages = await get_pages(kind, arg)
+    await interaction.response.send_message(embed=pages[0], view=pages_view(kind, 0, len(pages), arg))
+
+@bot.tree.command(name="list", description="Affiche la liste des niveaux")
+@timed()
+async def list_levels(interaction: discord.Interaction):
+    await send_pages(interaction, "list")
 
 @bot.tree.command(name="lovedlist", description="Affiche les niveaux les plus appréciés")
+@timed()
 async def loved_list(interaction: discord.Interaction):
-    view = LovedListView()
-    embed = discord.Embed(
-        title="❤️ Les Niveaux les Plus Appréciés",
-        description=view.get_page_content(),
-        color=discord.Color.gold()
-    )
-    embed.set_footer(text=f"📄 Page 1/{view.max_pages}")
-    await interaction.response.send_message(embed=embed, view=view)
-
-class BestLevelsView(discord.ui.View):
-    def __init__(self):
-        super().__init__()
-        self.levels = google_s.get_best_list()
-        self.current_page = 0
-        self.items_per_page = 10
-
-    @property
-    def max_pages(self):
-        return -(-len(self.levels) // self.items_per_page)
-
-    def get_page_content(self):
-        start = self.current_page * self.items_per_page
-        end = start + self.items_per_page
-        page_levels = self.levels[start:end]
-        
-        content = "🏆 __Les meilleurs niveaux selon la communauté :__\n\n"
-        for i, (level, rating) in enumerate(page_levels, start=start+1):
-            content += f"`{i:02d}.` **{level}**\n⭐ Rating: `{rating:.1f}/100`\n"
-        
-        return content
-
-    @discord.ui.button(label="◀️", style=discord.ButtonStyle.secondary)
-    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page - 1) % self.max_pages
-        await self.update_message(interaction)
-
-    @discord.ui.button(label="▶️", style=discord.ButtonStyle.secondary)
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page + 1) % self.max_pages
-        await self.update_message(interaction)
-
-    async def update_message(self, interaction: discord.Interaction):
-        embed = discord.Embed(
-            title="🏆 Les Meilleurs Niveaux",
-            description=self.get_page_content(),
-            color=discord.Color.purple()
-        )
-        embed.set_footer(text=f"📄 Page {self.current_page + 1}/{self.max_pages}")
-        await interaction.response.edit_message(embed=embed, view=self)
+    await send_pages(interaction, "loved")
 
 @bot.tree.command(name="bestlevels", description="Affiche les niveaux les mieux notés")
+@timed()
 async def best_levels(interaction: discord.Interaction):
-    view = BestLevelsView()
-    embed = discord.Embed(
-        title="🏆 Les Meilleurs Niveaux",
-        description=view.get_page_content(),
-        color=discord.Color.purple()
-    )
-    embed.set_footer(text=f"📄 Page 1/{view.max_pages}")
-    await interaction.response.send_message(embed=embed, view=view)
+    await send_pages(interaction, "best")
 
-class PlayerCompletionsView(discord.ui.View):
-    def __init__(self):
-        super().__init__()
-        self.levels = []
-        self.player_name = ""
-        self.current_page = 0
-        self.items_per_page = 15
-
-    @property
-    def max_pages(self):
-        return max(1, -(-len(self.levels) // self.items_per_page))
-
-    def get_page_content(self):
-        if not self.levels:
-            return "🚫 Ce joueur n'a pas encore terminé de niveau."
-            
-        start = self.current_page * self.items_per_page
-        end = start + self.items_per_page
-        page_levels = self.levels[start:end]
-        
-        content = f"🎮 __Niveaux complétés par {self.player_name} :__\n\n"
-        for i, level in enumerate(page_levels, start=start+1):
-            content += f"`{i:02d}.` **{level}** ✅\n"
-        
-        total = len(self.levels)
-        content += f"\n📊 Total: **{total}** niveau{'x' if total > 1 else ''}"
-        
-        return content
-
-    @discord.ui.button(label="◀️", style=discord.ButtonStyle.secondary)
-    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if self.levels:
-            self.current_page = (self.current_page - 1) % self.max_pages
-            await self.update_message(interaction)
-
-    @discord.ui.button(label="▶️", style=discord.ButtonStyle.secondary)
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if self.levels:
-            self.current_page = (self.current_page + 1) % self.max_pages
-            await self.update_message(interaction)
-
-    async def update_message(self, interaction: discord.Interaction):
-        embed = discord.Embed(
-            title=f"Liste des niveaux de {self.player_name}",
-            description=self.get_page_content(),
-            color=discord.Color.green()
-        )
-        embed.set_footer(text=f"Page {self.current_page + 1}/{self.max_pages}")
-        await interaction.response.edit_message(embed=embed, view=self)
-
-class PlayerListSelect(discord.ui.Select):
+class PlayerListSelect(discord.ui.DynamicItem[discord.ui.Select], template=r"ice:players"):
     def __init__(self, options):
         # options doit être une liste de discord.SelectOption
-        super().__init__(
+        super().__init__(discord.ui.Select(
             placeholder="Sélectionnez un joueur",
-            options=options
-        )
+            options=options,
+            custom_id="ice:players"
+        ))
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(item.options)
 
     async def callback(self, interaction: discord.Interaction):
-        view = PlayerCompletionsView()
-        view.player_name = self.values[0]
-        view.levels = google_s.get_player_completions(self.values[0])
-        
-        embed = discord.Embed(
-            title=f"Liste des niveaux de {self.values[0]}",
-            description=view.get_page_content(),
-            color=discord.Color.green()
-        )
-        embed.set_footer(text=f"Page 1/{view.max_pages}")
-        await interaction.response.edit_message(embed=embed, view=view)
+        player_name = self.item.values[0]
+        pages = await get_pages("completions", player_name)
+        await interaction.response.edit_message(embed=pages[0], view=pages_view("completions", 0, len(pages), player_name))
 
 class PlayerSelectView(discord.ui.View):
     def __init__(self, players):
-        super().__init__()
+        super().__init__(timeout=None)
         options = [discord.SelectOption(label=player, value=player) for player in players if player]
         self.add_item(PlayerListSelect(options))
 
 @bot.tree.command(name="playerlist", description="Affiche la liste des niveaux complétés par un joueur")
-async def player_list(interaction: discord.Interaction):
-    players = google_s.get_players()
+@app_commands.describe(joueur="Le joueur (sinon, choix dans une liste)")
+@app_commands.autocomplete(joueur=player_autocomplete)
+@timed()
+async def player_list(interaction: discord.Interaction, joueur: str = None):
+    if joueur:
+        player_name = await google_s.resolve_player(joueur)
+        if player_name is None:
+            await interaction.response.send_message(f"❌ Joueur introuvable : {joueur}", ephemeral=True)
+            return
+        await send_pages(interaction, "completions", player_name)
+        return
+
+    players = await google_s.get_players()
     
     # Obtenir le nom du joueur si l'argument n'est pas fourni
     embed = discord.Embed(
@@ -665,111 +820,107 @@ async def player_list(interaction: discord.Interaction):
     view = PlayerSelectView(players)
     await interaction.response.send_message(embed=embed, view=view)
 
-async def show_profile(interaction: discord.Interaction, player_name):
-    """Affiche le profil d'un joueur"""
-    await interaction.response.defer(thinking=True)
-
-    # Récupérer les niveaux complétés
-    completions = google_s.get_player_completions(player_name)
-    
-    # Récupérer le pseudo Discord depuis la feuille infoplayer
-    infoplayer_ws = google_s.sheet.worksheet("infoplayer")
-    players = infoplayer_ws.row_values(1)  # Ligne des noms de joueurs
-    discord_names = infoplayer_ws.row_values(2)  # Ligne des pseudos Discord
-    
-    try:
-        idx = players.index(player_name)
-        discord_name = discord_names[idx].lower()
-        
-        # Chercher le membre correspondant sur le serveur
-        member = None
-        for guild_member in interaction.guild.members:
-            if guild_member.name.lower() == discord_name:
-                member = guild_member
-                break
-    except (ValueError, IndexError):
-        member = None
-
-    # Créer l'embed
-    if not completions:
-        content = "🚫 Ce joueur n'a pas encore terminé de niveau."
-    else:
-        content = f"🎮 __Niveaux complétés par {player_name} :__\n\n"
-        for i, level in enumerate(completions, 1):
-            content += f"`{i:02d}.` **{level}** ✅\n"
-        
-        total = len(completions)
-        content += f"\n📊 Total: **{total}** niveau{'x' if total > 1 else ''}"
-
-    embed = discord.Embed(
-        title=f"Liste des niveaux de {player_name}",
-        description=content,
-        color=discord.Color.green()
-    )
-
-    # Ajouter l'avatar du joueur s'il est trouvé
-    if member and member.avatar:
-        embed.set_thumbnail(url=member.avatar.url)
+@bot.tree.command(name="leaderboard", description="Affiche le classement des joueurs")
+@timed()
+async def show_leaderboard(interaction: discord.Interaction):
+    await send_pages(interaction, "leaderboard")
+
+# Sélecteurs paginés en lecture seule : type -> (libellé, méthode de google_s fournissant les noms)
+PICKERS = {
+    "profile": ("joueur", "get_players"),
+    "fact": ("niveau", "get_levels")
+}
+
+async def show_picked(interaction, kind, name):
+    # Résolu à l'appel : les fonctions d'affichage sont définies plus bas
+    display = {"profile": show_profile, "fact": show_level_stats}[kind]
+    await display(interaction, name)
+
+class PickerSelect(discord.ui.DynamicItem[discord.ui.Select], template=r"ice:pick:(?P<kind>\w+):(?P<page>\d+)"):
+    """Choix d'un joueur (/profile) ou d'un niveau (/level_fact) ; type et page sont dans le custom_id"""
+
+    def __init__(self, kind, options, page, page_count):
+        super().__init__(discord.ui.Select(
+            placeholder=f"Sélectionnez un {PICKERS[kind][0]} (Page {page + 1}/{page_count})",
+            options=options,
+            custom_id=f"ice:pick:{kind}:{page}"
+        ))
+        self.kind = kind
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        # Les options sont relues depuis le message
+        return cls(match["kind"], item.options, int(match["page"]), 1)
 
-    await interaction.followup.send(embed=embed)
+    async def callback(self, interaction: discord.Interaction):
+        await show_picked(interaction, self.kind, self.item.values[0])
 
-class LeaderboardView(discord.ui.View):
-    def __init__(self):
-        super().__init__()
-        self.leaderboard = google_s.get_leaderboard()
-        self.current_page = 0
-        self.items_per_page = 10
+class PickerPageButton(discord.ui.DynamicItem[discord.ui.Button], template=r"ice:pickpage:(?P<kind>\w+):(?P<step>[pn]):(?P<page>\d+)"):
+    """◀️/▶️ d'un sélecteur paginé ; la liste est relue (depuis le cache) à chaque clic"""
 
-    @property
-    def max_pages(self):
-        return max(1, -(-len(self.leaderboard) // self.items_per_page))
+    def __init__(self, kind, step, page):
+        super().__init__(discord.ui.Button(
+            label="◀️" if step == "p" else "▶️",
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"ice:pickpage:{kind}:{step}:{page}"
+        ))
+        self.kind = kind
+        self.page = page
 
-    def get_page_content(self):
-        if not self.leaderboard:
-            return "🏆 Le leaderboard est actuellement vide."
-            
-        start = self.current_page * self.items_per_page
-        end = start + self.items_per_page
-        page_entries = self.leaderboard[start:end]
-        
-        content = "🏆 __Classement des Joueurs__\n\n"
-        for i, (player, points) in enumerate(page_entries, start=start+1):
-            medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else "👑"
-            content += f"`#{i:02d}` {medal} **{player}**\n💫 Points: `{points:.2f}`\n"
-        
-        return content
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(match["kind"], match["step"], int(match["page"]))
 
-    @discord.ui.button(label="◀️", style=discord.ButtonStyle.secondary)
-    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if self.leaderboard:
-            self.current_page = (self.current_page - 1) % self.max_pages
-            await self.update_message(interaction)
-
-    @discord.ui.button(label="▶️", style=discord.ButtonStyle.secondary)
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if self.leaderboard:
-            self.current_page = (self.current_page + 1) % self.max_pages
-            await self.update_message(interaction)
+    async def callback(self, interaction: discord.Interaction):
+        names = await getattr(google_s, PICKERS[self.kind][1])()
+        await interaction.response.edit_message(view=picker_view(self.kind, names, self.page))
+
+def picker_view(kind, names, page):
+    """Vue persistante d'un sélecteur paginé (25 noms par page)"""
+    names = [name for name in names if name]
+    pages = [names[i:i + 25] for i in range(0, len(names), 25)]
+    page %= len(pages)
+    view = discord.ui.View(timeout=None)
+    options = [discord.SelectOption(label=name, value=name) for name in pages[page]]
+    view.add_item(PickerSelect(kind, options, page, len(pages)))
+    if len(pages) > 1:
+        view.add_item(PickerPageButton(kind, "p", (page - 1) % len(pages)))
+        view.add_item(PickerPageButton(kind, "n", (page + 1) % len(pages)))
+    return view
+
+class LevelFactButton(discord.ui.DynamicItem[discord.ui.Button], template=r"ice:fact:(?P<action>random|choose)"):
+    """Niveau aléatoire ou choix dans la liste pour /level_fact"""
+
+    def __init__(self, action):
+        super().__init__(discord.ui.Button(
+            label="Niveau Aléatoire" if action == "random" else "Choisir un Niveau",
+            style=discord.ButtonStyle.primary if action == "random" else discord.ButtonStyle.secondary,
+            custom_id=f"ice:fact:{action}"
+        ))
+        self.action = action
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(match["action"])
 
-    async def update_message(self, interaction: discord.Interaction):
+    async def callback(self, interaction: discord.Interaction):
+        levels = await google_s.get_levels()
+        if not levels:
+            await interaction.response.send_message("❌ Pas de niveau disponible.", ephemeral=True)
+            return
+        if self.action == "random":
+            await show_level_stats(interaction, random.choice(levels))
+            return
         embed = discord.Embed(
-            title="🏆 Leaderboard",
-            description=self.get_page_content(),
-            color=discord.Color.gold()
+            title="Sélection du niveau",
+            description="Choisissez le niveau dont vous voulez voir les statistiques",
+            color=discord.Color.blue()
         )
-        embed.set_footer(text=f"📄 Page {self.current_page + 1}/{self.max_pages}")
-        await interaction.response.edit_message(embed=embed, view=self)
+        await interaction.response.edit_message(embed=embed, view=picker_view("fact", levels, 0))
 
-@bot.tree.command(name="leaderboard", description="Affiche le classement des joueurs")
-async def show_leaderboard(interaction: discord.Interaction):
-    view = LeaderboardView()
-    embed = discord.Embed(
-        title="🏆 Leaderboard",
-        description=view.get_page_content(),
-        color=discord.Color.gold()
-    )
-    embed.set_footer(text=f"📄 Page 1/{view.max_pages}")
-    await interaction.response.send_message(embed=embed, view=view)
+# Composants persistants : retrouvés par leur custom_id, même après un redémarrage
+bot.add_dynamic_items(PageButton, PlayerListSelect, PaginatedLevelSelect, LevelPageButton,
+                      PickerSelect, PickerPageButton, LevelFactButton)
 
 def in_admin_channel():
     async def predicate(interaction: discord.Interaction):
@@ -784,11 +935,10 @@ def in_admin_channel():
 
 @bot.tree.command(name="place", description="Place un niveau de la waitinglist dans la liste principale")
 @in_admin_channel()
+@timed()
 async def place_level(interaction: discord.Interaction):
     # Récupère les niveaux de la waitinglist
-    worksheet = google_s.sheet.worksheet("waitinglist")
-    levels = worksheet.col_values(1)[1:]  # Colonne A, sans l'en-tête
-    levels = [lvl for lvl in levels if lvl]
+    levels = await google_s.get_waiting_levels()
     if not levels:
         await interaction.response.send_message("Aucun niveau dans la waitinglist.", ephemeral=True)
         return
@@ -858,6 +1008,7 @@ class PlaceRankModal(discord.ui.Modal, title="Placer le niveau"):
         max_length=2
     )
 
+    @timed()
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
         try:
@@ -866,11 +1017,10 @@ class PlaceRankModal(discord.ui.Modal, title="Placer le niveau"):
                 raise ValueError("Le rang doit être entre 1 et 75.")
             
             # Utilise la méthode existante pour effectuer le placement
-            google_s.place_level(self.level_name, self.player_name, rank_int)
+            await google_s.place_level(self.level_name, self.player_name, rank_int)
             
             # Construction du message pour le salon d'annonce
-            worksheet = google_s.sheet.worksheet("list0")
-            levels = worksheet.col_values(1)[1:76]
+            levels = await google_s.get_levels()
             idx = rank_int - 1
             above = levels[idx-1] if idx > 0 else None
             below = levels[idx+1] if idx < len(levels) else None
@@ -920,24 +1070,6 @@ class PlaceRankModal(discord.ui.Modal, title="Placer le niveau"):
             print(f"Erreur lors du placement: {e}")
             await interaction.followup.send(f"❌ Erreur: {str(e)}", ephemeral=True)
 
-class MoveLevelSelect(discord.ui.Select):
-    def __init__(self, levels):
-        options = [discord.SelectOption(label=level, value=level) for level in levels]
-        super().__init__(
-            placeholder="Sélectionnez le niveau à déplacer",
-            min_values=1,
-            max_values=1,
-            options=options
-        )
-
-    async def callback(self, interaction: discord.Interaction):
-        await interaction.response.send_modal(MoveRankModal(self.values[0]))
-
-class MoveLevelView(discord.ui.View):
-    def __init__(self, levels):
-        super().__init__()
-        self.add_item(MoveLevelSelect(levels))
-
 class MoveRankModal(discord.ui.Modal, title="Déplacer le niveau"):
     def __init__(self, level_name):
         super().__init__()
@@ -951,6 +1083,7 @@ class MoveRankModal(discord.ui.Modal, title="Déplacer le niveau"):
         max_length=2
     )
 
+    @timed()
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
         try:
@@ -959,14 +1092,13 @@ class MoveRankModal(discord.ui.Modal, title="Déplacer le niveau"):
                 raise ValueError("Le rang doit être entre 1 et 75.")
             
             # Récupérer le rang actuel avant le déplacement
-            old_rank = google_s.get_level_rank(self.level_name)
+            old_rank = await google_s.get_level_rank(self.level_name)
             
             # Effectuer le déplacement
-            google_s.move_level(self.level_name, new_rank)
+            await google_s.move_level(self.level_name, new_rank)
             
             # Récupérer les niveaux adjacents pour le message
-            worksheet = google_s.sheet.worksheet("list0")
-            levels = worksheet.col_values(1)[1:76]
+            levels = await google_s.get_levels()
             above = levels[new_rank-2] if new_rank > 1 else None
             below = levels[new_rank] if new_rank < len(levels) else None
 
@@ -992,20 +1124,16 @@ class MoveRankModal(discord.ui.Modal, title="Déplacer le niveau"):
             await interaction.followup.send(f"❌ Erreur: {str(e)}", ephemeral=True)
 
 @bot.tree.command(name="move", description="Déplace un niveau existant dans la liste")
+@app_commands.describe(niveau="Le niveau à déplacer")
+@app_commands.autocomplete(niveau=level_autocomplete)
 @in_admin_channel()
-async def move_level(interaction: discord.Interaction):
-    levels = google_s.get_levels()
-    if not levels:
-        await interaction.response.send_message("La liste est vide.", ephemeral=True)
+@timed()
+async def move_level(interaction: discord.Interaction, niveau: str):
+    level_name = await google_s.resolve_level(niveau)
+    if level_name is None:
+        await interaction.response.send_message(f"❌ Niveau introuvable : {niveau}", ephemeral=True)
         return
-
-    view = MoveLevelView(levels)
-    embed = discord.Embed(
-        title="Quel niveau voulez-vous déplacer ?",
-        description="Sélectionnez un niveau à déplacer dans la liste.",
-        color=discord.Color.orange()
-    )
-    await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+    await interaction.response.send_modal(MoveRankModal(level_name))
 
 class AddPlayerModal(discord.ui.Modal, title="Ajouter un joueur"):
     def __init__(self):
@@ -1027,12 +1155,13 @@ class AddPlayerModal(discord.ui.Modal, title="Ajouter un joueur"):
         max_length=32
     )
 
+    @timed()
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
         try:
             player_name = self.player_name.value
             discord_name = self.discord_name.value.lower()  # Force en minuscules
-            success = google_s.add_player(player_name, discord_name)
+            success = await google_s.add_player(player_name, discord_name)
             
             if success:
                 await interaction.followup.send(
@@ -1053,6 +1182,7 @@ class AddPlayerModal(discord.ui.Modal, title="Ajouter un joueur"):
 
 @bot.tree.command(name="addplayer", description="Ajoute un nouveau joueur à la liste")
 @in_admin_channel()
+@timed()
 async def add_player(interaction: discord.Interaction):
     modal = AddPlayerModal()
     await interaction.response.send_modal(modal)
@@ -1071,19 +1201,21 @@ class RatingOnlyModal(discord.ui.Modal, title="Rating"):
         max_length=3
     )
 
+    @timed()
     async def on_submit(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
         try:
             rating = int(self.rating.value)
             if not (1 <= rating <= 100):
                 raise ValueError("Le rating doit être entre 1 et 100")
             
-            google_s.update_rating(self.player_name, self.level_name, rating)
-            await interaction.response.send_message(
+            await google_s.update_rating(self.player_name, self.level_name, rating)
+            await interaction.followup.send(
                 f"✅ Rating de {rating}/100 enregistré pour {self.level_name}",
                 ephemeral=True
             )
-        except ValueError as e:
-            await interaction.response.send_message(f"❌ Erreur: {str(e)}", ephemeral=True)
+        except (ValueError, TimeoutError) as e:
+            await interaction.followup.send(f"❌ Erreur: {str(e)}", ephemeral=True)
 
 class EnjoymentOnlyModal(discord.ui.Modal, title="Enjoyment"):
     def __init__(self, player_name, level_name):
@@ -1099,19 +1231,21 @@ class EnjoymentOnlyModal(discord.ui.Modal, title="Enjoyment"):
         max_length=3
     )
 
+    @timed()
     async def on_submit(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
         try:
             enjoyment = int(self.enjoyment.value)
             if not (1 <= enjoyment <= 100):
                 raise ValueError("L'enjoyment doit être entre 1 et 100")
             
-            google_s.update_enjoyment(self.player_name, self.level_name, enjoyment)
-            await interaction.response.send_message(
+            await google_s.update_enjoyment(self.player_name, self.level_name, enjoyment)
+            await interaction.followup.send(
                 f"✅ Enjoyment de {enjoyment}/100 enregistré pour {self.level_name}",
                 ephemeral=True
             )
-        except ValueError as e:
-            await interaction.response.send_message(f"❌ Erreur: {str(e)}", ephemeral=True)
+        except (ValueError, TimeoutError) as e:
+            await interaction.followup.send(f"❌ Erreur: {str(e)}", ephemeral=True)
 
 class RatingSelectView(discord.ui.View):
     def __init__(self, levels, player_name):
@@ -1201,10 +1335,174 @@ class EnjoymentSelectView(discord.ui.View):
         modal = EnjoymentOnlyModal(self.player_name, interaction.data["values"][0])
         await interaction.response.send_modal(modal)
 
+# /rate : type de note -> (onglet, libellé, méthode listant les niveaux sans note)
+RATING_KINDS = {
+    "enjoyment": ("LE", "Enjoyment", "get_levels_without_enjoyment"),
+    "rating": ("LR", "Rating", "get_levels_without_rating")
+}
+
+def parse_rating_lines(text):
+    """Lignes "niveau: valeur" -> ({niveau: valeur}, [erreurs]). Les lignes sans valeur sont ignorées."""
+    values, errors = {}, []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        level, sep, value = line.rpartition(":")
+        level, value = level.strip(), value.strip()
+        if not sep or not level:
+            errors.append(f"`{line.strip()[:60]}` : format attendu « niveau: valeur »")
+        elif not value:
+            continue
+        elif not value.isdigit() or not 1 <= int(value) <= 100:
+            errors.append(f"`{level[:60]}` : {value[:10]} n'est pas un nombre entre 1 et 100")
+        else:
+            values[level] = int(value)
+    return values, errors
+
+class RatingSession:
+    """Notes préparées par un joueur avec /rate : rien n'est écrit avant « Enregistrer »"""
+
+    def __init__(self, player_name, kind, levels):
+        self.player_name = player_name
+        self.kind = kind
+        self.tab, self.label, _ = RATING_KINDS[kind]
+        self.levels = levels  # niveaux complétés sans note, dans l'ordre de la liste
+        self.staged = {}      # nom exact du niveau -> valeur
+        self.errors = []
+
+    def prefill(self, max_length=3500):
+        """Lignes « niveau: » pour les prochains niveaux sans note, dans la limite du champ du modal"""
+        lines, length = [], 0
+        for level in self.levels:
+            if level in self.staged:
+                continue
+            line = f"{level}: "
+            if length + len(line) + 1 > max_length:
+                break
+            lines.append(line)
+            length += len(line) + 1
+        return "\n".join(lines)
+
+    def embed(self):
+        description = "\n".join(f"• **{level}** : `{value}/100`" for level, value in list(self.staged.items())[:40])
+        if len(self.staged) > 40:
+            description += f"\n… et {len(self.staged) - 40} autre(s)"
+        if self.errors:
+            description += "\n\n⚠️ Lignes ignorées :\n" + "\n".join(self.errors[:10])
+        embed = discord.Embed(
+            title=f"📝 {self.label} de {self.player_name} : {len(self.staged)} niveau(x) prêt(s)",
+            description=description or "Cliquez sur « Saisir des notes » et complétez les lignes « niveau: valeur ».",
+            color=discord.Color.blue()
+        )
+        remaining = sum(1 for level in self.levels if level not in self.staged)
+        embed.set_footer(text=f"{remaining} niveau(x) complété(s) encore sans {self.label.lower()}")
+        return embed
+
+class BulkRatingModal(discord.ui.Modal):
+    def __init__(self, session, view):
+        super().__init__(title=f"{session.label} de plusieurs niveaux")
+        self.session = session
+        self.session_view = view
+        self.lines = discord.ui.TextInput(
+            label="Une ligne par niveau : « niveau: valeur »",
+            style=discord.TextStyle.paragraph,
+            default=session.prefill() or None,
+            placeholder="Bloodbath: 85",
+            required=True,
+            max_length=4000
+        )
+        self.add_item(self.lines)
+
+    @timed()
+    async def on_submit(self, interaction: discord.Interaction):
+        session = self.session
+        # Réponse immédiate : match_levels peut devoir relire l'onglet
+        await interaction.response.defer()
+        values, session.errors = parse_rating_lines(self.lines.value)
+        # Validation locale contre l'onglet en cache : aucune écriture à ce stade
+        matches = await google_s.match_levels(session.tab, list(values))
+        for level, value in values.items():
+            if matches.get(level):
+                session.staged[matches[level]] = value
+            else:
+                suggestion = google_s.google_sheet.suggest_levels(level, limit=1)
+                hint = f" (vouliez-vous dire **{suggestion[0]}** ?)" if suggestion else ""
+                session.errors.append(f"`{level[:60]}` : niveau introuvable{hint}")
+        self.session_view.update_buttons()
+        await interaction.edit_original_response(embed=session.embed(), view=self.session_view)
+
+class RatingSessionView(discord.ui.View):
+    def __init__(self, session):
+        super().__init__(timeout=900)
+        self.session = session
+        self.update_buttons()
+
+    def update_buttons(self):
+        self.save_button.disabled = not self.session.staged
+
+    @discord.ui.button(label="Saisir des notes", emoji="➕", style=discord.ButtonStyle.primary)
+    async def add_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_modal(BulkRatingModal(self.session, self))
+
+    @discord.ui.button(label="Enregistrer", emoji="✅", style=discord.ButtonStyle.green)
+    async def save_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        session = self.session
+        await interaction.response.defer()
+        values = [(session.tab, level, value) for level, value in session.staged.items()]
+        # Une seule écriture groupée pour toute la session
+        skipped = await google_s.update_stats_bulk(session.player_name, values)
+        saved = len(values) - len(skipped)
+        message = f"✅ {saved} {session.label.lower()}(s) enregistré(s) pour {session.player_name}."
+        if skipped:
+            message += "\n⚠️ Ignorés : " + ", ".join(level for _, level in skipped[:20])
+        self.stop()
+        await interaction.edit_original_response(content=message, embed=None, view=None)
+
+    @discord.ui.button(label="Annuler", emoji="❌", style=discord.ButtonStyle.red)
+    async def cancel_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.stop()
+        await interaction.response.edit_message(content="❌ Session annulée, rien n'a été enregistré.", embed=None, view=None)
+
+@bot.tree.command(name="rate", description="Note plusieurs niveaux complétés en une seule fois")
+@app_commands.describe(note="Type de note à saisir")
+@app_commands.choices(note=[
+    app_commands.Choice(name="Enjoyment", value="enjoyment"),
+    app_commands.Choice(name="Rating", value="rating")
+])
+@timed()
+async def rate(interaction: discord.Interaction, note: app_commands.Choice[str]):
+    player_name = await google_s.get_player_from_discord(interaction.user.name.lower())
+    if player_name is None:
+        await interaction.response.send_message(
+            "❌ Vous n'êtes pas enregistré dans la liste des joueurs. "
+            "Contactez un modérateur pour être ajouté.",
+            ephemeral=True
+        )
+        return
+    _, _, method = RATING_KINDS[note.value]
+    unrated, completions = await asyncio.gather(
+        getattr(google_s, method)(player_name),
+        google_s.get_player_completions(player_name)
+    )
+    completed = set(completions)
+    session = RatingSession(player_name, note.value, [level for level in unrated if level in completed])
+    await interaction.response.send_message(embed=session.embed(), view=RatingSessionView(session), ephemeral=True)
+
 @bot.tree.command(name="profile", description="Affiche les statistiques d'un joueur")
-async def profile(interaction: discord.Interaction):
+@app_commands.describe(joueur="Le joueur (sinon, choix dans une liste)")
+@app_commands.autocomplete(joueur=player_autocomplete)
+@timed()
+async def profile(interaction: discord.Interaction, joueur: str = None):
+    if joueur:
+        player_name = await google_s.resolve_player(joueur)
+        if player_name is None:
+            await interaction.response.send_message(f"❌ Joueur introuvable : {joueur}", ephemeral=True)
+            return
+        await show_profile(interaction, player_name)
+        return
+
     # Récupérer la liste des joueurs
-    players = google_s.get_players()
+    players = await google_s.get_players()
     if not players:
         await interaction.response.send_message("❌ Aucun joueur trouvé.", ephemeral=True)
         return
@@ -1214,79 +1512,22 @@ async def profile(interaction: discord.Interaction):
         description="Sélectionnez un joueur pour voir ses statistiques",
         color=discord.Color.blue()
     )
-    view = ProfileView(players)
+    view = picker_view("profile", players, 0)
     await interaction.response.send_message(embed=embed, view=view)
 
-class ProfileSelect(discord.ui.Select):
-    def __init__(self, players, current_page):
-        self.all_players = players
-        self.pages = [players[i:i + 25] for i in range(0, len(players), 25)]
-        self.current_page = current_page
-        
-        options = [discord.SelectOption(label=player, value=player) 
-                  for player in self.pages[current_page] if player]
-        super().__init__(
-            placeholder=f"Sélectionnez un joueur (Page {current_page + 1}/{len(self.pages)})", 
-            options=options
-        )
-
-    async def callback(self, interaction: discord.Interaction):
-        await show_profile(interaction, self.values[0])
-
-class ProfileView(discord.ui.View):
-    def __init__(self, players):
-        super().__init__()
-        self.players = players
-        self.current_page = 0
-        self.update_select()
-
-    def update_select(self):
-        self.clear_items()
-        self.add_item(ProfileSelect(self.players, self.current_page))
-        if len(self.pages) > 1:
-            self.add_item(self.previous_button)
-            self.add_item(self.next_button)
-
-    @property
-    def pages(self):
-        return [self.players[i:i + 25] for i in range(0, len(self.players), 25)]
-
-    @discord.ui.button(label="◀️", style=discord.ButtonStyle.secondary)
-    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page - 1) % len(self.pages)
-        self.update_select()
-        await interaction.response.edit_message(view=self)
-
-    @discord.ui.button(label="▶️", style=discord.ButtonStyle.secondary)
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page + 1) % len(self.pages)
-        self.update_select()
-        await interaction.response.edit_message(view=self)
-
 async def show_profile(interaction: discord.Interaction, player_name):
     """Affiche le profil d'un joueur"""
     await interaction.response.defer(thinking=True)
 
     # Récupérer les niveaux complétés
-    completions = google_s.get_player_completions(player_name)
-    
-    # Récupérer le pseudo Discord depuis la feuille infoplayer
-    infoplayer_ws = google_s.sheet.worksheet("infoplayer")
-    players = infoplayer_ws.row_values(1)  # Ligne des noms de joueurs
-    discord_names = infoplayer_ws.row_values(2)  # Ligne des pseudos Discord
+    completions, discord_name, stats = await asyncio.gather(
+        google_s.get_player_completions(player_name),
+        google_s.get_discord_name(player_name),  # Pseudo Discord depuis la feuille infoplayer
+        google_s.get_player_stats(player_name)  # LE, LR et leaderboard lus une seule fois
+    )
     
-    try:
-        idx = players.index(player_name)
-        discord_name = discord_names[idx].lower()
-        
-        # Chercher le membre correspondant sur le serveur
-        member = None
-        for guild_member in interaction.guild.members:
-            if guild_member.name.lower() == discord_name:
-                member = guild_member
-                break
-    except (ValueError, IndexError):
-        member = None
+    # Membre correspondant sur le serveur, via l'index des membres
+    member = member_index.get(interaction.guild, discord_name) if discord_name else None
 
     # Créer l'embed
     if not completions:
@@ -1305,6 +1546,15 @@ async def show_profile(interaction: discord.Interaction, player_name):
         color=discord.Color.green()
     )
 
+    if completions:
+        favorite, favorite_value = stats["favorite_level"]
+        best, best_value = stats["best_rated_level"]
+        embed.add_field(name="🏆 Rang", value=f"#{stats['rank']}", inline=True)
+        embed.add_field(name="😊 Enjoyment moyen", value=f"{stats['avg_enjoyment']:.1f}", inline=True)
+        embed.add_field(name="⭐ Rating moyen", value=f"{stats['avg_rating']:.1f}", inline=True)
+        embed.add_field(name="❤️ Niveau préféré", value=f"{favorite} ({favorite_value:g})", inline=True)
+        embed.add_field(name="🥇 Mieux noté", value=f"{best} ({best_value:g})", inline=True)
+
     # Ajouter l'avatar du joueur s'il est trouvé
     if member and member.avatar:
         embed.set_thumbnail(url=member.avatar.url)
@@ -1312,15 +1562,16 @@ async def show_profile(interaction: discord.Interaction, player_name):
     await interaction.followup.send(embed=embed)
 
 @bot.tree.command(name="random", description="Suggère un niveau aléatoire de la liste")
+@timed()
 async def random_level(interaction: discord.Interaction):
-    levels = google_s.get_levels()
+    levels = await google_s.get_levels()
     if not levels:
         await interaction.response.send_message("❌ La liste est vide.", ephemeral=True)
         return
     
     import random
     level = random.choice(levels)
-    rank = google_s.get_level_rank(level)
+    rank = await google_s.get_level_rank(level)
     
     embed = discord.Embed(
         title="🎲 Niveau Aléatoire",
@@ -1332,6 +1583,7 @@ async def random_level(interaction: discord.Interaction):
 
 
 @bot.tree.command(name="flip", description="Lance une pièce")
+@timed()
 async def flip_coin(interaction: discord.Interaction):
     import random
     result = random.choice(["Pile", "Face"])
@@ -1344,6 +1596,7 @@ async def flip_coin(interaction: discord.Interaction):
     await interaction.response.send_message(embed=embed)
 
 @bot.tree.command(name="8ball", description="Pose une question et obtiens une réponse mystique")
+@timed()
 async def magic_8ball(interaction: discord.Interaction, question: str):
     import random
     
@@ -1364,80 +1617,16 @@ async def magic_8ball(interaction: discord.Interaction, question: str):
     
     await interaction.response.send_message(embed=embed)
 
-class LevelFactSelect(discord.ui.Select):
-    def __init__(self, levels, current_page):
-        self.all_levels = levels
-        self.pages = [levels[i:i + 25] for i in range(0, len(levels), 25)]
-        self.current_page = current_page
-        
-        options = [discord.SelectOption(label=level, value=level) 
-                  for level in self.pages[current_page]]
-        super().__init__(
-            placeholder=f"Sélectionnez un niveau (Page {current_page + 1}/{len(self.pages)})", 
-            options=options
-        )
-
-    async def callback(self, interaction: discord.Interaction):
-        await show_level_stats(interaction, self.values[0])
-
-class LevelFactView(discord.ui.View):
-    def __init__(self, levels):
-        super().__init__()
-        self.levels = levels
-        self.current_page = 0
-        self.update_select()
-
-    def update_select(self):
-        self.clear_items()
-        self.add_item(LevelFactSelect(self.levels, self.current_page))
-        if len(self.pages) > 1:
-            self.add_item(self.previous_button)
-            self.add_item(self.next_button)
-
-    @property
-    def pages(self):
-        return [self.levels[i:i + 25] for i in range(0, len(self.levels), 25)]
-
-    @discord.ui.button(label="◀️", style=discord.ButtonStyle.secondary)
-    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page - 1) % len(self.pages)
-        self.update_select()
-        await interaction.response.edit_message(view=self)
-
-    @discord.ui.button(label="▶️", style=discord.ButtonStyle.secondary)
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = (self.current_page + 1) % len(self.pages)
-        self.update_select()
-        await interaction.response.edit_message(view=self)
-
-class LevelStatsChoiceView(discord.ui.View):
-    def __init__(self, levels):
-        super().__init__()
-        self.levels = levels
-
-    @discord.ui.button(label="Niveau Aléatoire", style=discord.ButtonStyle.primary)
-    async def random_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await show_level_stats(interaction, random.choice(self.levels))
-
-    @discord.ui.button(label="Choisir un Niveau", style=discord.ButtonStyle.secondary)
-    async def choose_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        view = LevelFactView(self.levels)
-        embed = discord.Embed(
-            title="Sélection du niveau",
-            description="Choisissez le niveau dont vous voulez voir les statistiques",
-            color=discord.Color.blue()
-        )
-        await interaction.response.edit_message(embed=embed, view=view)
-
 async def show_level_stats(interaction: discord.Interaction, chosen_level):
     """Affiche les statistiques d'un niveau"""
     await interaction.response.defer(thinking=True)
     
-    rank = google_s.get_level_rank(chosen_level)
-    completion_count = google_s.count_completions(chosen_level) + 1
-    avg_enjoyment = google_s.get_level_average_enjoyment(chosen_level)
-    avg_rating = google_s.get_level_average_rating(chosen_level)
-    verifier, added_date = google_s.get_level_verifier_and_date(chosen_level)
+    facts = await google_s.get_level_facts(chosen_level)
+    rank = facts["rank"]
+    completion_count = facts["completions"] + 1
+    avg_enjoyment = facts["avg_enjoyment"]
+    avg_rating = facts["avg_rating"]
+    verifier, added_date = facts["verifier"], facts["added_date"]
     
     # Créer des barres de progression pour enjoyment et rating
     enjoyment_bar = "▰" * int(avg_enjoyment/10) + "▱" * (10-int(avg_enjoyment/10))
@@ -1463,8 +1652,19 @@ async def show_level_stats(interaction: discord.Interaction, chosen_level):
     await interaction.followup.send(embed=embed)
 
 @bot.tree.command(name="level_fact", description="Obtiens des statistiques sur un niveau")
-async def level_fact(interaction: discord.Interaction):
-    levels = google_s.get_levels()
+@app_commands.describe(niveau="Le niveau (sinon, aléatoire ou choix dans une liste)")
+@app_commands.autocomplete(niveau=level_autocomplete)
+@timed()
+async def level_fact(interaction: discord.Interaction, niveau: str = None):
+    if niveau:
+        level_name = await google_s.resolve_level(niveau)
+        if level_name is None:
+            await interaction.response.send_message(f"❌ Niveau introuvable : {niveau}", ephemeral=True)
+            return
+        await show_level_stats(interaction, level_name)
+        return
+
+    levels = await google_s.get_levels()
     if not levels:
         await interaction.response.send_message("❌ Pas de niveau disponible.", ephemeral=True)
         return
@@ -1474,9 +1674,163 @@ async def level_fact(interaction: discord.Interaction):
         description="Voulez-vous voir les statistiques d'un niveau aléatoire ou choisir un niveau spécifique ?",
         color=discord.Color.blue()
     )
-    view = LevelStatsChoiceView(levels)
+    view = discord.ui.View(timeout=None)
+    view.add_item(LevelFactButton("random"))
+    view.add_item(LevelFactButton("choose"))
     await interaction.response.send_message(embed=embed, view=view)
 
+@bot.tree.command(name="history", description="Historique de l'archive pour un niveau ou un joueur")
+@app_commands.describe(niveau="Le niveau", joueur="Le joueur", evenement="Type d'évènement (tous par défaut)")
+@app_commands.autocomplete(niveau=level_autocomplete, joueur=player_autocomplete)
+@app_commands.choices(evenement=[
+    app_commands.Choice(name="Complétions", value="beat"),
+    app_commands.Choice(name="Placements", value="Added")
+])
+@timed()
+async def history(interaction: discord.Interaction, niveau: str = None, joueur: str = None,
+                  evenement: app_commands.Choice[str] = None):
+    if bool(niveau) == bool(joueur):
+        await interaction.response.send_message("❌ Indiquez un niveau ou un joueur (un seul des deux).", ephemeral=True)
+        return
+    # Un niveau sorti de la liste reste dans l'archive : à défaut, on garde la saisie
+    if niveau:
+        arg = f"l|{await google_s.resolve_level(niveau) or niveau}"
+    else:
+        arg = f"p|{await google_s.resolve_player(joueur) or joueur}"
+    arg = f"{evenement.value if evenement else ''}|{arg}"
+    if not page_arg_fits("history", arg):
+        # L'argument voyage dans le custom_id des boutons ◀️/▶️
+        await interaction.response.send_message(
+            f"❌ Introuvable ou trop long pour l'historique : {niveau or joueur}", ephemeral=True
+        )
+        return
+    await send_pages(interaction, "history", arg)
+
+# Colonnes acceptées par /import (en-tête CSV ou clés JSON) -> champ de l'enregistrement
+IMPORT_FIELDS = {
+    "player": "player", "joueur": "player",
+    "level": "level", "niveau": "level",
+    "link": "link", "lien": "link",
+    "date": "date",
+    "enjoyment": "enjoyment",
+    "rating": "rating"
+}
+IMPORT_MAX_SIZE = 2_000_000  # octets
+
+def import_date(value):
+    """Date au format de l'archive (jj/mm/aaaa) ; accepte aussi aaaa-mm-jj"""
+    value = (value or "").strip()
+    if not value:
+        return ""
+    for fmt in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).strftime("%d/%m/%Y")
+        except ValueError:
+            pass
+    raise ValueError(f"date illisible : {value}")
+
+def parse_import(content, filename):
+    """Enregistrements d'un fichier CSV (avec en-tête) ou JSON (liste d'objets)"""
+    text = content.decode("utf-8-sig")
+    if filename.lower().endswith(".json"):
+        rows = json.loads(text)
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("le JSON doit être une liste d'objets")
+    else:
+        rows = list(csv.DictReader(io.StringIO(text), dialect=csv.Sniffer().sniff(text[:2048], ",;\t")))
+    records = []
+    for number, row in enumerate(rows, start=1):
+        record = {IMPORT_FIELDS[key.strip().lower()]: str(value).strip() if value is not None else ""
+                  for key, value in row.items() if key and key.strip().lower() in IMPORT_FIELDS}
+        try:
+            record["date"] = import_date(record.get("date"))
+        except ValueError as e:
+            raise ValueError(f"ligne {number} : {e}")
+        records.append(record)
+    return records
+
+@bot.tree.command(name="import", description="Importe des complétions depuis un fichier CSV ou JSON (admin)")
+@app_commands.describe(
+    fichier="Colonnes : player, level, link, date, enjoyment, rating",
+    simulation="Vérifier le fichier sans rien enregistrer"
+)
+@in_admin_channel()
+@timed()
+async def import_completions(interaction: discord.Interaction, fichier: discord.Attachment, simulation: bool = False):
+    if fichier.size > IMPORT_MAX_SIZE:
+        await interaction.response.send_message("❌ Fichier trop volumineux (2 Mo maximum).", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True)
+    try:
+        records = parse_import(await fichier.read(), fichier.filename)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        await interaction.followup.send(f"❌ Fichier illisible : {e}", ephemeral=True)
+        return
+
+    imported, rejected = await google_s.import_completions(records, dry_run=simulation, timeout=120)
+
+    report = f"{'🔎 Simulation' if simulation else '📥 Import'} : {len(imported)} complétion(s) " \
+             f"{'valide(s)' if simulation else 'enregistrée(s)'}, {len(rejected)} ligne(s) rejetée(s)."
+    details = "\n".join(f"ligne {number} : {reason}" for number, reason in rejected)
+    if len(report) + len(details) > 1900:
+        await interaction.followup.send(report, file=discord.File(io.BytesIO(details.encode("utf-8")), filename="rejets.txt"),
+                                        ephemeral=True)
+    else:
+        await interaction.followup.send(report + (f"\n```\n{details}\n```" if details else ""), ephemeral=True)
+
+    if imported and not simulation:
+        # Une seule annonce pour tout l'import, au lieu d'un message par complétion
+        per_player = {}
+        for player, level in imported:
+            per_player.setdefault(player, []).append(level)
+        lines = [f"• **{player}** : {', '.join(levels[:8])}{f' (+{len(levels) - 8})' if len(levels) > 8 else ''}"
+                 for player, levels in sorted(per_player.items(), key=lambda item: -len(item[1]))]
+        summary = f"📥 **{len(imported)}** complétion(s) importée(s) pour **{len(per_player)}** joueur(s) :\n"
+        completions_channel = interaction.client.get_channel(1395778676544507934)
+        if completions_channel:
+            text = summary + "\n".join(lines)
+            await completions_channel.send(text if len(text) <= 2000 else text[:1990].rsplit("\n", 1)[0] + "\n…")
+
+def format_stats():
+    """Résumé texte des mesures : latences, appels Sheets par commande, cache"""
+    histograms, counters = metrics.snapshot()
+    lines = ["Latences (ms)                          n    p50    p95    p99"]
+    latencies = sorted(((name, h) for (family, name), h in histograms.items() if family == "latency_seconds"),
+                       key=lambda item: -item[1][0])
+    for name, (count, _, p50, p95, p99) in latencies[:25]:
+        lines.append(f"{name[:34]:<34} {count:>6} {p50 * 1000:>6.0f} {p95 * 1000:>6.0f} {p99 * 1000:>6.0f}")
+
+    lines += ["", "Prise en charge (ms)                   n    p50    p95    p99"]
+    for (family, name), (count, _, p50, p95, p99) in sorted(histograms.items()):
+        if family == "dispatch_seconds":
+            lines.append(f"{name[:34]:<34} {count:>6} {p50 * 1000:>6.0f} {p95 * 1000:>6.0f} {p99 * 1000:>6.0f}")
+
+    lines += ["", "Appels Sheets par interaction      moyenne    max"]
+    for (family, name), (count, total, _, _, p99) in sorted(histograms.items()):
+        if family == "sheets_calls" and count:
+            lines.append(f"{name[:34]:<34} {total / count:>7.2f} {p99:>6.0f}")
+
+    lines += ["", "Cache                      hits  misses  taux"]
+    for tab in sorted({name for family, name in counters if family in ("cache_hits", "cache_misses")}):
+        hits, misses = counters.get(("cache_hits", tab), 0), counters.get(("cache_misses", tab), 0)
+        lines.append(f"{tab:<24} {hits:>6} {misses:>7} {hits / (hits + misses):>5.0%}")
+    calls = ", ".join(f"{lane}: {count}" for (family, lane), count in sorted(counters.items())
+                      if family == "sheets_api_calls")
+    lines += ["", f"Appels API Google Sheets : {calls or 'aucun'}"]
+    return "\n".join(lines)
+
+@bot.tree.command(name="stats", description="Statistiques de performance du bot (admin)")
+@app_commands.describe(prometheus="Joindre l'export au format Prometheus")
+@in_admin_channel()
+@timed()
+async def show_stats(interaction: discord.Interaction, prometheus: bool = False):
+    content = f"```\n{format_stats()[:1900]}\n```"
+    if prometheus:
+        export = discord.File(io.BytesIO(metrics.prometheus().encode("utf-8")), filename="metrics.prom")
+        await interaction.response.send_message(content, file=export, ephemeral=True)
+    else:
+        await interaction.response.send_message(content, ephemeral=True)
+
 if __name__ == "__main__":
     #keep_alive()
     bot.run(token)
@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+import time
+
+class WriteJournal:
+    """Journal local des écritures en attente (fichier JSON lines, en ajout seul).
+
+    Chaque écriture est enregistrée (et synchronisée sur disque) avant d'être
+    envoyée à Google Sheets ; une ligne {"ack": [...]} la marque comme envoyée.
+    Au redémarrage, les entrées sans accusé sont rejouées. Une ligne
+    {"uncertain": [...]} signale un envoi interrompu sans réponse : ces
+    entrées ont pu arriver et doivent être vérifiées avant d'être renvoyées.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.pending = {}  # id -> entrée, dans l'ordre d'arrivée
+        self.next_id = 1
+        self._replay()
+        self._compact()
+        self.file = open(self.path, "a", encoding="utf-8")
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Dernière ligne tronquée par un arrêt brutal
+                    continue
+                if "ack" in record:
+                    for entry_id in record["ack"]:
+                        self.pending.pop(entry_id, None)
+                elif "uncertain" in record:
+                    for entry_id in record["uncertain"]:
+                        if entry_id in self.pending:
+                            self.pending[entry_id]["uncertain"] = True
+                else:
+                    self.pending[record["id"]] = record
+                    self.next_id = max(self.next_id, record["id"] + 1)
+
+    def _compact(self):
+        """Réécrit le journal avec les seules entrées encore en attente"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in self.pending.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def append(self, entry):
+        """Enregistre une écriture ; retourne l'entrée complétée de son id"""
+        return self.extend([entry])[0]
+
+    def extend(self, entries):
+        """Enregistre plusieurs écritures avec une seule synchronisation disque"""
+        with self.lock:
+            now = time.time()
+            entries = [dict(entry, id=self.next_id + i, ts=now) for i, entry in enumerate(entries)]
+            self.next_id += len(entries)
+            self.file.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries))
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            for entry in entries:
+                self.pending[entry["id"]] = entry
+            return entries
+
+    def entries(self):
+        """Entrées en attente, dans l'ordre d'arrivée"""
+        with self.lock:
+            return list(self.pending.values())
+
+    def mark_uncertain(self, entry_ids):
+        """Marque des entrées dont l'envoi a échoué sans que l'on sache s'il a été appliqué"""
+        with self.lock:
+            self._write({"uncertain": list(entry_ids)})
+            for entry_id in entry_ids:
+                if entry_id in self.pending:
+                    self.pending[entry_id] = dict(self.pending[entry_id], uncertain=True)
+
+    def ack(self, entry_ids):
+        """Marque des entrées comme envoyées"""
+        with self.lock:
+            self._write({"ack": list(entry_ids)})
+            for entry_id in entry_ids:
+                self.pending.pop(entry_id, None)
+            if not self.pending:
+                # Plus rien en attente : on repart d'un fichier vide
+                self.file.close()
+                self._compact()
+                self.file = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        with self.lock:
+            self.file.close()
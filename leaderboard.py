@@ -0,0 +1,125 @@
+import bisect
+
+# Cellules de list0 qui comptent comme une complétion (le verifier a aussi battu le niveau)
+COMPLETION_MARKS = ("✔", "⭐")
+
+MAIN_LIST_SIZE = 75  # Au-delà, les niveaux sont en legacy et ne rapportent plus de points
+
+def points_for_rank(rank):
+    """Barème d'exemple (250 points pour le #1, -4 % par place, 0 en legacy).
+
+    Ce n'est pas la formule de l'onglet Leaderboard : à vérifier avec
+    GoogleSheet.leaderboard_mismatches avant de s'en servir comme source.
+    """
+    if rank < 1 or rank > MAIN_LIST_SIZE:
+        return 0
+    return round(250 * 0.96 ** (rank - 1), 2)
+
+class Leaderboard:
+    """Classement calculé à partir des complétions de list0.
+
+    `curve(rang) -> points` est interchangeable. Les joueurs sont gardés triés
+    (clés (-points, nom)) : le rang d'un joueur s'obtient par bisection, et
+    chaque complétion, placement ou déplacement ne recalcule que les niveaux
+    concernés.
+    """
+
+    def __init__(self, curve=points_for_rank):
+        self.curve = curve
+        self.levels = []   # par rang (indice 0 = #1) : joueurs ayant complété le niveau
+        self.points = {}   # joueur -> points
+        self.counts = {}   # joueur -> nombre de complétions
+        self.order = []    # (-points, joueur), triés
+
+    @classmethod
+    def from_rows(cls, rows, curve=points_for_rank):
+        """Construit le classement depuis les lignes de list0 (en-tête = joueurs)"""
+        header = rows[0] if rows else []
+        return cls.from_levels(({header[col] for col in range(1, min(len(line), len(header)))
+                                 if header[col] and line[col] in COMPLETION_MARKS}
+                                for line in rows[1:]), curve)
+
+    @classmethod
+    def from_levels(cls, levels, curve=points_for_rank):
+        """Construit le classement depuis les joueurs ayant complété chaque niveau, par rang"""
+        board = cls(curve)
+        for rank, players in enumerate(levels, start=1):
+            board.levels.append(players)
+            points = curve(rank)
+            for player in players:
+                board.points[player] = round(board.points.get(player, 0) + points, 6)
+                board.counts[player] = board.counts.get(player, 0) + 1
+        board.order = sorted((-points, player) for player, points in board.points.items())
+        return board
+
+    def _update(self, player, delta, count_delta=0):
+        old = self.points.get(player)
+        if old is not None:
+            del self.order[bisect.bisect_left(self.order, (-old, player))]
+        count = self.counts.get(player, 0) + count_delta
+        if count <= 0:
+            self.points.pop(player, None)
+            self.counts.pop(player, None)
+            return
+        self.counts[player] = count
+        self.points[player] = round((old or 0) + delta, 6)
+        bisect.insort(self.order, (-self.points[player], player))
+
+    def _reprice(self, players, old_rank, new_rank):
+        """Un niveau passe de old_rank à new_rank : ses joueurs gagnent ou perdent la différence"""
+        delta = self.curve(new_rank) - self.curve(old_rank)
+        if delta:
+            for player in players:
+                self._update(player, delta)
+
+    def resize(self, count):
+        """Ajoute des niveaux vides en fin de liste jusqu'à `count` niveaux"""
+        while len(self.levels) < count:
+            self.levels.append(set())
+
+    def set_completion(self, rank, player, done=True):
+        self.resize(rank)
+        players = self.levels[rank - 1]
+        if done == (player in players):
+            return
+        if done:
+            players.add(player)
+            self._update(player, self.curve(rank), 1)
+        else:
+            players.discard(player)
+            self._update(player, -self.curve(rank), -1)
+
+    def insert_level(self, rank, players=()):
+        rank = min(rank, len(self.levels) + 1)
+        for idx in range(rank - 1, len(self.levels)):
+            self._reprice(self.levels[idx], idx + 1, idx + 2)
+        self.levels.insert(rank - 1, set())
+        for player in players:
+            self.set_completion(rank, player)
+
+    def remove_level(self, rank):
+        if rank > len(self.levels):
+            return set()
+        players = set(self.levels[rank - 1])
+        for player in players:
+            self.set_completion(rank, player, False)
+        self.levels.pop(rank - 1)
+        for idx in range(rank - 1, len(self.levels)):
+            self._reprice(self.levels[idx], idx + 2, idx + 1)
+        return players
+
+    def move_level(self, rank, new_rank):
+        if rank > len(self.levels) or rank == new_rank:
+            return
+        self.insert_level(new_rank, self.remove_level(rank))
+
+    def rank(self, player):
+        """Position du joueur (1 = meilleur), ou None s'il n'a aucune complétion"""
+        points = self.points.get(player)
+        if points is None:
+            return None
+        return bisect.bisect_left(self.order, (-points, player)) + 1
+
+    def entries(self):
+        """[(joueur, points)] du meilleur au moins bon"""
+        return [(player, round(-points, 2)) for points, player in self.order]
@@ -0,0 +1,142 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+# Nombre d'appels Google Sheets faits pendant la commande en cours (liste à un élément)
+current_calls = contextvars.ContextVar("current_calls", default=None)
+
+class Histogram:
+    """Nombre, somme et dernières valeurs observées (pour les percentiles)"""
+
+    def __init__(self, window=1000):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=window)
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+    def quantile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class Metrics:
+    """Registre en mémoire des compteurs et histogrammes.
+
+    Chaque mesure appartient à une famille (ex. "latency_seconds") et porte un
+    nom (ex. "GoogleSheet.get_levels").
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}  # (famille, nom) -> Histogram
+        self.counters = {}    # (famille, nom) -> int
+
+    def observe(self, family, name, value):
+        with self.lock:
+            histogram = self.histograms.get((family, name))
+            if histogram is None:
+                histogram = self.histograms[(family, name)] = Histogram()
+            histogram.observe(value)
+
+    def incr(self, family, name, amount=1):
+        with self.lock:
+            self.counters[(family, name)] = self.counters.get((family, name), 0) + amount
+
+    def count_sheets_call(self):
+        """À appeler pour chaque requête Google Sheets : l'attribue à la commande en cours"""
+        calls = current_calls.get()
+        if calls is not None:
+            calls[0] += 1
+
+    def timed(self, name=None):
+        """Décorateur : durée de chaque appel, et pour les interactions Discord le
+        délai avant prise en charge et le nombre d'appels Google Sheets"""
+        def decorator(func):
+            label = name or func.__qualname__
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def wrapper(*args, **kwargs):
+                    self._record_dispatch(label, args)
+                    outer, calls = current_calls.get(), [0]
+                    token = current_calls.set(calls)
+                    start = time.perf_counter()
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        self.observe("latency_seconds", label, time.perf_counter() - start)
+                        self.observe("sheets_calls", label, calls[0])
+                        current_calls.reset(token)
+                        if outer is not None:
+                            outer[0] += calls[0]
+            else:
+                @functools.wraps(func)
+                def wrapper(*args, **kwargs):
+                    start = time.perf_counter()
+                    try:
+                        return func(*args, **kwargs)
+                    finally:
+                        self.observe("latency_seconds", label, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def _record_dispatch(self, label, args):
+        # Interaction en 1er argument (commande) ou en 2e (méthode on_submit, callback)
+        for arg in args[:2]:
+            created_at = getattr(arg, "created_at", None)
+            if created_at is not None and hasattr(arg, "response"):
+                delay = (datetime.now(timezone.utc) - created_at).total_seconds()
+                self.observe("dispatch_seconds", label, max(0.0, delay))
+                return
+
+    def instrument(self, cls):
+        """Décorateur de classe : chronomètre toutes les méthodes publiques"""
+        for attr, value in list(vars(cls).items()):
+            if not attr.startswith("_") and inspect.isfunction(value):
+                setattr(cls, attr, self.timed(f"{cls.__name__}.{attr}")(value))
+        return cls
+
+    def snapshot(self):
+        """Copie cohérente : ({(famille, nom): (nombre, somme, p50, p95, p99)}, {(famille, nom): total})"""
+        with self.lock:
+            histograms = {
+                key: (h.count, h.total, h.quantile(0.5), h.quantile(0.95), h.quantile(0.99))
+                for key, h in self.histograms.items()
+            }
+            return histograms, dict(self.counters)
+
+    def prometheus(self, prefix="ice"):
+        """Export au format texte de Prometheus (histogrammes en "summary")"""
+        histograms, counters = self.snapshot()
+        lines = []
+        for family in sorted({family for family, _ in histograms}):
+            metric = f"{prefix}_{family}"
+            lines.append(f"# TYPE {metric} summary")
+            for (fam, name), (count, total, p50, p95, p99) in sorted(histograms.items()):
+                if fam != family:
+                    continue
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                for quantile, value in (("0.5", p50), ("0.95", p95), ("0.99", p99)):
+                    lines.append(f'{metric}{{name="{label}",quantile="{quantile}"}} {value:.6g}')
+                lines.append(f'{metric}_sum{{name="{label}"}} {total:.6g}')
+                lines.append(f'{metric}_count{{name="{label}"}} {count}')
+        for family in sorted({family for family, _ in counters}):
+            metric = f"{prefix}_{family}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for (fam, name), value in sorted(counters.items()):
+                if fam == family:
+                    label = name.replace("\\", "\\\\").replace('"', '\\"')
+                    lines.append(f'{metric}{{name="{label}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+timed = metrics.timed
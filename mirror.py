@@ -0,0 +1,73 @@
+import sqlite3
+import json
+import hashlib
+import threading
+import time
+
+class SheetMirror:
+    """Copie locale (SQLite) des onglets du Google Sheet.
+
+    Chaque onglet est stocké ligne par ligne avec une empreinte : une
+    synchronisation ne réécrit que les lignes qui ont changé.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS tabs ("
+                "name TEXT PRIMARY KEY, synced_at REAL, row_count INTEGER)"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS rows ("
+                "tab TEXT, idx INTEGER, hash TEXT, data TEXT, PRIMARY KEY (tab, idx))"
+            )
+
+    @staticmethod
+    def _hash(data):
+        return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+    def tabs(self):
+        """Onglets présents dans le miroir : {nom: date de synchronisation}"""
+        with self.lock:
+            return dict(self.conn.execute("SELECT name, synced_at FROM tabs"))
+
+    def load(self, tab):
+        """Lignes d'un onglet telles que synchronisées, ou None s'il est absent"""
+        with self.lock:
+            info = self.conn.execute("SELECT row_count FROM tabs WHERE name = ?", (tab,)).fetchone()
+            if info is None:
+                return None
+            cursor = self.conn.execute(
+                "SELECT idx, data FROM rows WHERE tab = ? AND idx < ? ORDER BY idx", (tab, info[0])
+            )
+            rows = [[] for _ in range(info[0])]
+            for idx, data in cursor:
+                rows[idx] = json.loads(data)
+            return rows
+
+    def store(self, tab, rows):
+        """Enregistre un onglet ; retourne le nombre de lignes réellement réécrites"""
+        encoded = [json.dumps(row, ensure_ascii=False) for row in rows]
+        with self.lock, self.conn:
+            known = dict(self.conn.execute("SELECT idx, hash FROM rows WHERE tab = ?", (tab,)))
+            changed = []
+            for idx, data in enumerate(encoded):
+                digest = self._hash(data)
+                if known.get(idx) != digest:
+                    changed.append((tab, idx, digest, data))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO rows (tab, idx, hash, data) VALUES (?, ?, ?, ?)", changed
+            )
+            self.conn.execute("DELETE FROM rows WHERE tab = ? AND idx >= ?", (tab, len(encoded)))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO tabs (name, synced_at, row_count) VALUES (?, ?, ?)",
+                (tab, time.time(), len(encoded))
+            )
+            return len(changed)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
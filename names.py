@@ -0,0 +1,82 @@
+import heapq
+from collections import defaultdict
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class NameIndex:
+    """Index de noms (niveaux ou joueurs) pour l'autocomplétion.
+
+    Un trie sur les noms normalisés (et sur chacun de leurs mots) répond aux
+    préfixes ; un index de trigrammes rattrape les fautes de frappe. Tout est
+    en mémoire : aucune recherche ne touche au Google Sheet.
+    """
+
+    def __init__(self, names, key=str.lower):
+        self.key = key
+        self.names = {}                    # nom normalisé -> nom affiché
+        self.order = {}                    # nom normalisé -> position dans la liste d'origine
+        self.trie = {}                     # caractère -> sous-noeud ; None -> noms normalisés
+        self.trigrams = defaultdict(set)   # trigramme -> noms normalisés
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        normalized = self.key(name) if name else ""
+        if not normalized or normalized in self.names:
+            return
+        self.names[normalized] = name
+        self.order[normalized] = len(self.order)
+        # Chaque mot est un point d'entrée : "bloodbath" trouve aussi "the bloodbath"
+        words = normalized.split(" ")
+        for start in range(len(words)):
+            node = self.trie
+            for char in " ".join(words[start:]):
+                node = node.setdefault(char, {})
+            node.setdefault(None, []).append(normalized)
+        for trigram in _trigrams(normalized):
+            self.trigrams[trigram].add(normalized)
+
+    def get(self, name):
+        """Nom affiché correspondant exactement (après normalisation), ou None"""
+        return self.names.get(self.key(name)) if name else None
+
+    def _prefix(self, prefix, limit):
+        node = self.trie
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        # Tout le sous-arbre est parcouru : les meilleurs rangs peuvent être dans n'importe quelle branche
+        found, stack = set(), [node]
+        while stack:
+            node = stack.pop()
+            found.update(node.get(None, ()))
+            stack.extend(child for char, child in node.items() if char is not None)
+        return heapq.nsmallest(limit, found, key=self.order.get)
+
+    def _fuzzy(self, query, limit):
+        query_trigrams = _trigrams(query)
+        shared = defaultdict(int)
+        for trigram in query_trigrams:
+            for normalized in self.trigrams.get(trigram, ()):
+                shared[normalized] += 1
+        scored = []
+        for normalized, count in shared.items():
+            # Similarité de Jaccard entre les deux ensembles de trigrammes
+            score = count / (len(query_trigrams) + len(_trigrams(normalized)) - count)
+            if score >= 0.3:
+                scored.append((-score, self.order[normalized], normalized))
+        return [normalized for _, _, normalized in sorted(scored)[:limit]]
+
+    def search(self, query, limit=25):
+        """Jusqu'à `limit` noms : d'abord ceux qui commencent par la saisie, puis les plus proches"""
+        query = self.key(query) if query else ""
+        if not query:
+            return list(self.names.values())[:limit]
+        results = self._prefix(query, limit)
+        if len(results) < limit:
+            seen = set(results)
+            results += [name for name in self._fuzzy(query, limit) if name not in seen][:limit - len(results)]
+        return [self.names[normalized] for normalized in results]
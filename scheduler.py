@@ -0,0 +1,131 @@
+import itertools
+import random
+import threading
+import time
+import gspread
+import requests
+
+# Priorité des files d'attente : plus petit = servi en premier
+LANES = {"write": 0, "read": 1, "background": 2}
+
+# Codes HTTP qui justifient une nouvelle tentative
+RETRY_CODES = {429, 500, 502, 503, 504}
+
+class UncertainWriteError(Exception):
+    """Écriture non idempotente interrompue sans réponse (coupure réseau, 5xx) :
+    elle a pu être appliquée, la renvoyer telle quelle risquerait un doublon"""
+
+class TokenBucket:
+    """Seau à jetons : `rate` jetons par seconde, au plus `capacity` en réserve"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now, cost=1):
+        """Secondes à attendre avant de pouvoir prendre `cost` jetons"""
+        self._refill(now)
+        if self.tokens >= cost:
+            return 0
+        return (cost - self.tokens) / self.rate
+
+    def take(self, cost=1):
+        self.tokens -= cost
+
+def bucket_for_quota(per_minute):
+    """Seau calé sur un quota par minute : 90 % en débit continu, 10 % en rafale.
+
+    Sur n'importe quelle fenêtre d'une minute on ne dépasse donc pas le quota.
+    """
+    return TokenBucket(per_minute * 0.9 / 60, max(1, per_minute * 0.1))
+
+class RequestScheduler:
+    """Ordonnanceur des appels à l'API Google Sheets.
+
+    - un seau à jetons par quota (lectures, écritures, total du projet) ;
+    - les écritures passent avant les lectures, elles-mêmes avant les
+      synchronisations de fond ;
+    - les erreurs 429/5xx et les coupures réseau sont retentées avec un
+      backoff exponentiel et du jitter. Pour une écriture non idempotente
+      (insertion, ajout de lignes), seul un 429 est retenté : la requête a
+      alors été refusée avant d'être appliquée.
+    """
+
+    def __init__(self, read_per_minute=60, write_per_minute=60, total_per_minute=300,
+                 max_retries=5, base_delay=1.0, max_delay=32.0):
+        self.buckets = {
+            "read": bucket_for_quota(read_per_minute),
+            "write": bucket_for_quota(write_per_minute)
+        }
+        self.total = bucket_for_quota(total_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.cond = threading.Condition()
+        self.counter = itertools.count()
+        self.waiting = []  # tickets (priorité, ordre d'arrivée, file, coût)
+
+    def _bucket(self, lane):
+        return self.buckets["write" if lane == "write" else "read"]
+
+    def acquire(self, lane, cost=1):
+        """Bloque jusqu'à ce qu'un appel de la file `lane` puisse partir"""
+        ticket = (LANES[lane], next(self.counter), lane, cost)
+        with self.cond:
+            self.waiting.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = None
+                    for waiting in sorted(self.waiting):
+                        bucket = self._bucket(waiting[2])
+                        wait = max(bucket.wait_time(now, waiting[3]), self.total.wait_time(now, waiting[3]))
+                        if wait <= 0:
+                            if waiting is ticket:
+                                bucket.take(cost)
+                                self.total.take(cost)
+                                return
+                            # Un appel plus prioritaire peut partir : on le réveille
+                            self.cond.notify_all()
+                            delay = None
+                            break
+                        delay = wait if delay is None else min(delay, wait)
+                    self.cond.wait(delay)
+            finally:
+                self.waiting.remove(ticket)
+                self.cond.notify_all()
+
+    def _retryable(self, error):
+        if isinstance(error, gspread.exceptions.APIError):
+            return error.code in RETRY_CODES
+        return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+    def call(self, lane, func, *args, cost=1, idempotent=True, **kwargs):
+        """Exécute func en respectant les quotas, avec nouvelles tentatives.
+
+        idempotent=False pour une écriture qu'un second envoi dupliquerait : une
+        erreur dont on ne sait pas si la requête a été appliquée lève alors
+        UncertainWriteError au lieu d'être retentée.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.acquire(lane, cost)
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not self._retryable(e):
+                    raise
+                rejected = isinstance(e, gspread.exceptions.APIError) and e.code == 429
+                if not idempotent and not rejected:
+                    raise UncertainWriteError(str(e)) from e
+                if attempt == self.max_retries:
+                    raise
+                # Backoff exponentiel avec "full jitter"
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                print(f"Google Sheets: {e} - nouvelle tentative dans {delay:.1f}s")
+                time.sleep(delay)
@@ -0,0 +1,47 @@
+from archive import ArchiveLog
+
+HEADER = ["Type", "Player", "Level", "Rank", "Link", "Date"]
+ROWS = [
+    ["Added", "Zoink", "Bloodbath", "3", "", "05/01/2020"],
+    ["beat", "Cursed", "Bloodbath", "3", "https://youtu.be/a", "10/02/2020"],
+    ["Added", "Cursed", "Tartarus", "1", "", "01/03/2020"],
+    ["beat", "Zoink", "Tartarus", "1", "https://youtu.be/b", "15/03/2020"],
+    ["beat", "Zoink", "Bloodbath", "4", "https://youtu.be/c", "20/04/2020"],
+]
+
+def dates(events):
+    return [event.date for event in events]
+
+def test_history_is_newest_first_whether_rows_are_appended_or_added_at_the_top():
+    appended = ArchiveLog([HEADER] + ROWS)
+    at_the_top = ArchiveLog([HEADER] + ROWS[::-1])
+    expected = ["20/04/2020", "15/03/2020", "01/03/2020", "10/02/2020", "05/01/2020"]
+    assert dates(appended.history()) == expected
+    assert dates(at_the_top.history()) == expected
+
+    # Ligne ajoutée en fin d'onglet, puis ligne historique plus ancienne
+    appended.append(len(ROWS) + 2, ["beat", "Cursed", "Tartarus", "1", "", "01/05/2020"])
+    appended.append(len(ROWS) + 3, ["beat", "Cursed", "Tartarus", "1", "", "01/01/2019"])
+    assert dates(appended.history("Tartarus")) == ["01/05/2020", "15/03/2020", "01/03/2020", "01/01/2019"]
+
+def test_history_filters():
+    log = ArchiveLog([HEADER] + ROWS)
+    assert dates(log.history("bloodbath")) == ["20/04/2020", "10/02/2020", "05/01/2020"]
+    assert dates(log.history(player_name="ZOINK")) == ["20/04/2020", "15/03/2020", "05/01/2020"]
+    assert dates(log.history(kind="Added")) == ["01/03/2020", "05/01/2020"]
+    assert dates(log.history("Bloodbath", "Zoink", "beat")) == ["20/04/2020"]
+    assert log.history("Bloodbath", kind="Verified") == []
+    assert log.history("Unknown") == []
+
+def test_added_date():
+    log = ArchiveLog([HEADER] + ROWS + [
+        ["Added", "Zoink", "Bloodbath", "2", "", "01/01/2019"],  # plus ancien : l'emporte
+        ["Added", "Cursed", "Old Level", "9", "", "2018"],        # date illisible
+        ["Added", "Cursed", "Old Level", "9", "", ""],
+        ["Added", "Cursed", "Kenos", "5", ""],                   # sans date
+        ["Added", "Cursed", "Kenos", "5", "", "07/07/2021"],
+    ])
+    assert log.added_date("bloodbath") == "01/01/2019"
+    assert log.added_date("Old Level") == "2018"
+    assert log.added_date("Kenos") == "07/07/2021"
+    assert log.added_date("Unknown") is None
@@ -0,0 +1,21 @@
+import json
+from ice import _cell_data
+
+def value_of(cell):
+    (kind, value), = cell["userEnteredValue"].items()
+    return kind, value
+
+def test_plain_numbers_are_numbers():
+    assert value_of(_cell_data("12")) == ("numberValue", 12.0)
+    assert value_of(_cell_data("-3.5")) == ("numberValue", -3.5)
+    assert value_of(_cell_data(7)) == ("numberValue", 7)
+
+def test_ambiguous_text_stays_text():
+    for text in ["NaN", "inf", "Infinity", "1e3", "1_000", " 5", "1.", "9" * 400]:
+        assert value_of(_cell_data(text)) == ("stringValue", text)
+
+def test_payload_is_always_valid_json():
+    cells = [_cell_data(value) for value in ["nan", float("nan"), float("inf"), "=A1", True, None]]
+    json.dumps(cells, allow_nan=False)
+    assert value_of(_cell_data("=A1")) == ("formulaValue", "=A1")
+    assert value_of(_cell_data("12", user_entered=False)) == ("stringValue", "12")
@@ -0,0 +1,53 @@
+from gspread.exceptions import APIError
+from fake_gspread import FakeClient, _FakeResponse, generate
+from ice import GoogleSheet
+from scheduler import RequestScheduler
+
+CHECKSUMS = "checksum:checksums!A1:B20"
+
+def new_sheet(spreadsheet, change_source, change_fallback=""):
+    gs = GoogleSheet(journal_path="", mirror_path=None, client=FakeClient(spreadsheet),
+                     change_source=change_source, change_fallback=change_fallback)
+    gs.changes_stop.set()  # contrôles lancés à la main
+    gs.scheduler = RequestScheduler(10 ** 6, 10 ** 6, 10 ** 6)  # pas d'attente de quota
+    gs.warm_up(["MAIN", "LE", "LR"])
+    gs.check_changes()     # premier marqueur
+    return gs
+
+def record_ranges(spreadsheet):
+    """Plages demandées à chaque values_batch_get"""
+    requested, batch_get = [], spreadsheet.values_batch_get
+    def values_batch_get(ranges, params=None):
+        requested.append(list(ranges))
+        return batch_get(ranges, params)
+    spreadsheet.values_batch_get = values_batch_get
+    return requested
+
+def test_edited_tab_is_detected_and_reloaded():
+    spreadsheet = generate(20, 10, seed=1)
+    gs = new_sheet(spreadsheet, CHECKSUMS)
+    spreadsheet.edit("LE", 2, 2, "42")
+    assert gs.check_changes() == ["LE"]
+    assert gs.snapshot(["LE"])["LE"].cell(2, 2) == "42"
+
+def test_unchanged_tabs_are_not_fetched():
+    spreadsheet = generate(20, 10, seed=1)
+    gs = new_sheet(spreadsheet, CHECKSUMS)
+    requested = record_ranges(spreadsheet)
+    assert gs.check_changes() == []
+    assert requested == [["checksums!A1:B20"]]
+    spreadsheet.edit("LR", 3, 2, "7")
+    gs.check_changes()
+    assert requested[1:] == [["checksums!A1:B20"], ["'LR'"]]
+
+def test_unreachable_drive_falls_back_to_checksums():
+    spreadsheet = generate(20, 10, seed=1)
+    gs = new_sheet(spreadsheet, "modified", CHECKSUMS)
+    def unreachable():
+        raise APIError(_FakeResponse(403, "Drive API has not been used in project"))
+    spreadsheet.get_lastUpdateTime = unreachable
+    gs.check_changes()  # bascule de source : tout est comparé aux empreintes une fois
+    requested = record_ranges(spreadsheet)
+    spreadsheet.edit("list0", 2, 3, "✔")
+    assert gs.check_changes() == ["MAIN"]
+    assert requested == [["checksums!A1:B20"], ["'list0'"]]
@@ -0,0 +1,83 @@
+from completions import grid_from_records, records_from_grid, render_grid
+from fake_gspread import FakeClient, generate
+from ice import GoogleSheet
+from leaderboard import COMPLETION_MARKS
+from scheduler import RequestScheduler
+
+def new_sheet(spreadsheet, completions_store="sparse"):
+    gs = GoogleSheet(journal_path="", mirror_path=None, client=FakeClient(spreadsheet),
+                     change_source="", completions_store=completions_store)
+    gs.scheduler = RequestScheduler(10 ** 6, 10 ** 6, 10 ** 6)  # pas d'attente de quota
+    return gs
+
+def migrated(n_levels=20, n_players=10):
+    spreadsheet = generate(n_levels, n_players, seed=1)
+    new_sheet(spreadsheet, "list0").migrate_completions()
+    return spreadsheet
+
+def test_sparse_writes_keep_list0_rendered():
+    spreadsheet = migrated()
+    gs = new_sheet(spreadsheet)
+    list0 = spreadsheet.ws["list0"].rows
+    col = list0[0].index("Player0")  # vainqueur de "Pending Level" dans la liste d'attente
+
+    gs.place_level("Pending Level", "Player0", 3)
+    assert list0[3][0] == "Pending Level"
+    assert list0[3][col] == "⭐"
+    assert set(list0[3][1:col] + list0[3][col + 1:len(list0[0])]) == {"X"}
+
+    level = next(line[0] for line in list0[1:] if line[col] == "X")
+    gs.update_completion("Player0", level)
+    assert next(line for line in list0 if line[0] == level)[col] == "✔"
+    assert spreadsheet.ws["completions"].rows[-1] == [level, "Player0", "✔"]
+
+def test_sparse_add_player_fills_list0_column():
+    spreadsheet = migrated()
+    gs = new_sheet(spreadsheet)
+    gs.add_player("Newcomer", "newcomer_discord")
+    list0 = spreadsheet.ws["list0"].rows
+    col = list0[0].index("Newcomer")
+    assert {line[col] for line in list0[1:]} == {"X"}
+
+def marks(rows):
+    """Cellules ✔/⭐ d'une grille list0 : {(niveau, joueur): marque}"""
+    return {(line[0], rows[0][col]): line[col]
+            for line in rows[1:] for col in range(1, min(len(line), len(rows[0])))
+            if line[col] in COMPLETION_MARKS}
+
+def test_grid_records_grid_round_trip():
+    rows = generate(30, 12, seed=2).ws["list0"].rows
+    records = records_from_grid(rows)
+    rebuilt = grid_from_records([line[0] for line in rows[1:]], rows[0], records)
+    assert marks(rebuilt) == marks(rows)
+    assert render_grid(rebuilt) == render_grid(rows)
+
+def test_last_record_wins_and_blank_or_x_clears():
+    header, levels = ["", "A", "B"], ["L1", "L2"]
+    records = [["L1", "A", "✔"], ["L1", "A", "⭐"],   # la dernière ligne l'emporte
+               ["L1", "B", "✔"], ["L1", "B", ""],     # marque vide : effacée
+               ["L2", "A", "✔"], ["L2", "A", "X"],    # "X" : effacée
+               ["L2", "B", "X"], ["L2", "B", "✔"]]    # recomplétée après effacement
+    rows = grid_from_records(levels, header, records)
+    assert marks(rows) == {("L1", "A"): "⭐", ("L2", "B"): "✔"}
+    assert render_grid(rows) == [["⭐", "X"], ["X", "✔"]]
+
+def test_sparse_read_matches_list0_after_migration():
+    spreadsheet = migrated(30, 12)
+    original = marks(spreadsheet.ws["list0"].rows)
+    for line in spreadsheet.ws["list0"].rows[1:]:
+        del line[1:]  # seules la colonne A et l'en-tête sont lus en stockage creux
+    gs = new_sheet(spreadsheet)
+    assert marks(gs.snapshot(["MAIN"])["MAIN"].rows) == original
+
+    # Lignes ajoutées à la main dans completions : la dernière l'emporte, "" ou "X" efface
+    cleared, changed = list(original)[:2]
+    for level, player, mark in [[*cleared, "X"], [*changed, ""], [*changed, "⭐"]]:
+        row = len(spreadsheet.ws["completions"].rows) + 1
+        for col, value in enumerate([level, player, mark], start=1):
+            spreadsheet.edit("completions", row, col, value)
+    gs = new_sheet(spreadsheet)
+    expected = dict(original)
+    expected[changed] = "⭐"
+    del expected[cleared]
+    assert marks(gs.snapshot(["MAIN"])["MAIN"].rows) == expected
@@ -0,0 +1,38 @@
+import numpy as np
+import ice
+from grid import CompletionMatrix, RatingMatrix
+from leaderboard import Leaderboard
+
+def test_rating_matrix_parses_like_ice_averages():
+    rows = [["", "A", "B", "C"], ["L1", "50", "", "1.5"], ["L2", "abc", "1.2.3"], [], ["L4", "", "", "", "99"]]
+    matrix = RatingMatrix(rows)
+    assert matrix.values.shape == (4, 3) and matrix.values.dtype == np.float32
+    expected = [[50, np.nan, 1.5], [np.nan] * 3, [np.nan] * 3, [np.nan] * 3]
+    assert np.array_equal(matrix.values, np.array(expected, dtype=np.float32), equal_nan=True)
+
+def test_rating_matrix_totals_and_extremes():
+    matrix = RatingMatrix([["", "A", "B"], ["L1", "10", ""], ["L2", "30", ""]])
+    totals, counts = matrix.totals(axis=0)
+    assert totals.tolist() == [40, 0] and counts.tolist() == [2, 0]
+    best, high, worst, low = matrix.player_extremes()
+    assert best.tolist() == [1, -1] and worst.tolist() == [0, -1]
+
+def test_completion_matrix_builds_the_same_leaderboard():
+    rows = [["", "A", "", "B", "A"], ["L1", "✔", "✔", "X"], ["L2", "X", "", "⭐", "✔"], [], ["L4", "✔ ", "", "", "", "⭐"]]
+    matrix = CompletionMatrix(rows)
+    assert matrix.completed.tolist() == [[True, False, False, False], [False, False, True, True],
+                                         [False] * 4, [False] * 4]
+    assert matrix.level_players() == [{"A"}, {"A", "B"}, set(), set()]
+    curve = lambda rank: 10 - rank
+    expected = Leaderboard.from_rows(rows, curve)
+    board = Leaderboard.from_levels(matrix.level_players(), curve)
+    assert board.entries() == expected.entries() and board.levels == expected.levels
+
+def test_player_stats_agree_with_and_without_numpy(monkeypatch):
+    rows = [["", "A"], ["L1", "-5"], ["L2", "1e2"], ["L3", "40"], ["L4", "1.2.3"], ["L5", "12.5"]]
+    results = []
+    for rating_matrix in (RatingMatrix, None):
+        monkeypatch.setattr(ice, "RatingMatrix", rating_matrix)
+        stats = ice.TabData("LE", [list(line) for line in rows]).player_stats("A")
+        results.append((stats.total, stats.count, stats.best, stats.worst))
+    assert results[0] == results[1] == (52.5, 2, ("L3", 40.0), ("L5", 12.5))
@@ -0,0 +1,29 @@
+from fake_gspread import FakeClient, generate
+from ice import GoogleSheet
+from leaderboard import Leaderboard, points_for_rank
+
+def new_sheet(spreadsheet, **kwargs):
+    return GoogleSheet(journal_path="", mirror_path=None, client=FakeClient(spreadsheet), change_source="", **kwargs)
+
+def test_leaderboard_tab_is_the_default_source():
+    spreadsheet = generate(40, 30, seed=2)
+    gs = new_sheet(spreadsheet)
+    tab = spreadsheet.ws["Leaderboard"].rows[1:]
+    assert sorted(gs.get_leaderboard()) == sorted((player, float(points)) for _, player, points in tab)
+    best = gs.get_leaderboard()[0][0]
+    assert gs.get_player_rank(best) == 1
+
+def test_mismatches_validate_a_curve_against_the_tab():
+    # Dans le Sheet généré, chaque complétion vaut un point
+    gs = new_sheet(generate(40, 30, seed=2))
+    assert gs.leaderboard_mismatches(lambda rank: 1) == []
+    assert gs.leaderboard_mismatches(points_for_rank) != []
+
+def test_engine_follows_moves_and_completions():
+    rows = [["", "A", "B"], ["L1", "✔", "X"], ["L2", "X", "⭐"]]
+    board = Leaderboard.from_rows(rows, lambda rank: 10 - rank)
+    assert board.entries() == [("A", 9), ("B", 8)]
+    board.move_level(2, 1)
+    assert board.entries() == [("B", 9), ("A", 8)]
+    board.set_completion(1, "A")
+    assert board.rank("A") == 1 and board.entries()[0] == ("A", 17)
@@ -0,0 +1,16 @@
+from names import NameIndex
+
+LEVELS = [f"Level {i}" for i in range(200)]
+
+def test_prefix_returns_best_ranked_levels():
+    index = NameIndex(LEVELS)
+    assert index.search("lev", 5) == ["Level 0", "Level 1", "Level 2", "Level 3", "Level 4"]
+    assert index.search("level 1", 10) == ["Level 1"] + [f"Level {i}" for i in range(10, 19)]
+
+def test_prefix_matches_inner_words_in_list_order():
+    index = NameIndex(["The Bloodbath", "Bloodlust", "Sonic Wave", "Bloodbath"])
+    assert index.search("blood", 3) == ["The Bloodbath", "Bloodlust", "Bloodbath"]
+
+def test_fuzzy_completes_prefix_results():
+    index = NameIndex(["Sonic Wave", "Tartarus", "Bloodbath"])
+    assert index.search("tartarsu", 1) == ["Tartarus"]
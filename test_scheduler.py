@@ -0,0 +1,52 @@
+import pytest
+import requests
+from fake_gspread import FakeClient, generate
+from ice import GoogleSheet
+from journal import WriteJournal
+from scheduler import RequestScheduler, UncertainWriteError
+
+def flaky(func, failures, apply_first=False):
+    """func qui échoue `failures` fois par coupure réseau (après s'être appliquée si apply_first)"""
+    state = {"calls": 0}
+    def call(*args, **kwargs):
+        state["calls"] += 1
+        if state["calls"] <= failures:
+            if apply_first:
+                func(*args, **kwargs)
+            raise requests.exceptions.ConnectionError("reset")
+        return func(*args, **kwargs)
+    call.state = state
+    return call
+
+def test_transport_errors_are_retried_for_idempotent_calls():
+    scheduler = RequestScheduler(base_delay=0, max_delay=0)
+    call = flaky(lambda: "ok", failures=2)
+    assert scheduler.call("read", call) == "ok"
+    assert call.state["calls"] == 3
+
+def test_non_idempotent_writes_are_not_resent():
+    scheduler = RequestScheduler(base_delay=0, max_delay=0)
+    call = flaky(lambda: "ok", failures=1)
+    with pytest.raises(UncertainWriteError):
+        scheduler.call("write", call, idempotent=False)
+    assert call.state["calls"] == 1
+
+def test_uncertain_append_is_not_duplicated(tmp_path):
+    spreadsheet = generate(20, 10, seed=4)
+    gs = GoogleSheet(journal_path=str(tmp_path / "journal.jsonl"), mirror_path=None,
+                     client=FakeClient(spreadsheet), change_source="")
+    gs.journal_stop.set()
+    archive = spreadsheet.ws["archive"].rows
+    before = len(archive)
+    # Le premier envoi arrive dans le Sheet mais la réponse est perdue
+    spreadsheet.batch_update = flaky(spreadsheet.batch_update, failures=1, apply_first=True)
+    gs.add_archive("Player1", "Level 3", "https://youtu.be/x")
+    with pytest.raises(UncertainWriteError):
+        gs.flush_journal()
+    assert len(archive) == before + 1
+    assert gs.journal.entries()[0]["uncertain"]
+    # Le marquage survit à un redémarrage
+    assert WriteJournal(str(tmp_path / "journal.jsonl")).entries()[0]["uncertain"]
+    # Au prochain envoi, la ligne est retrouvée dans le Sheet : rien n'est renvoyé
+    assert gs.flush_journal() == 1
+    assert len(archive) == before + 1 and not gs.journal.entries()